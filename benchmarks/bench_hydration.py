@@ -0,0 +1,76 @@
+"""
+Hits/sec of ``from_es`` with and without ``trusted=True`` on a 1000 hits page.
+
+    python -m benchmarks.bench_hydration
+"""
+import copy
+import datetime
+import time
+import typing
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField
+
+
+class BenchProfileODM(InnerESModel):
+    """user profile document"""
+    user_id: int = Field(None, description="user id")
+    nickname: str = Field(None, description="user nickname", keyword=True)
+    birthday: datetime.datetime = Field(None, description="birthday")
+
+
+class BenchOrderODM(InnerESModel):
+    """order line document"""
+    sku: str = Field(None, description="sku", keyword=True)
+    price: float = Field(None, description="price")
+    created_at: datetime.datetime = Field(None, description="created at")
+
+
+class BenchUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    last_login: datetime.datetime = Field(None, description="last login")
+    profile: typing.Union[ObjectField[BenchProfileODM], dict] = Field(None, description="user profile")
+    orders: typing.Union[NestedField[BenchOrderODM], list] = Field(None, description="orders")
+
+    class Index:
+        name = 'bench-user'
+
+
+def make_page(size=1000):
+    return [
+        {
+            "_index": "bench-user",
+            "_id": str(i),
+            "_score": 1.0,
+            "_source": {
+                "id": i,
+                "username": "user-%d" % i,
+                "last_login": "2022-01-01T10:00:00",
+                "profile": {"user_id": i, "nickname": "nick-%d" % i, "birthday": "1990-01-01T00:00:00"},
+                "orders": [
+                    {"sku": "sku-%d" % j, "price": 9.9, "created_at": "2022-01-01T10:00:00"} for j in range(3)
+                ],
+            },
+        }
+        for i in range(size)
+    ]
+
+
+def bench(trusted, rounds=5, size=1000):
+    best = None
+    for _ in range(rounds):
+        page = copy.deepcopy(make_page(size))
+        start = time.perf_counter()
+        for hit in page:
+            BenchUserODM.from_es(hit, trusted=trusted)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return size / best
+
+
+if __name__ == "__main__":
+    validated = bench(trusted=False)
+    trusted = bench(trusted=True)
+    print("from_es validated: {:>10.0f} hits/s".format(validated))
+    print("from_es trusted:   {:>10.0f} hits/s ({:.1f}x)".format(trusted, trusted / validated))
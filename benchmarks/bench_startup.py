@@ -0,0 +1,73 @@
+"""
+Time to create ``ESModel`` / ``InnerESModel`` classes, which is what makes
+importing a service with hundreds of models slow.
+
+    python -m benchmarks.bench_startup
+"""
+import datetime
+import time
+import typing
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField
+
+
+MODEL_SOURCE = '''
+class Profile{i}(InnerESModel):
+    user_id: int = Field(None, description="user id")
+    nickname: str = Field(None, description="nickname", keyword=True)
+    birthday: datetime.datetime = Field(None, description="birthday")
+
+
+class User{i}(ESModel):
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True, fields={{"raw": {{"type": "keyword"}}}})
+    score: float = Field(None, description="score")
+    active: bool = Field(None, description="active")
+    created_at: datetime.datetime = Field(None, description="created at")
+    tags: typing.List[str] = Field(None, description="tags")
+    profile: typing.Union[ObjectField[Profile{i}], dict] = Field(None, description="profile")
+    history: typing.Union[NestedField[Profile{i}], list] = Field(None, description="history")
+    shared: typing.Union[ObjectField[SharedODM], dict] = Field(None, description="shared inner doc")
+
+    class Index:
+        name = "bench-startup-{i}"
+'''
+
+
+class SharedODM(InnerESModel):
+    """inner document used by every model"""
+    key: str = Field(None, description="key", keyword=True)
+    value: int = Field(None, description="value")
+
+
+def create_models(count):
+    namespace = {
+        "datetime": datetime,
+        "typing": typing,
+        "ESModel": ESModel,
+        "InnerESModel": InnerESModel,
+        "Field": Field,
+        "ObjectField": ObjectField,
+        "NestedField": NestedField,
+        "SharedODM": SharedODM,
+    }
+    for i in range(count):
+        exec(MODEL_SOURCE.format(i=i), namespace)
+
+
+def bench(count=300, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        create_models(count)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    count = 300
+    elapsed = bench(count)
+    print("{} models (+{} inner models): {:.3f}s, {:.2f}ms per model".format(
+        count, count, elapsed, elapsed * 1000 / count
+    ))
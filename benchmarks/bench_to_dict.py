@@ -0,0 +1,48 @@
+"""
+Documents/sec of ``to_dict`` and of request body serialization, the
+compiled per-class plan against elasticsearch_dsl's generic ``ObjectBase.to_dict``.
+
+    python -m benchmarks.bench_to_dict
+"""
+import copy
+import time
+
+from elasticsearch_dsl.serializer import serializer
+from elasticsearch_dsl.utils import ObjectBase
+
+from benchmarks.bench_hydration import BenchUserODM, make_page
+
+
+def generic_to_dict(doc):
+    # elasticsearch_dsl's reflective path, recursing into inner documents
+    out = ObjectBase.to_dict(doc)
+    for name in ("profile", "orders"):
+        value = doc._d_.get(name)
+        if isinstance(value, list):
+            out[name] = [ObjectBase.to_dict(v) for v in value]
+        elif value is not None:
+            out[name] = ObjectBase.to_dict(value)
+    return out
+
+
+def bench(func, docs, rounds=5):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for doc in docs:
+            func(doc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(docs) / best
+
+
+if __name__ == "__main__":
+    docs = [BenchUserODM.from_es(hit) for hit in copy.deepcopy(make_page())]
+    results = [
+        ("to_dict generic", bench(generic_to_dict, docs)),
+        ("to_dict compiled", bench(lambda d: d.to_dict(), docs)),
+        ("body generic + dumps", bench(lambda d: serializer.dumps(generic_to_dict(d)), docs)),
+        ("body compiled + dumps", bench(lambda d: serializer.dumps(d._to_body()), docs)),
+    ]
+    for name, rate in results:
+        print("{:<24}{:>10.0f} docs/s".format(name, rate))
@@ -0,0 +1,190 @@
+"""
+Benchmark suite of the es_odm hot paths against a local canned transport,
+results are emitted as JSON so they can be compared between releases::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --quick
+"""
+import argparse
+import copy
+import json
+import platform
+import sys
+import time
+
+from elasticsearch_dsl.serializer import serializer as dsl_serializer
+
+import es_odm
+from es_odm.bulk import build_action, chunk_actions, doc_meta
+from es_odm.field import get_dsl_field
+from es_odm.serializer import serializer as fast_serializer
+
+from benchmarks import bench_startup, transport
+from benchmarks.bench_hydration import BenchUserODM, make_page
+
+
+ALIAS = "bench"
+
+
+def measure(run, ops, rounds=5, setup=None):
+    """
+    Best of ``rounds`` timings of ``run(setup())``, ``setup`` is not timed.
+    """
+    best = None
+    for _ in range(rounds):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "ops": ops,
+        "rounds": rounds,
+        "best_seconds": best,
+        "ops_per_sec": ops / best if best else None,
+    }
+
+
+def source_for(id):
+    return copy.deepcopy(make_page(1)[0]["_source"])
+
+
+def bench_model_creation(size, rounds):
+    return measure(lambda _: bench_startup.create_models(size), size, rounds)
+
+
+def bench_get_dsl_field(size, rounds):
+    fields = list(BenchUserODM.__fields__.values())
+
+    def run(_):
+        for _ in range(size):
+            for field in fields:
+                get_dsl_field(field)
+    return measure(run, size * len(fields), rounds)
+
+
+def bench_model_init(size, rounds):
+    sources = [hit["_source"] for hit in make_page(size)]
+    return measure(lambda _: [BenchUserODM(**s) for s in sources], size, rounds)
+
+
+def bench_full_clean(size, rounds):
+    docs = [BenchUserODM.from_es(hit) for hit in make_page(size)]
+    return measure(lambda _: [doc.full_clean() for doc in docs], size, rounds)
+
+
+def bench_from_es(size, rounds, trusted=False):
+    page = make_page(size)
+    return measure(
+        lambda hits: [BenchUserODM.from_es(hit, trusted=trusted) for hit in hits],
+        size,
+        rounds,
+        setup=lambda: copy.deepcopy(page),
+    )
+
+
+def bench_from_es_view(size, rounds):
+    page = make_page(size)
+    view = BenchUserODM.view_class()
+    return measure(lambda hits: [view.from_es(hit) for hit in hits], size, rounds, setup=lambda: copy.deepcopy(page))
+
+
+def bench_to_dict(size, rounds, body=False):
+    docs = [BenchUserODM.from_es(hit) for hit in make_page(size)]
+    if body:
+        return measure(lambda _: [doc._to_body() for doc in docs], size, rounds)
+    return measure(lambda _: [doc.to_dict() for doc in docs], size, rounds)
+
+
+def bench_mget(size, rounds):
+    ids = [str(i) for i in range(size)]
+    return measure(lambda _: BenchUserODM.mget(ids, using=ALIAS), size, rounds)
+
+
+def bench_search(size, rounds, views=False):
+    search = BenchUserODM.search(using=ALIAS).views(views).params(size=size)
+    return measure(lambda _: list(search.execute(ignore_cache=True)), size, rounds)
+
+
+def bench_bulk_actions(size, rounds, serializer=dsl_serializer):
+    docs = [BenchUserODM.from_es(hit) for hit in make_page(size)]
+
+    def actions():
+        for doc in docs:
+            action, source = build_action("index", "bench-user", doc_meta(doc), doc._to_body())
+            yield action, source, doc
+
+    return measure(lambda _: list(chunk_actions(actions(), serializer)), size, rounds)
+
+
+def bench_bulk_save(size, rounds):
+    docs = [BenchUserODM.from_es(hit) for hit in make_page(size)]
+    return measure(lambda _: BenchUserODM.bulk_save(docs, using=ALIAS, validate=False), size, rounds)
+
+
+BENCHMARKS = [
+    ("model_creation", bench_model_creation, {}),
+    ("get_dsl_field", bench_get_dsl_field, {}),
+    ("model_init", bench_model_init, {}),
+    ("full_clean", bench_full_clean, {}),
+    ("from_es", bench_from_es, {}),
+    ("from_es_trusted", bench_from_es, {"trusted": True}),
+    ("from_es_view", bench_from_es_view, {}),
+    ("to_dict", bench_to_dict, {}),
+    ("to_body", bench_to_dict, {"body": True}),
+    ("mget", bench_mget, {}),
+    ("search_page", bench_search, {}),
+    ("search_page_views", bench_search, {"views": True}),
+    ("bulk_actions", bench_bulk_actions, {}),
+    ("bulk_actions_fast_json", bench_bulk_actions, {"serializer": fast_serializer}),
+    ("bulk_save", bench_bulk_save, {}),
+]
+
+
+def run(size=1000, rounds=5, only=None):
+    """
+    Run the suite and return its results as a JSON serializable dict.
+
+    :arg size: documents per operation (models created for ``model_creation``
+        is a tenth of it)
+    :arg rounds: timings per benchmark, the best one is kept
+    :arg only: names of the benchmarks to run, all by default
+    """
+    transport.register(ALIAS, source_for=source_for, search_size=size)
+    results = {}
+    for name, func, kwargs in BENCHMARKS:
+        if only and name not in only:
+            continue
+        n = max(1, size // 10) if name == "model_creation" else size
+        results[name] = func(n, rounds, **kwargs)
+    return {
+        "es_odm": es_odm.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "size": size,
+        "benchmarks": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000, help="documents per operation")
+    parser.add_argument("--rounds", type=int, default=5, help="timings per benchmark")
+    parser.add_argument("--quick", action="store_true", help="small size and a single round")
+    parser.add_argument("--only", nargs="*", help="benchmarks to run")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.size, args.rounds = 100, 1
+
+    results = run(args.size, args.rounds, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Local stand-in for an elasticsearch node: a ``Connection`` answering every
+request with a canned response, so a real ``Elasticsearch`` client (transport,
+serializer, ``get_connection``) can be timed without any network or cluster
+latency::
+
+    es = register("bench", source_for=lambda id: {"id": int(id)})
+    UserODM.mget(["1", "2"], using="bench")
+"""
+import json
+import re
+
+from elasticsearch import Connection, Elasticsearch
+from elasticsearch_dsl.connections import connections
+
+
+PRODUCT_HEADERS = {"x-elastic-product": "Elasticsearch", "content-type": "application/json"}
+
+INFO = {
+    "name": "bench",
+    "cluster_name": "bench",
+    "version": {"number": "7.17.0", "build_flavor": "default"},
+    "tagline": "You Know, for Search",
+}
+
+DOC_URL = re.compile(r"^/(?P<index>[^/]+)/_doc/(?P<id>[^/]+)$")
+
+
+def default_source(id):
+    return {"id": id}
+
+
+class CannedConnection(Connection):
+    """
+    ``Connection`` building its responses locally from ``source_for(id)``:
+
+    * ``GET /{index}/_doc/{id}`` and ``_mget`` find every requested id
+    * ``_search`` returns ``search_size`` hits
+    * ``_bulk`` acknowledges every action
+    """
+
+    source_for = staticmethod(default_source)
+    search_size = 1000
+
+    def __init__(self, source_for=None, search_size=None, **kwargs):
+        super(CannedConnection, self).__init__(**kwargs)
+        if source_for is not None:
+            self.source_for = source_for
+        if search_size is not None:
+            self.search_size = search_size
+        self.requests = 0
+
+    def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None):
+        self.requests += 1
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        response = self.respond(method, url.split("?", 1)[0], body)
+        return 200, PRODUCT_HEADERS, json.dumps(response)
+
+    def hit(self, index, id):
+        return {
+            "_index": index,
+            "_id": id,
+            "_version": 1,
+            "_seq_no": 1,
+            "_primary_term": 1,
+            "found": True,
+            "_source": self.source_for(id),
+        }
+
+    def respond(self, method, path, body):
+        if path == "/":
+            return INFO
+        parts = path.strip("/").split("/")
+        endpoint = parts[-1]
+        index = parts[0] if len(parts) > 1 else "bench"
+
+        if endpoint == "_mget":
+            docs = json.loads(body)["docs"]
+            return {"docs": [self.hit(d.get("_index", index), d["_id"]) for d in docs]}
+
+        if endpoint == "_search":
+            hits = [dict(self.hit(index, str(i)), _score=1.0) for i in range(self.search_size)]
+            for hit in hits:
+                del hit["found"]
+            return {
+                "took": 1,
+                "timed_out": False,
+                "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+                "hits": {"total": {"value": len(hits), "relation": "eq"}, "max_score": 1.0, "hits": hits},
+            }
+
+        if endpoint == "_bulk":
+            items = []
+            lines = iter(line for line in body.split("\n") if line)
+            for line in lines:
+                op_type, header = next(iter(json.loads(line).items()))
+                if op_type != "delete":
+                    next(lines)
+                items.append({op_type: {
+                    "_index": header.get("_index", index),
+                    "_id": header.get("_id", "generated"),
+                    "_seq_no": 1,
+                    "_primary_term": 1,
+                    "result": "deleted" if op_type == "delete" else "updated",
+                    "status": 200,
+                }})
+            return {"took": 1, "errors": False, "items": items}
+
+        match = DOC_URL.match(path)
+        if match is not None:
+            if method == "GET":
+                return self.hit(match.group("index"), match.group("id"))
+            return {
+                "_index": match.group("index"),
+                "_id": match.group("id"),
+                "_seq_no": 2,
+                "_primary_term": 1,
+                "result": "updated",
+            }
+
+        raise ValueError("No canned response for {} {}".format(method, path))
+
+
+def register(alias="bench", source_for=None, search_size=None):
+    """
+    Register an ``Elasticsearch`` client backed by :class:`CannedConnection`
+    as the ``alias`` connection and return it.
+    """
+    connection_kwargs = {}
+    if source_for is not None:
+        connection_kwargs["source_for"] = source_for
+    if search_size is not None:
+        connection_kwargs["search_size"] = search_size
+    es = Elasticsearch(connection_class=lambda **kwargs: CannedConnection(**dict(kwargs, **connection_kwargs)))
+    connections.add_connection(alias, es)
+    return es
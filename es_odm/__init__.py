@@ -1,5 +1,10 @@
 from es_odm.model import ESModel, InnerESModel
 from es_odm.field import Field, ObjectField, NestedField, KeywordField, CommonField
+from es_odm.bulk import BulkResult
+from es_odm.msearch import AsyncSearchBatcher, SearchBatch
+from es_odm.projection import FieldNotLoaded, Projection
+from es_odm.session import ESSession, SessionFlushError
+from es_odm.validation import RowValidationError
 from es_odm.version import VERSION
 
 __version__ = VERSION
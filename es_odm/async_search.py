@@ -0,0 +1,105 @@
+from elasticsearch_dsl.connections import CLIENT_HAS_NAMED_BODY_PARAMS
+from elasticsearch_dsl.utils import AttrDict
+
+from es_odm.connections import get_async_connection
+from es_odm.instrumentation import instrumented
+from es_odm.search import ESSearch
+
+
+class AsyncSearch(ESSearch):
+    """
+    :class:`~es_odm.search.ESSearch` executed through the
+    ``AsyncElasticsearch`` client registered for its ``using`` alias::
+
+        async for user in UserODM.asearch().filter("term", gender=1):
+            ...
+    """
+
+    def __iter__(self):
+        raise TypeError("AsyncSearch does not support iteration, use 'async for'.")
+
+    def __aiter__(self):
+        return self._iter_hits()
+
+    async def _iter_hits(self):
+        response = await self.execute()
+        for hit in response:
+            yield hit
+
+    def _search_params(self):
+        if CLIENT_HAS_NAMED_BODY_PARAMS:
+            params = self.to_dict()
+            if "from" in params:
+                params["from_"] = params.pop("from")
+        else:
+            params = {"body": self.to_dict()}
+        params.update(self._params)
+        return params
+
+    async def count(self):
+        """
+        Return the number of hits matching the query and filters. Note that
+        only the actual number is returned.
+        """
+        if hasattr(self, "_response") and self._response.hits.total.relation == "eq":
+            return self._response.hits.total.value
+
+        es = get_async_connection(self._using)
+
+        d = self.to_dict(count=True)
+        return (await es.count(index=self._index, body=d, **self._params))["count"]
+
+    async def execute(self, ignore_cache=False):
+        """
+        Execute the search and return an instance of ``Response`` wrapping all
+        the data.
+
+        :arg ignore_cache: if set to ``True``, consecutive calls will hit
+            ES, while cached result will be ignored. Defaults to `False`
+        """
+        if ignore_cache or not hasattr(self, "_response"):
+            with self._operation("asearch") as op:
+                cache, key = self._query_cache()
+                response = cache.get(key) if cache is not None else None
+                if response is not None:
+                    op.cached = True
+                else:
+                    es = instrumented(get_async_connection(self._using))
+                    with op.phase("request"):
+                        response = await es.search(index=self._index, **self._search_params())
+                    if cache is not None:
+                        cache.set(key, response)
+                self._response = self._build_response(op, response)
+        return self._response
+
+    async def scan(self, scroll="5m", size=1000):
+        """
+        Turn the search into a scroll search and return an async generator
+        that will iterate over all the documents matching the query.
+        """
+        es = get_async_connection(self._using)
+        body = self.to_dict()
+        body.setdefault("size", size)
+        resp = await es.search(index=self._index, body=body, scroll=scroll, **self._params)
+        scroll_id = resp.get("_scroll_id")
+        try:
+            while scroll_id and resp["hits"]["hits"]:
+                for hit in resp["hits"]["hits"]:
+                    yield self._get_result(hit)
+                resp = await es.scroll(body={"scroll_id": scroll_id, "scroll": scroll})
+                scroll_id = resp.get("_scroll_id")
+        finally:
+            if scroll_id:
+                await es.clear_scroll(body={"scroll_id": [scroll_id]}, ignore=(404,))
+
+    async def delete(self):
+        """
+        delete() executes the query by delegating to delete_by_query()
+        """
+        es = get_async_connection(self._using)
+
+        response = AttrDict(
+            await es.delete_by_query(index=self._index, body=self.to_dict(), **self._params)
+        )
+        self._invalidate_query_cache()
+        return response
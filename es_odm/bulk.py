@@ -0,0 +1,193 @@
+import collections.abc as collections_abc
+
+from elasticsearch_dsl.utils import DOC_META_FIELDS, META_FIELDS
+
+from es_odm.instrumentation import NULL_OPERATION, current_operation
+
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CHUNK_BYTES = 100 * 1024 * 1024
+
+
+class BulkResult(object):
+    """
+    Per-item summary of a bulk operation.
+
+    ``created``, ``updated``, ``deleted`` and ``noop`` hold the ``_id`` of
+    every successful item, ``failed`` holds one dict per failed item with its
+    ``_id``, operation, HTTP ``status`` and the ``error`` returned by
+    elasticsearch.
+    """
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.deleted = []
+        self.noop = []
+        self.not_found = []
+        self.failed = []
+        # ingest.IngestStats of parallel_ingest
+        self.stats = None
+
+    def __repr__(self):
+        return "BulkResult(created={}, updated={}, deleted={}, noop={}, not_found={}, failed={})".format(
+            len(self.created),
+            len(self.updated),
+            len(self.deleted),
+            len(self.noop),
+            len(self.not_found),
+            len(self.failed),
+        )
+
+    @property
+    def success(self):
+        return (
+            len(self.created)
+            + len(self.updated)
+            + len(self.deleted)
+            + len(self.noop)
+            + len(self.not_found)
+        )
+
+    @property
+    def errors(self):
+        return bool(self.failed)
+
+    def add(self, op_type, item):
+        """
+        Record one item of a ``_bulk`` response.
+        """
+        _id = item.get("_id")
+        if "error" in item or (item.get("status", 200) >= 300 and item.get("result") != "not_found"):
+            self.failed.append(
+                {
+                    "_id": _id,
+                    "op_type": op_type,
+                    "status": item.get("status"),
+                    "error": item.get("error"),
+                }
+            )
+            return False
+
+        result = item.get("result")
+        if result == "created":
+            self.created.append(_id)
+        elif result == "updated":
+            self.updated.append(_id)
+        elif result == "deleted":
+            self.deleted.append(_id)
+        elif result == "not_found":
+            self.not_found.append(_id)
+        else:
+            self.noop.append(_id)
+        return True
+
+    def merge(self, other):
+        for key in ("created", "updated", "deleted", "noop", "not_found", "failed"):
+            getattr(self, key).extend(getattr(other, key))
+        return self
+
+
+def doc_meta(doc):
+    """
+    Extract routing etc and the optimistic concurrency control parameters
+    from the ``meta`` of a document, the same way ``save()`` does.
+    """
+    meta = {k: doc.meta[k] for k in DOC_META_FIELDS if k in doc.meta}
+    if "seq_no" in doc.meta and "primary_term" in doc.meta:
+        meta["if_seq_no"] = doc.meta["seq_no"]
+        meta["if_primary_term"] = doc.meta["primary_term"]
+    return meta
+
+
+def build_action(op_type, index, meta, source=None):
+    """
+    Build the action line and the (optional) source line of a ``_bulk`` item.
+    """
+    header = {"_index": index}
+    for k, v in meta.items():
+        header["_id" if k == "id" else k] = v
+    return {op_type: header}, source
+
+
+def update_meta(doc, item):
+    """
+    Write ``_seq_no``, ``_primary_term``, ``_version`` etc of a bulk response
+    item back into ``doc.meta``.
+    """
+    for k in META_FIELDS:
+        if "_" + k in item:
+            setattr(doc.meta, k, item["_" + k])
+
+
+def chunk_actions(actions, serializer, chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """
+    Lazily group ``(action, source, doc)`` triples into chunks limited by both
+    number of items and serialized size in bytes.
+
+    Yields ``(lines, items, size)`` where ``lines`` are the serialized NDJSON
+    lines of the chunk and ``items`` the ``(op_type, doc)`` of every action,
+    in the same order. Lines are ``bytes`` when the serializer has a
+    ``dumps_bytes`` method (see :mod:`es_odm.serializer`).
+    """
+    dumps = getattr(serializer, "dumps_bytes", None)
+    if dumps is None:
+        dumps = serializer.dumps
+    lines, items, size = [], [], 0
+    for action, source, doc in actions:
+        cur_lines = [dumps(action)]
+        if source is not None:
+            cur_lines.append(dumps(source))
+        # +1 to account for the trailing new line character
+        cur_size = sum(line_size(line) + 1 for line in cur_lines)
+
+        if items and (size + cur_size > max_chunk_bytes or len(items) == chunk_size):
+            yield lines, items, size
+            lines, items, size = [], [], 0
+
+        lines.extend(cur_lines)
+        items.append((next(iter(action)), doc))
+        size += cur_size
+
+    if items:
+        yield lines, items, size
+
+
+def line_size(line):
+    return len(line) if isinstance(line, bytes) else len(line.encode("utf-8"))
+
+
+def ndjson_body(lines):
+    """``_bulk`` body of serialized ``lines`` (all ``str`` or all ``bytes``)."""
+    if lines and isinstance(lines[0], bytes):
+        return b"\n".join(lines) + b"\n"
+    return "\n".join(lines) + "\n"
+
+
+def send_chunk(es, lines, items, result=None, **kwargs):
+    """
+    Send one chunk produced by :func:`chunk_actions` through the ``_bulk``
+    endpoint, record the outcome of every item and update the ``meta`` of the
+    documents that were written successfully.
+    """
+    result = result if result is not None else BulkResult()
+    op = current_operation() or NULL_OPERATION
+    with op.phase("request"):
+        response = es.bulk(body=ndjson_body(lines), **kwargs)
+    op.response(response, hits=len(response["items"]))
+    for (op_type, doc), resp_item in zip(items, response["items"]):
+        item = resp_item.get(op_type) or next(iter(resp_item.values()))
+        if result.add(op_type, item) and doc is not None and op_type != "delete":
+            update_meta(doc, item)
+    return result
+
+
+def as_doc_id(doc):
+    """
+    Accept an ``id``, a mapping with ``_id`` or a document instance.
+    """
+    if isinstance(doc, collections_abc.Mapping):
+        return doc["_id"]
+    if hasattr(doc, "meta"):
+        return doc.meta.id
+    return doc
@@ -0,0 +1,88 @@
+"""
+Index settings tuned for large ingestions, applied for the duration of a
+``with`` block by ``Document.bulk_load_mode()``::
+
+    with UserODM.bulk_load_mode(index="users-v2", forcemerge=True):
+        UserODM.bulk_save(users, index="users-v2")
+
+The previous values are restored when the block exits, even when it fails,
+the ones declared in ``class Index`` taking precedence.
+"""
+import contextlib
+
+from es_odm.instrumentation import operation
+
+# no periodic refresh and no replica to write to while loading
+BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+def flat_settings(settings):
+    """
+    ``settings`` of an index as a flat dict without the ``index.`` prefix,
+    ``{"index": {"refresh_interval": "1s"}}`` and ``{"index.refresh_interval": "1s"}``
+    both give ``{"refresh_interval": "1s"}``.
+    """
+    flat = {}
+    for key, value in (settings or {}).items():
+        if key == "index" and isinstance(value, dict):
+            flat.update(flat_settings(value))
+            continue
+        if key.startswith("index."):
+            key = key[len("index."):]
+        flat[key] = value
+    return flat
+
+
+def _restored(names, declared, current):
+    restored = {}
+    for name in names:
+        if name in declared:
+            restored[name] = declared[name]
+        else:
+            # None resets the setting to the default of elasticsearch
+            restored[name] = current.get(name)
+    return restored
+
+
+@contextlib.contextmanager
+def bulk_load_mode(doc_class, index=None, using=None, settings=None, refresh=True, forcemerge=False,
+                   max_num_segments=None, wait_for_status="yellow", timeout=None):
+    """
+    Context manager applying ``BULK_LOAD_SETTINGS`` (updated with
+    ``settings``) to the index of ``doc_class`` for the duration of the
+    block, see ``Document.bulk_load_mode``. Yields the name of the index.
+    """
+    index = doc_class._default_index(index)
+    es = doc_class._get_connection(using)
+    tuned = flat_settings(BULK_LOAD_SETTINGS)
+    tuned.update(flat_settings(settings))
+
+    with operation("bulk_load_mode", doc_class, index):
+        if not es.indices.exists(index=index):
+            # created with the settings and mappings of class Index
+            doc_class.init(index=index, using=using)
+        previous = {
+            name: flat_settings(response["settings"])
+            for name, response in es.indices.get_settings(index=index).items()
+        }
+        es.indices.put_settings(index=index, body={"index": tuned})
+
+    declared = flat_settings(doc_class._index._settings)
+    succeeded = False
+    try:
+        yield index
+        succeeded = True
+    finally:
+        with operation("bulk_load_mode", doc_class, index):
+            for name, current in previous.items():
+                es.indices.put_settings(index=name, body={"index": _restored(tuned, declared, current)})
+            if succeeded:
+                if refresh:
+                    es.indices.refresh(index=index)
+                if forcemerge:
+                    params = {} if max_num_segments is None else {"max_num_segments": max_num_segments}
+                    es.indices.forcemerge(index=index, **params)
+                if wait_for_status:
+                    params = {} if timeout is None else {"timeout": timeout}
+                    es.cluster.health(index=index, wait_for_status=wait_for_status, **params)
+        doc_class._invalidate_search_cache()
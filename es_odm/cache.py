@@ -0,0 +1,278 @@
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+def _sizeof(value):
+    return len(value) if isinstance(value, (str, bytes)) else 0
+
+
+class LRUCache(object):
+    """
+    Thread safe LRU cache with an optional TTL, counting hits, misses and
+    evictions so its size can be tuned.
+
+    It is also the default storage of :class:`QueryCache`, any object with the
+    same ``get`` / ``set`` / ``delete`` / ``clear`` methods can replace it.
+    ``get_pinned`` / ``set_pinned`` store values outside of the bounds: they
+    are never evicted nor expired and not counted.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, timer=time.monotonic, max_bytes=None):
+        """
+        :arg max_size: maximum number of entries, the least recently used
+            entry is evicted when it is reached
+        :arg ttl: seconds after which an entry expires, ``None`` to never
+            expire
+        :arg max_bytes: maximum total size of the ``str`` / ``bytes`` values,
+            ``None`` for no limit
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = collections.OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def __repr__(self):
+        return "LRUCache(size={}, max_size={}, ttl={})".format(len(self), self.max_size, self.ttl)
+
+    def get(self, key, count=True):
+        """
+        Return the value stored for ``key``, ``None`` if it is missing or
+        expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.timer():
+                    self._data.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                self._pop(key)
+            if count:
+                self.misses += 1
+            return None
+
+    def set(self, key, value):
+        expires = self.timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, expires)
+            self.bytes += _sizeof(value)
+            while len(self._data) > self.max_size or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1
+            ):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def get_pinned(self, key):
+        """Return the value pinned for ``key``, ``None`` if there is none."""
+        return self._pinned.get(key)
+
+    def set_pinned(self, key, value):
+        with self._lock:
+            self._pinned[key] = value
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= _sizeof(entry[0])
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+            self._pinned.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pinned.clear()
+            self.bytes = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+        }
+
+
+class SQLiteCache(object):
+    """
+    :class:`LRUCache` like storage in a SQLite database, so a cache can be
+    shared by the processes of a host. Keys and values must be strings, the
+    pinned ones are kept in their own table.
+
+    :arg path: database file, created if needed
+    :arg max_size: maximum number of entries
+    :arg ttl: seconds after which an entry expires, ``None`` to never expire
+    """
+
+    def __init__(self, path, max_size=10000, ttl=None, timer=time.time):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS pinned (key TEXT PRIMARY KEY, value TEXT)")
+
+    def __repr__(self):
+        return "SQLiteCache(path={!r}, max_size={}, ttl={})".format(self.path, self.max_size, self.ttl)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key):
+        now = self.timer()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key, value):
+        now = self.timer()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, expires, now),
+            )
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def get_pinned(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM pinned WHERE key = ?", (key,)).fetchone()
+            return row[0] if row is not None else None
+
+    def set_pinned(self, key, value):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pinned (key, value) VALUES (?, ?)", (key, value))
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._db.execute("DELETE FROM pinned WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM cache")
+            self._db.execute("DELETE FROM pinned")
+
+    def close(self):
+        self._db.close()
+
+
+class QueryCache(object):
+    """
+    Cache of search responses keyed by the normalized body of the search, its
+    index and its parameters (eg. ``routing``). Responses are stored as JSON
+    strings so every hit is a fresh copy and any string storage can be used.
+
+    Writes made through the ``Document`` drop all the cached responses at
+    once when ``invalidate_on_write`` is set: the keys include a generation
+    token, replaced on every write. It is pinned in the storage when it has
+    ``get_pinned`` / ``set_pinned``, so it is neither evicted nor expired,
+    and stored like the entries otherwise.
+
+    :arg storage: ``get`` / ``set`` / ``delete`` / ``clear`` store, a
+        :class:`LRUCache` bounded by ``max_size`` / ``max_bytes`` by default
+    :arg ttl: seconds a response is kept, when using the default storage
+    """
+
+    def __init__(self, storage=None, ttl=60, max_size=256, max_bytes=None, invalidate_on_write=True,
+                 namespace="search"):
+        self.storage = storage if storage is not None else LRUCache(max_size, ttl, max_bytes=max_bytes)
+        self.invalidate_on_write = invalidate_on_write
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "QueryCache(storage={!r})".format(self.storage)
+
+    def _generation(self):
+        key = "{}:generation".format(self.namespace)
+        get = getattr(self.storage, "get_pinned", self.storage.get)
+        generation = get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            getattr(self.storage, "set_pinned", self.storage.set)(key, generation)
+        return generation
+
+    def key(self, index, body, params=None, using=None):
+        """
+        Key of a search of ``body`` over ``index`` with ``params``, sent
+        through the connection ``using``.
+        """
+        if isinstance(index, (list, tuple)):
+            index = ",".join(sorted(index))
+        normalized = json.dumps(
+            [using, index, body, params or {}], sort_keys=True, separators=(",", ":"), default=str
+        )
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return "{}:{}:{}".format(self.namespace, self._generation(), digest)
+
+    def get(self, key):
+        """The cached response of ``key`` or ``None``."""
+        value = self.storage.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, response):
+        """Cache ``response`` unless it is partial (timed out or failed shards)."""
+        if response.get("timed_out") or response.get("_shards", {}).get("failed"):
+            return
+        self.storage.set(key, json.dumps(response, separators=(",", ":"), default=str))
+
+    def invalidate(self):
+        """Drop every cached response."""
+        self.storage.delete("{}:generation".format(self.namespace))
+
+    def clear(self):
+        self.storage.clear()
+
+    def info(self):
+        info = {"hits": self.hits, "misses": self.misses}
+        if hasattr(self.storage, "info"):
+            info["storage"] = self.storage.info()
+        return info
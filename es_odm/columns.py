@@ -0,0 +1,509 @@
+"""
+Columnar export of search hits and bucket aggregations. Values are written
+page by page into typed buffers (``array.array``) without building any
+``Document`` instance, and handed to NumPy or Arrow without copying::
+
+    columns = UserODM.search_to_columns(Q("term", gender=1), fields=["id", "age", "username"])
+    columns.to_numpy()["age"]   # numpy.ndarray of int64
+    columns.to_arrow()          # pyarrow.RecordBatch
+
+The column types come from the mapping: integer fields are ``int64``, floating
+point fields ``float64``, dates ``datetime64[ms]`` (UTC), booleans ``bool``
+and keywords are dictionary encoded (``int32`` codes and their values). Lists
+(``typing.List`` annotations) and other fields are kept as Python objects.
+
+NumPy and pyarrow are optional, they are only imported by ``to_numpy()`` and
+``to_arrow()``.
+"""
+import array
+import datetime
+import functools
+import importlib
+import json
+import re
+
+from elasticsearch_dsl.field import Object
+
+
+INT_TYPES = {"long", "integer", "short", "byte", "unsigned_long"}
+FLOAT_TYPES = {"double", "float", "half_float", "scaled_float"}
+STRING_TYPES = {"text", "keyword", "date", "ip", "binary", "wildcard", "match_only_text", "constant_keyword",
+                "version", "search_as_you_type"}
+# field metadata of the Arrow columns holding JSON encoded values
+JSON_METADATA = {b"encoding": b"json"}
+
+DEFAULT_DATE_FORMAT = "strict_date_optional_time||epoch_millis"
+# named formats of elasticsearch (without their strict_ prefix) read as ISO 8601
+ISO_DATE_FORMATS = {
+    "date_optional_time", "date_time", "date_time_no_millis", "date", "date_hour", "date_hour_minute",
+    "date_hour_minute_second", "date_hour_minute_second_fraction", "date_hour_minute_second_millis",
+    "year_month_day", "year_month", "year",
+}
+NAMED_DATE_FORMATS = {
+    "basic_date": "%Y%m%d",
+    "basic_date_time": "%Y%m%dT%H%M%S.%f%z",
+    "basic_date_time_no_millis": "%Y%m%dT%H%M%S%z",
+    "basic_ordinal_date": "%Y%j",
+    "ordinal_date": "%Y-%j",
+}
+# letters of the java date patterns of custom formats and their strptime directive
+JAVA_DATE_LETTERS = {
+    "yyyy": "%Y", "uuuu": "%Y", "yy": "%y", "MM": "%m", "dd": "%d", "DDD": "%j", "HH": "%H", "mm": "%M",
+    "ss": "%S", "SSS": "%f", "SSSSSS": "%f", "Z": "%z", "X": "%z", "XX": "%z", "XXX": "%z", "xxx": "%z",
+}
+# quoted literal, run of a letter or any other character
+JAVA_DATE_TOKEN = re.compile(r"'([^']*)'|([A-Za-z])\2*|(.)")
+YEAR = re.compile(r"^\d{4}$")
+ISO_DATE = re.compile(r"^[+-]?\d{4}-")
+
+# int64 minimum, read as NaT by numpy
+NAT = -(2 ** 63)
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def column_kind(field):
+    """Kind of the column of a dsl ``field``: int, float, bool, datetime, keyword or object."""
+    name = getattr(field, "name", None)
+    if getattr(field, "_multi", False):
+        # lists of values
+        return "object"
+    if name in INT_TYPES:
+        return "int"
+    if name in FLOAT_TYPES:
+        return "float"
+    if name == "boolean":
+        return "bool"
+    if name == "date":
+        return "datetime"
+    if name == "keyword":
+        return "keyword"
+    # ``Field(keyword=True)``: text with a keyword sub field
+    if name == "text" and any(
+        getattr(sub, "name", None) == "keyword" for sub in getattr(field, "_params", {}).get("fields", {}).values()
+    ):
+        return "keyword"
+    return "object"
+
+
+def resolve_field(doc_class, path):
+    """dsl field of the dotted ``path`` of ``doc_class``, ``None`` if unknown."""
+    mapping = doc_class._doc_type.mapping
+    field = None
+    for part in path.split("."):
+        if mapping is None or part not in mapping:
+            return None
+        field = mapping[part]
+        mapping = field._doc_class._doc_type.mapping if isinstance(field, Object) else None
+    return field
+
+
+def parse_iso_date(value):
+    """
+    ``datetime`` of an ISO 8601 ``value`` with dashes (``2022``,
+    ``2022-01-02``, ``2022-01-02T03:04:05.120Z``...), the ``Z`` suffix
+    included, which ``fromisoformat`` only reads from Python 3.11.
+    """
+    if YEAR.match(value):
+        return datetime.datetime(int(value), 1, 1)
+    if not ISO_DATE.match(value):
+        raise ValueError("Not an ISO 8601 date: {!r}".format(value))
+    return datetime.datetime.fromisoformat(value[:-1] + "+00:00" if value[-1:] in ("Z", "z") else value)
+
+
+def java_to_strptime(pattern):
+    """``strptime`` directives of a java date ``pattern``, ``None`` if it uses unsupported letters."""
+    directives = []
+    for token in JAVA_DATE_TOKEN.finditer(pattern):
+        quoted, letter, other = token.groups()
+        if letter:
+            directive = JAVA_DATE_LETTERS.get(token.group(0))
+            if directive is None:
+                return None
+            directives.append(directive)
+        else:
+            directives.append((quoted or other).replace("%", "%%"))
+    return "".join(directives)
+
+
+@functools.lru_cache(maxsize=None)
+def date_parser(format):
+    """
+    Parser of the string values of the date ``format`` (one of the ``||``
+    separated formats of a mapping), returning milliseconds or a
+    ``datetime``, ``None`` for the unsupported formats.
+    """
+    name = format[len("strict_"):] if format.startswith("strict_") else format
+    if name == "epoch_millis":
+        return lambda value: int(float(value))
+    if name == "epoch_second":
+        return lambda value: int(float(value) * 1000)
+    if name in ISO_DATE_FORMATS:
+        return parse_iso_date
+    pattern = NAMED_DATE_FORMATS.get(name) or java_to_strptime(format)
+    if pattern is None:
+        return None
+    return lambda value: datetime.datetime.strptime(value, pattern)
+
+
+def date_formats(field):
+    """Formats of the dsl ``Date`` field, the default format of elasticsearch if it has none."""
+    params = getattr(field, "_params", None) or {}
+    return (params.get("format") or DEFAULT_DATE_FORMAT).split("||")
+
+
+def parse_date(value, field=None):
+    """
+    Milliseconds or ``datetime`` of the string ``value`` of the ``Date``
+    field ``field``, parsed with the first of its formats that matches,
+    else with the parser of ``field``.
+    """
+    for format in date_formats(field):
+        parser = date_parser(format.strip())
+        if parser is None:
+            continue
+        try:
+            return parser(value)
+        except ValueError:
+            pass
+    if field is None:
+        raise ValueError("Could not parse date from the value ({!r})".format(value))
+    return field.deserialize(value)
+
+
+def source_arrow_type(pa, field):
+    """
+    pyarrow type of the ``_source`` values of the dsl ``field`` (dates are
+    kept as strings), ``None`` for the types that cannot be derived from the
+    mapping: dynamic objects, geo shapes...
+    """
+    name = getattr(field, "name", None)
+    if isinstance(field, Object):
+        mapping = field._doc_class._doc_type.mapping
+        children = [(child, source_arrow_type(pa, mapping[child])) for child in mapping]
+        if not children or any(type_ is None for _, type_ in children):
+            return None
+        type_ = pa.struct(children)
+    elif name in INT_TYPES:
+        type_ = pa.int64()
+    elif name in FLOAT_TYPES:
+        type_ = pa.float64()
+    elif name == "boolean":
+        type_ = pa.bool_()
+    elif name in STRING_TYPES:
+        type_ = pa.string()
+    else:
+        return None
+    return pa.list_(type_) if getattr(field, "_multi", False) else type_
+
+
+def arrow_schema(doc_class, fields, meta_id=False):
+    """
+    ``pyarrow.Schema`` of the columns of ``fields`` of ``doc_class``, typed
+    after the mapping so every page of an export has the same schema.
+    Columns whose type cannot be derived are JSON encoded strings, marked
+    with ``JSON_METADATA``.
+    """
+    pa = _import("pyarrow")
+    types = {
+        "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "datetime": pa.timestamp("ms", tz="UTC"),
+        "keyword": pa.dictionary(pa.int32(), pa.string()),
+    }
+    schema = [pa.field("_id", types["keyword"])] if meta_id else []
+    for path in fields:
+        field = resolve_field(doc_class, path)
+        kind = column_kind(field)
+        type_ = types[kind] if kind in types else source_arrow_type(pa, field)
+        if type_ is None:
+            schema.append(pa.field(path, pa.string(), metadata=JSON_METADATA))
+        else:
+            schema.append(pa.field(path, type_))
+    return pa.schema(schema)
+
+
+def to_epoch_millis(value, field=None):
+    """
+    Milliseconds since the epoch of a date value of a document: a number
+    (``epoch_millis``), a ``date`` / ``datetime`` or a string parsed by
+    :func:`parse_date`. Naive values are UTC.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = parse_date(value, field)
+        if isinstance(value, int):
+            return value
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return (value - EPOCH) // datetime.timedelta(milliseconds=1)
+
+
+def _import(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError("{} is required for this export, install it with 'pip install {}'.".format(
+            name, name.split(".")[0]))
+
+
+class Column(object):
+    """
+    Typed buffer of one field: ``values`` holds the values (``int64`` /
+    ``float64`` / ``int64`` milliseconds / ``int32`` codes in an
+    ``array.array``, a list for objects) and ``valid`` one byte per row, 0 for
+    the missing ones.
+    """
+
+    TYPECODES = {"int": "q", "float": "d", "bool": "b", "datetime": "q", "keyword": "i"}
+    MISSING = {"int": 0, "float": float("nan"), "bool": 0, "datetime": NAT, "keyword": -1}
+
+    def __init__(self, name, kind="object", field=None):
+        self.name = name
+        self.kind = kind
+        # dsl field of the mapping, parses the dates of custom formats
+        self.field = field
+        typecode = self.TYPECODES.get(kind)
+        self.values = array.array(typecode) if typecode is not None else []
+        self.valid = bytearray()
+        self.categories = {} if kind == "keyword" else None
+        self._missing = self.MISSING.get(kind)
+
+    def __repr__(self):
+        return "Column({!r}, kind={!r}, rows={})".format(self.name, self.kind, len(self))
+
+    def __len__(self):
+        return len(self.valid)
+
+    @property
+    def null_count(self):
+        return len(self.valid) - sum(self.valid)
+
+    def append(self, value):
+        if value is None or value == []:
+            self.values.append(self._missing)
+            self.valid.append(0)
+            return
+        if isinstance(value, list) and self.kind != "object":
+            raise ValueError(
+                "Field {!r} has several values, it can only be exported as an object column.".format(self.name)
+            )
+        if self.kind == "keyword":
+            value = self.categories.setdefault(value, len(self.categories))
+        elif self.kind == "datetime":
+            value = to_epoch_millis(value, self.field)
+        elif self.kind == "bool":
+            value = int(value in (True, "true"))
+        self.values.append(value)
+        self.valid.append(1)
+
+    def dictionary(self):
+        """Values of the codes of a keyword column, in code order."""
+        return list(self.categories)
+
+    def to_pylist(self):
+        """Values of the column as Python objects, ``None`` for missing ones."""
+        if self.kind == "keyword":
+            dictionary = self.dictionary()
+            return [dictionary[v] if ok else None for v, ok in zip(self.values, self.valid)]
+        if self.kind == "datetime":
+            return [
+                EPOCH + datetime.timedelta(milliseconds=v) if ok else None for v, ok in zip(self.values, self.valid)
+            ]
+        if self.kind == "bool":
+            return [bool(v) if ok else None for v, ok in zip(self.values, self.valid)]
+        return [v if ok else None for v, ok in zip(self.values, self.valid)]
+
+    def to_numpy(self):
+        """
+        NumPy array sharing the buffer of the column. Missing values are NaN /
+        NaT / code -1, integer and boolean columns with missing values are
+        masked arrays.
+        """
+        np = _import("numpy")
+        if self.kind == "object":
+            result = np.empty(len(self.values), dtype=object)
+            result[:] = self.values
+            return result
+        dtype = {"int": np.int64, "float": np.float64, "bool": np.int8, "datetime": "datetime64[ms]",
+                 "keyword": np.int32}[self.kind]
+        result = np.frombuffer(self.values, dtype=np.int64 if self.kind == "datetime" else dtype)
+        if self.kind == "datetime":
+            result = result.view(dtype)
+        elif self.kind == "bool":
+            result = result.view(np.bool_)
+        if self.kind in ("int", "bool") and self.null_count:
+            mask = np.frombuffer(self.valid, dtype=np.uint8) == 0
+            result = np.ma.masked_array(result, mask=mask)
+        return result
+
+    def to_arrow(self, field=None):
+        """
+        pyarrow array of the column, keywords as a ``DictionaryArray``.
+        Object columns are typed after ``field`` (a ``pyarrow.Field``) when
+        given, as JSON strings if it has ``JSON_METADATA``.
+        """
+        pa = _import("pyarrow")
+        if self.kind == "object":
+            if field is None:
+                return pa.array(self.to_pylist())
+            if field.metadata == JSON_METADATA:
+                return pa.array([json.dumps(v) if v is not None else None for v in self.to_pylist()], pa.string())
+            return pa.array(self.to_pylist(), field.type)
+        validity = pa.py_buffer(pack_bits(self.valid)) if self.null_count else None
+        if self.kind == "keyword":
+            indices = pa.Array.from_buffers(pa.int32(), len(self), [validity, pa.py_buffer(self.values)])
+            return pa.DictionaryArray.from_arrays(indices, pa.array(self.dictionary(), type=pa.string()))
+        if self.kind == "bool":
+            return pa.Array.from_buffers(pa.bool_(), len(self), [validity, pa.py_buffer(pack_bits(self.values))])
+        type_ = {"int": pa.int64(), "float": pa.float64(), "datetime": pa.timestamp("ms", tz="UTC")}[self.kind]
+        return pa.Array.from_buffers(type_, len(self), [validity, pa.py_buffer(self.values)])
+
+
+def pack_bits(flags):
+    """Little endian bitmap of a sequence of 0 / 1 bytes, as used by Arrow."""
+    packed = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+class Columns(object):
+    """
+    Ordered columns of the same length, returned by
+    ``Document.search_to_columns()`` and :func:`aggregations_to_columns`.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._by_name = {c.name: c for c in self.columns}
+
+    def __repr__(self):
+        return "Columns({}, rows={})".format([c.name for c in self.columns], len(self))
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    @property
+    def names(self):
+        return [c.name for c in self.columns]
+
+    def append_row(self, values):
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def to_pydict(self):
+        return {c.name: c.to_pylist() for c in self.columns}
+
+    def to_numpy(self):
+        """``{name: numpy array}``, see :meth:`Column.to_numpy`."""
+        return {c.name: c.to_numpy() for c in self.columns}
+
+    def to_arrow(self, schema=None):
+        """
+        ``pyarrow.RecordBatch`` of the columns, of ``schema`` (eg. from
+        :func:`arrow_schema`) when given.
+        """
+        pa = _import("pyarrow")
+        if schema is None:
+            return pa.RecordBatch.from_arrays([c.to_arrow() for c in self.columns], names=self.names)
+        arrays = [c.to_arrow(schema.field(c.name)) for c in self.columns]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def source_value(source, path):
+    value = source
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def hits_to_columns(doc_class, fields, pages, meta_id=False):
+    """
+    :class:`Columns` of ``fields`` (dotted paths) of ``doc_class`` filled from
+    ``pages``, an iterable of lists of raw hits.
+    """
+    columns = []
+    for path in fields:
+        field = resolve_field(doc_class, path)
+        columns.append(Column(path, column_kind(field), field))
+    if meta_id:
+        columns.insert(0, Column("_id", "keyword"))
+    result = Columns(columns)
+    for hits in pages:
+        for hit in hits:
+            source = hit.get("_source", {})
+            for column in columns:
+                column.append(hit["_id"] if column.name == "_id" else source_value(source, column.name))
+    return result
+
+
+def flatten_buckets(aggregations, row=None):
+    """
+    Rows of the leaf buckets of bucket aggregations: one ``{name: value}``
+    dict per bucket holding the key of every enclosing bucket (under the name
+    of its aggregation), its ``doc_count`` and the ``value`` of the metric
+    sub aggregations.
+    """
+    row = row or {}
+    rows = []
+    for name, agg in aggregations.items():
+        if not isinstance(agg, dict) or "buckets" not in agg:
+            continue
+        buckets = agg["buckets"]
+        if isinstance(buckets, dict):
+            # keyed / filters aggregations
+            buckets = [dict(b, key=key) for key, b in buckets.items()]
+        for bucket in buckets:
+            bucket_row = dict(row)
+            bucket_row[name] = bucket.get("key_as_string", bucket.get("key"))
+            sub_rows = flatten_buckets(bucket, bucket_row)
+            if sub_rows:
+                rows.extend(sub_rows)
+                continue
+            bucket_row["doc_count"] = bucket.get("doc_count")
+            for sub_name, sub in bucket.items():
+                if isinstance(sub, dict) and "value" in sub:
+                    bucket_row[sub_name] = sub["value"]
+            rows.append(bucket_row)
+    return rows
+
+
+def aggregations_to_columns(aggregations):
+    """
+    :class:`Columns` of the leaf buckets of ``aggregations`` (the
+    ``aggregations`` of a search response), see :func:`flatten_buckets`.
+    Counts are ``int64``, metrics ``float64`` and keys typed after their
+    values.
+    """
+    if hasattr(aggregations, "to_dict"):
+        aggregations = aggregations.to_dict()
+    rows = flatten_buckets(aggregations)
+    names = []
+    for row in rows:
+        names.extend(n for n in row if n not in names)
+    columns = []
+    for name in names:
+        values = [row.get(name) for row in rows if row.get(name) is not None]
+        if name == "doc_count" or (values and all(isinstance(v, int) and not isinstance(v, bool) for v in values)):
+            kind = "int"
+        elif values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            kind = "float"
+        elif values and all(isinstance(v, str) for v in values):
+            kind = "keyword"
+        else:
+            kind = "object"
+        columns.append(Column(name, kind))
+    result = Columns(columns)
+    for row in rows:
+        result.append_row([row.get(name) for name in names])
+    return result
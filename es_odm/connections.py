@@ -0,0 +1,29 @@
+from elasticsearch_dsl.connections import Connections
+from elasticsearch_dsl.serializer import serializer
+
+
+class AsyncConnections(Connections):
+    """
+    Same registry as ``elasticsearch_dsl.connections`` but holding
+    ``elasticsearch.AsyncElasticsearch`` clients, one per ``using`` alias.
+    """
+
+    def create_connection(self, alias="default", **kwargs):
+        """
+        Construct an instance of ``elasticsearch.AsyncElasticsearch`` and
+        register it under given alias.
+        """
+        # AsyncElasticsearch needs the optional aiohttp dependency
+        from elasticsearch import AsyncElasticsearch
+
+        kwargs.setdefault("serializer", serializer)
+        conn = self._conns[alias] = AsyncElasticsearch(**kwargs)
+        return conn
+
+
+async_connections = AsyncConnections()
+configure_async = async_connections.configure
+add_async_connection = async_connections.add_connection
+remove_async_connection = async_connections.remove_connection
+create_async_connection = async_connections.create_connection
+get_async_connection = async_connections.get_connection
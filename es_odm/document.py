@@ -1,17 +1,170 @@
+import asyncio
+import collections
 import collections.abc as collections_abc
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from fnmatch import fnmatch
 from six import iteritems
 
 from elasticsearch.exceptions import NotFoundError, RequestError
 from elasticsearch_dsl.document import Index, Mapping, MetaField, ObjectBase
-from elasticsearch_dsl.field import Field
+from elasticsearch_dsl.field import Field, Object
 from elasticsearch_dsl.connections import get_connection
 from elasticsearch_dsl.exceptions import IllegalOperation, ValidationException
 from elasticsearch_dsl.search import Search
-from elasticsearch_dsl.utils import DOC_META_FIELDS, META_FIELDS, merge
+from elasticsearch_dsl.utils import DOC_META_FIELDS, META_FIELDS, AttrDict, AttrList, merge
 from pydantic.typing import update_model_forward_refs
 
+from es_odm.async_search import AsyncSearch
+from es_odm.cache import LRUCache, QueryCache
+from es_odm.columns import aggregations_to_columns, hits_to_columns
+from es_odm.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CHUNK_BYTES,
+    BulkResult,
+    as_doc_id,
+    build_action,
+    chunk_actions,
+    doc_meta,
+    send_chunk,
+)
+from es_odm.bulk_load import bulk_load_mode
+from es_odm import transfer
+from es_odm.connections import get_async_connection
 from es_odm.field import get_dsl_field
+from es_odm.ingest import parallel_ingest
+from es_odm.instrumentation import instrumented, operation
+from es_odm.projection import Projection
+from es_odm.search import ESSearch
+from es_odm.serialization import DocSerializer
+from es_odm.validation import validate_many
+from es_odm.views import view_class
+
+
+MGET_CHUNK_SIZE = 1000
+# search params that apply to the opening of a point in time
+PIT_PARAMS = ("routing", "preference", "ignore_unavailable", "expand_wildcards")
+
+
+def inner_doc_fields(doc_class):
+    """
+    ``(name, inner doc class)`` of the ``Object`` / ``Nested`` fields of a
+    document class, computed once per class.
+    """
+    opts = doc_class._doc_type
+    inner_docs = getattr(opts, "inner_docs", None)
+    if inner_docs is None:
+        inner_docs = opts.inner_docs = [
+            (name, opts.mapping[name]._doc_class)
+            for name in opts.mapping
+            if isinstance(opts.mapping[name], Object)
+        ]
+    return inner_docs
+
+
+def load_source(doc, data, from_dict):
+    """
+    Load ``data`` into ``doc`` with ``from_dict`` (``ObjectBase._from_dict``),
+    the values of the lazy ``Object`` / ``Nested`` fields are kept raw until
+    they are read, see :func:`decode_lazy`.
+    """
+    lazy = getattr(doc._doc_type, "lazy_fields", None)
+    raw = [name for name in lazy if name in data] if lazy else None
+    if not raw:
+        return from_dict(data)
+    from_dict({k: v for k, v in iteritems(data) if k not in lazy})
+    for name in raw:
+        doc._d_[name] = data[name]
+    doc.__dict__["_raw"] = set(raw)
+
+
+def decode_lazy(doc, name):
+    """Build the inner documents of the raw value of the lazy field ``name``."""
+    doc.__dict__["_raw"].discard(name)
+    value = doc._d_.get(name)
+    if value is not None:
+        # decoding is not a change
+        doc._d_[name] = doc._doc_type.mapping[name].deserialize(value)
+
+
+def construct(doc_class, data, meta=None):
+    """
+    Build an instance of ``doc_class`` from trusted elasticsearch data without
+    coercing or validating the values, the way pydantic's ``construct()``
+    does. Only the inner documents of ``Object`` / ``Nested`` fields are
+    built, recursively, unless the field is lazy. ``data`` is used in place.
+    """
+    lazy = getattr(doc_class._doc_type, "lazy_fields", ())
+    for name, inner_class in inner_doc_fields(doc_class):
+        if name in lazy:
+            continue
+        value = data.get(name)
+        if isinstance(value, dict):
+            data[name] = construct(inner_class, value)
+        elif isinstance(value, list):
+            data[name] = [construct(inner_class, v) if isinstance(v, dict) else v for v in value]
+    doc = doc_class(meta=meta)
+    super(AttrDict, doc).__setattr__("_d_", data)
+    raw = [name for name in lazy if name in data] if lazy else None
+    if raw:
+        doc.__dict__["_raw"] = set(raw)
+    return doc
+
+
+def mark_dirty(doc, name):
+    doc.__dict__.setdefault("_dirty", set()).add(name)
+
+
+def default_value(doc, getattr_, name):
+    value = getattr_(name)
+    dirty = doc.__dict__.get("_dirty")
+    if dirty:
+        dirty.discard(name)
+    return value
+
+
+def _any_dirty(value):
+    if isinstance(value, AttrList):
+        value = value._l_
+    if isinstance(value, list):
+        return any(_any_dirty(v) for v in value)
+    return isinstance(value, ObjectBase) and bool(dirty_fields(value))
+
+
+def dirty_fields(doc):
+    """
+    Names of the fields of ``doc`` assigned since it was loaded or saved,
+    including the ``Object`` / ``Nested`` fields whose inner documents were
+    modified.
+    """
+    dirty = set(doc.__dict__.get("_dirty", ()))
+    for name, _ in inner_doc_fields(type(doc)):
+        if name not in dirty and _any_dirty(doc._d_.get(name)):
+            dirty.add(name)
+    return dirty
+
+
+def clear_dirty(doc, names=None):
+    """
+    Reset the tracking of ``names`` (all the fields by default) of ``doc``
+    and of their inner documents.
+    """
+    dirty = doc.__dict__.get("_dirty")
+    if dirty is not None:
+        if names is None:
+            del doc.__dict__["_dirty"]
+        else:
+            dirty.difference_update(names)
+    for name, _ in inner_doc_fields(type(doc)):
+        if names is not None and name not in names:
+            continue
+        value = doc._d_.get(name)
+        if isinstance(value, AttrList):
+            value = value._l_
+        for v in value if isinstance(value, list) else [value]:
+            if isinstance(v, ObjectBase):
+                clear_dirty(v)
 
 
 # copy from elasticsearch_dsl
@@ -20,11 +173,54 @@ class InnerDoc(ObjectBase):
     Common class for inner documents like Object or Nested
     """
 
+    # fields loaded on partial instances, see Document.only()
+    _projection = None
+
+    def __getattr__(self, name):
+        if self._projection is not None:
+            self._projection.check(self, name)
+        raw = self.__dict__.get("_raw")
+        if raw and name in raw:
+            decode_lazy(self, name)
+        if name not in self._d_:
+            # reading a missing field assigns its empty value, it is not a change
+            return default_value(self, super(InnerDoc, self).__getattr__, name)
+        return super(InnerDoc, self).__getattr__(name)
+
+    def __init__(self, meta=None, **kwargs):
+        super(InnerDoc, self).__init__(meta, **kwargs)
+        # every field of a new instance is a change
+        for name in kwargs:
+            if name in self._doc_type.mapping:
+                mark_dirty(self, name)
+
+    def __setattr__(self, name, value):
+        super(InnerDoc, self).__setattr__(name, value)
+        if name in self._doc_type.mapping:
+            mark_dirty(self, name)
+            raw = self.__dict__.get("_raw")
+            if raw:
+                raw.discard(name)
+
+    def _from_dict(self, data):
+        load_source(self, data, super(InnerDoc, self)._from_dict)
+
     @classmethod
-    def from_es(cls, data, data_only=False):
+    def from_es(cls, data, data_only=False, trusted=False):
         if data_only:
             data = {"_source": data}
-        return super(InnerDoc, cls).from_es(data)
+        if trusted:
+            meta = data.copy()
+            return construct(cls, meta.pop("_source", {}), meta)
+        doc = super(InnerDoc, cls).from_es(data)
+        doc.__dict__.pop("_dirty", None)
+        return doc
+
+    def to_dict(self, skip_empty=True):
+        return self._doc_type.serializer.to_dict(self._d_, skip_empty)
+
+    def _to_body(self, skip_empty=True):
+        return self._doc_type.serializer.to_dict(self._d_, skip_empty, body=True)
 
     # for pydantic 1.9.0
     @classmethod
@@ -42,6 +238,42 @@ class Document(ObjectBase):
     Model-like class for persisting documents in elasticsearch.
     """
 
+    # read-through cache of get/mget, configured by the ``Cache`` inner class
+    _cache = None
+    # cache of the search responses, configured by the ``SearchCache`` inner class
+    _search_cache = None
+    # fields loaded on partial instances, see only()
+    _projection = None
+
+    def __getattr__(self, name):
+        if self._projection is not None:
+            self._projection.check(self, name)
+        raw = self.__dict__.get("_raw")
+        if raw and name in raw:
+            decode_lazy(self, name)
+        if name not in self._d_:
+            # reading a missing field assigns its empty value, it is not a change
+            return default_value(self, super(Document, self).__getattr__, name)
+        return super(Document, self).__getattr__(name)
+
+    def __init__(self, meta=None, **kwargs):
+        super(Document, self).__init__(meta, **kwargs)
+        # every field of a new instance is a change
+        for name in kwargs:
+            if name in self._doc_type.mapping:
+                mark_dirty(self, name)
+
+    def __setattr__(self, name, value):
+        super(Document, self).__setattr__(name, value)
+        if name in self._doc_type.mapping:
+            mark_dirty(self, name)
+            raw = self.__dict__.get("_raw")
+            if raw:
+                raw.discard(name)
+
+    def _from_dict(self, data):
+        load_source(self, data, super(Document, self)._from_dict)
+
     @classmethod
     def _matches(cls, hit):
         if cls._index._name is None:
@@ -54,7 +286,7 @@ class Document(ObjectBase):
 
     @classmethod
     def _get_connection(cls, using=None):
-        return get_connection(cls._get_using(using))
+        return instrumented(get_connection(cls._get_using(using)))
 
     @classmethod
     def _default_index(cls, index=None):
@@ -70,6 +302,40 @@ class Document(ObjectBase):
             i = i.clone(name=index)
         i.save(using=using)
 
+    @classmethod
+    def bulk_load_mode(cls, index=None, using=None, settings=None, refresh=True, forcemerge=False,
+                       max_num_segments=None, wait_for_status="yellow", timeout=None):
+        """
+        Context manager tuning the index for a large ingestion: periodic
+        refreshes and replicas are disabled (see
+        :data:`~es_odm.bulk_load.BULK_LOAD_SETTINGS`) until the block exits::
+
+            with UserODM.bulk_load_mode(index="users-v2"):
+                UserODM.bulk_save(users, index="users-v2")
+
+        The index is created by :meth:`init` if it does not exist. On exit the
+        settings declared in ``class Index``, or else the previous values, are
+        restored, even when the block fails. When it succeeds the index is
+        then refreshed, optionally force merged, and its health awaited.
+
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg settings: extra settings to apply during the block, they are
+            restored too
+        :arg refresh: refresh the index after the block
+        :arg forcemerge: force merge the index after the block
+        :arg max_num_segments: ``max_num_segments`` of the force merge
+        :arg wait_for_status: health status to wait for after the block,
+            ``None`` to not wait. ``'green'`` also waits for the restored
+            replicas to be allocated, which never happens on a single node
+        :arg timeout: how long to wait for ``wait_for_status``
+        """
+        return bulk_load_mode(
+            cls, index=index, using=using, settings=settings, refresh=refresh, forcemerge=forcemerge,
+            max_num_segments=max_num_segments, wait_for_status=wait_for_status, timeout=timeout,
+        )
+
     def _get_index(self, index=None, required=True):
         if index is None:
             index = getattr(self.meta, "index", None)
@@ -92,17 +358,283 @@ class Document(ObjectBase):
         )
 
     @classmethod
-    def search(cls, using=None, index=None):
+    def from_es(cls, hit, trusted=False):
+        """
+        Build an instance from a hit returned by elasticsearch.
+
+        :arg trusted: set to ``True`` to skip the coercion of every value
+            (eg. dates are kept as strings), only the inner documents of
+            ``Object`` / ``Nested`` fields are built. Much faster for large
+            result sets coming straight from elasticsearch.
+        """
+        if trusted:
+            meta = hit.copy()
+            return construct(cls, meta.pop("_source", {}), meta)
+        doc = super(Document, cls).from_es(hit)
+        # inner documents reset their own tracking in InnerDoc.from_es
+        doc.__dict__.pop("_dirty", None)
+        return doc
+
+    @classmethod
+    def view_class(cls):
+        """
+        Read-only :class:`~es_odm.views.HitView` class of this ``Document``,
+        with one ``__slots__`` entry per field holding the raw ``_source``
+        value. Returned by ``search().views()`` and ``mget(view=True)``.
+        """
+        return view_class(cls)
+
+    @classmethod
+    def search(cls, using=None, index=None, trusted=False):
         """
-        Create an :class:`~elasticsearch_dsl.Search` instance that will search
+        Create an :class:`~es_odm.search.ESSearch` instance that will search
         over this ``Document``.
+
+        :arg trusted: build the hits without coercion, see :meth:`from_es`
         """
-        return Search(
+        return ESSearch(
             using=cls._get_using(using), index=cls._default_index(index), doc_type=[cls]
-        )
+        ).trusted(trusted)
 
     @classmethod
-    def get(cls, id, using=None, index=None, **kwargs):
+    def only(cls, *fields):
+        """
+        Projection loading only ``fields`` (dotted paths for the fields of
+        inner documents) from ``_source``::
+
+            UserODM.only("id", "username", "profile.nickname").get(42)
+
+        The instances built are partial, accessing any other field raises
+        :class:`~es_odm.projection.FieldNotLoaded`.
+        """
+        return Projection(cls, includes=fields)
+
+    @classmethod
+    def defer(cls, *fields):
+        """
+        Projection loading all the fields but ``fields``, see :meth:`only`.
+        """
+        return Projection(cls, excludes=fields)
+
+    def _check_complete(self):
+        if self._projection is not None:
+            raise IllegalOperation(
+                "Cannot save a partial {} loaded through a projection, use update() instead.".format(
+                    self.__class__.__name__
+                )
+            )
+
+    @classmethod
+    def iter_all(cls, query=None, batch_size=1000, fields=None, keep_alive="1m", using=None, index=None,
+                 trusted=False):
+        """
+        Iterate over all the documents matching ``query`` using a point in time
+        and ``search_after``, so it is not limited to the first 10k hits. Only
+        one page is kept in memory and every hit is built into an instance only
+        when it is consumed. The point in time is closed when the generator is
+        exhausted or closed early.
+
+        :arg query: a :class:`~elasticsearch_dsl.Search` (eg. built from
+            ``search()``), a query object or a query dict, defaults to all
+            documents. The connection, index, params and slice of a
+            ``Search`` are used.
+        :arg batch_size: number of hits fetched per request
+        :arg fields: only load these fields from ``_source``
+        :arg keep_alive: how long the point in time is kept between requests
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg trusted: build the hits without coercion, see :meth:`from_es`
+        """
+        for hits in cls._iter_pages(query, batch_size, fields, keep_alive, using, index):
+            for hit in hits:
+                yield cls.from_es(hit, trusted=trusted)
+
+    @classmethod
+    def _iter_pages(cls, query=None, batch_size=1000, fields=None, keep_alive="1m", using=None, index=None):
+        """
+        Raw hits of ``iter_all``, a page at a time. A ``Search`` brings its
+        connection, index and params (``routing``, ``preference``...) unless
+        ``using`` / ``index`` are given, and its slice limits the hits.
+        """
+        params = {}
+        if isinstance(query, Search):
+            s = query
+            using = using or s._using
+            index = index or s._index
+            params = dict(s._params)
+        else:
+            s = cls.search(using=using, index=index)
+            if isinstance(query, collections_abc.Mapping):
+                s = s.update_from_dict({"query": query})
+            elif query is not None:
+                s = s.query(query)
+        if fields is not None:
+            s = s.source(includes=list(fields))
+        if "scroll" in params:
+            raise ValueError("iter_all pages with a point in time, it cannot be used with a scroll search.")
+        # the point in time is opened on the index, the searches are sent without it
+        pit_params = {k: params.pop(k) for k in PIT_PARAMS if k in params}
+
+        body = s.to_dict()
+        # search_after pages from the start, from is skipped client side
+        skip = int(body.pop("from", 0))
+        size = body.pop("size", None)
+        remaining = None if size is None else skip + int(size)
+        # _shard_doc is a stable tiebreaker that is only available with a point in time
+        body["sort"] = body.get("sort", []) + [{"_shard_doc": "asc"}]
+        # aggregations would be computed again for every page
+        body.pop("aggs", None)
+        if remaining == 0:
+            return
+
+        es = cls._get_connection(using)
+        pit_id = es.open_point_in_time(index=cls._default_index(index), keep_alive=keep_alive, **pit_params)["id"]
+        try:
+            while True:
+                body["size"] = batch_size if remaining is None else min(batch_size, remaining)
+                body["pit"] = {"id": pit_id, "keep_alive": keep_alive}
+                response = es.search(body=body, **params)
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                if not hits:
+                    return
+                body["search_after"] = hits[-1]["sort"]
+                last = len(hits) < body["size"]
+                if remaining is not None:
+                    remaining -= len(hits)
+                    last = last or remaining <= 0
+                if skip:
+                    hits, skip = hits[skip:], max(0, skip - len(hits))
+                if hits:
+                    yield hits
+                if last:
+                    return
+                # release the consumed page before fetching the next one
+                del hits, response
+        finally:
+            es.close_point_in_time(body={"id": pit_id}, ignore=(404,))
+
+    @classmethod
+    def search_to_columns(cls, query=None, fields=None, batch_size=1000, keep_alive="1m", using=None, index=None,
+                          with_id=False):
+        """
+        Export ``fields`` of all the documents matching ``query`` as
+        :class:`~es_odm.columns.Columns`, typed after the mapping and ready
+        for ``to_numpy()`` / ``to_arrow()``. Pages are fetched like
+        :meth:`iter_all` and their values written straight into the column
+        buffers, no instance is built.
+
+        :arg query: same as :meth:`iter_all`
+        :arg fields: dotted paths of the fields to export, all the fields of
+            the mapping by default
+        :arg with_id: add the ``_id`` of the hits as the first column
+        """
+        if fields is None:
+            fields = list(cls._doc_type.mapping)
+        pages = cls._iter_pages(query, batch_size, fields, keep_alive, using, index)
+        return hits_to_columns(cls, fields, pages, meta_id=with_id)
+
+    @classmethod
+    def aggs_to_columns(cls, query):
+        """
+        Run the aggregations of ``query`` (a :class:`~elasticsearch_dsl.Search`)
+        without hits and return their leaf buckets as
+        :class:`~es_odm.columns.Columns`, one row per bucket.
+        """
+        return aggregations_to_columns(query.extra(size=0).execute().aggregations)
+
+    @classmethod
+    def cache_info(cls):
+        """
+        Hits, misses and evictions of the ``get`` / ``mget`` cache of this
+        ``Document``, ``None`` when it has no ``Cache`` configured.
+        """
+        return cls._cache.info() if cls._cache is not None else None
+
+    @classmethod
+    def _cache_key(cls, using, index, id):
+        """
+        Key of a hit in the ``get`` / ``mget`` cache: the connection alias,
+        the requested index (an alias or the ``Index.name`` by default) and
+        the ``id``.
+        """
+        return cls._get_using(using), cls._default_index(index), str(id)
+
+    @classmethod
+    def _cached_hit(cls, using, index, id):
+        hit = cls._cache.get(cls._cache_key(using, index, id))
+        # hits are stored raw and hydrated on every read, the instances
+        # returned are never shared between callers
+        return copy.deepcopy(hit) if hit is not None else None
+
+    @classmethod
+    def _cache_hit(cls, using, index, id, hit):
+        cls._cache.set(cls._cache_key(using, index, id), copy.deepcopy(hit))
+
+    @classmethod
+    def _invalidate_id(cls, index, id, using=None):
+        """
+        Drop the cached hit of ``id`` written to ``index``. Reads go through
+        the ``Index.name`` of the class by default, often an alias while
+        writes report the concrete index, so that entry is dropped too.
+        """
+        if cls._cache is not None and id is not None:
+            for name in {cls._default_index(index), cls._default_index()}:
+                cls._cache.delete(cls._cache_key(using, name, id))
+
+    def _invalidate_cache(self, index=None, using=None):
+        if self._cache is not None and "id" in self.meta:
+            self._invalidate_id(self._get_index(index), self.meta.id, using)
+        self._invalidate_search_cache()
+
+    @classmethod
+    def search_cache_info(cls):
+        """
+        Hits and misses of the search cache of this ``Document``, ``None``
+        when it has no ``SearchCache`` configured.
+        """
+        return cls._search_cache.info() if cls._search_cache is not None else None
+
+    @classmethod
+    def _invalidate_search_cache(cls):
+        if cls._search_cache is not None and cls._search_cache.invalidate_on_write:
+            cls._search_cache.invalidate()
+
+    @classmethod
+    def _mget_from_cache(cls, docs, index, using=None):
+        """
+        Split the requested ``docs`` into the hits found in the cache (by
+        position) and the docs that still have to be fetched.
+        """
+        cached, to_fetch = [], []
+        for doc in docs:
+            hit = None
+            if not isinstance(doc, collections_abc.Mapping):
+                hit = cls._cached_hit(using, index, doc)
+            cached.append(hit)
+            if hit is None:
+                to_fetch.append(doc)
+        return cached, to_fetch
+
+    @classmethod
+    def _mget_merge(cls, docs, cached, fetched, index, using=None):
+        """
+        Rebuild the ``mget`` response in the requested order from the cached
+        hits and the fetched ones, caching the latter.
+        """
+        fetched = iter(fetched)
+        merged = []
+        for doc, hit in zip(docs, cached):
+            if hit is None:
+                hit = next(fetched)
+                if hit.get("found") and not isinstance(doc, collections_abc.Mapping):
+                    cls._cache_hit(using, index, doc, hit)
+            merged.append(hit)
+        return {"docs": merged}
+
+    @classmethod
+    def get(cls, id, using=None, index=None, trusted=False, **kwargs):
         """
         Retrieve a single document from elasticsearch using its ``id``.
 
@@ -110,15 +642,34 @@ class Document(ObjectBase):
         :arg index: elasticsearch index to use, if the ``Document`` is
             associated with an index this can be omitted.
         :arg using: connection alias to use, defaults to ``'default'``
+        :arg trusted: build the instance without coercion, see :meth:`from_es`
 
         Any additional keyword arguments will be passed to
         ``Elasticsearch.get`` unchanged.
         """
-        es = cls._get_connection(using)
-        doc = es.get(index=cls._default_index(index), id=id, **kwargs)
-        if not doc.get("found", False):
-            return None
-        return cls.from_es(doc)
+        index = cls._default_index(index)
+        with operation("get", cls, index) as op:
+            # requests with extra parameters (routing, source filtering...) bypass the cache
+            cached = cls._cache is not None and not kwargs
+            if cached:
+                doc = cls._cached_hit(using, index, id)
+                if doc is not None:
+                    op.cached = True
+                    op.hits = 1
+                    with op.phase("hydrate"):
+                        return cls.from_es(doc, trusted=trusted)
+
+            es = cls._get_connection(using)
+            with op.phase("request"):
+                doc = es.get(index=index, id=id, **kwargs)
+            if not doc.get("found", False):
+                op.hits = 0
+                return None
+            if cached:
+                cls._cache_hit(using, index, id, doc)
+            op.hits = 1
+            with op.phase("hydrate"):
+                return cls.from_es(doc, trusted=trusted)
 
     @classmethod
     def exists(cls, id, using=None, index=None, **kwargs):
@@ -138,7 +689,17 @@ class Document(ObjectBase):
 
     @classmethod
     def mget(
-        cls, docs, using=None, index=None, raise_on_error=True, missing="none", **kwargs
+        cls,
+        docs,
+        using=None,
+        index=None,
+        raise_on_error=True,
+        missing="none",
+        trusted=False,
+        view=False,
+        chunk_size=MGET_CHUNK_SIZE,
+        concurrency=1,
+        **kwargs
     ):
         r"""
         Retrieve multiple document by their ``id``\s. Returns a list of instances
@@ -153,6 +714,12 @@ class Document(ObjectBase):
         :arg missing: what to do when one of the documents requested is not
             found. Valid options are ``'none'`` (use ``None``), ``'raise'`` (raise
             ``NotFoundError``) or ``'skip'`` (ignore the missing document).
+        :arg trusted: build the instances without coercion, see :meth:`from_es`
+        :arg view: return read-only :class:`~es_odm.views.HitView` instead of
+            instances, see :meth:`view_class`
+        :arg chunk_size: maximum number of documents per request, ``None``
+            to request all of them at once
+        :arg concurrency: number of chunks requested in parallel
 
         Any additional keyword arguments will be passed to
         ``Elasticsearch.mget`` unchanged.
@@ -160,14 +727,142 @@ class Document(ObjectBase):
         if missing not in ("raise", "skip", "none"):
             raise ValueError("'missing' must be 'raise', 'skip', or 'none'.")
         es = cls._get_connection(using)
-        body = {
+        index = cls._default_index(index)
+        with operation("mget", cls, index) as op:
+            with op.phase("request"):
+                results = cls._mget_docs(es, docs, index, chunk_size, concurrency, using, **kwargs)
+            op.hits = sum(1 for doc in results["docs"] if doc.get("found"))
+            with op.phase("hydrate"):
+                return cls._mget_results(results, raise_on_error, missing, trusted, view)
+
+    @classmethod
+    def imget(
+        cls,
+        docs,
+        using=None,
+        index=None,
+        raise_on_error=True,
+        missing="none",
+        trusted=False,
+        view=False,
+        chunk_size=MGET_CHUNK_SIZE,
+        concurrency=1,
+        **kwargs
+    ):
+        r"""
+        Same as :meth:`mget` but returns a generator: ``docs`` (which can be
+        a generator too) are requested ``chunk_size`` at a time and only the
+        instances of the chunk being consumed are kept in memory. With
+        ``concurrency`` greater than one the next chunks are fetched while the
+        current one is consumed.
+
+        Errors and missing documents (``missing='raise'``) are raised when
+        the chunk containing them is reached, after the instances of the
+        previous chunks have been yielded.
+        """
+        if missing not in ("raise", "skip", "none"):
+            raise ValueError("'missing' must be 'raise', 'skip', or 'none'.")
+        es = cls._get_connection(using)
+        index = cls._default_index(index)
+
+        def chunks():
+            chunk = []
+            for doc in docs:
+                chunk.append(doc)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = collections.deque()
+            for chunk in chunks():
+                pending.append(executor.submit(cls._mget_docs, es, chunk, index, None, 1, using, **kwargs))
+                if len(pending) >= concurrency:
+                    for obj in cls._mget_results(pending.popleft().result(), raise_on_error, missing, trusted, view):
+                        yield obj
+            while pending:
+                for obj in cls._mget_results(pending.popleft().result(), raise_on_error, missing, trusted, view):
+                    yield obj
+
+    @classmethod
+    def _mget_chunks(cls, docs, chunk_size):
+        if not docs:
+            return []
+        if not chunk_size:
+            return [docs]
+        return [docs[i:i + chunk_size] for i in range(0, len(docs), chunk_size)]
+
+    @classmethod
+    def _mget_fetch(cls, es, docs, index, chunk_size=None, concurrency=1, **kwargs):
+        """
+        Request ``docs`` in chunks, concurrently if asked to, and return the
+        ``docs`` of the responses in the requested order.
+        """
+        chunks = cls._mget_chunks(docs, chunk_size)
+
+        def fetch(chunk):
+            return es.mget(cls._mget_body(chunk), index=index, **kwargs)["docs"]
+
+        if concurrency > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+                responses = list(executor.map(fetch, chunks))
+        else:
+            responses = map(fetch, chunks)
+        return [doc for response in responses for doc in response]
+
+    @classmethod
+    def _mget_docs(cls, es, docs, index, chunk_size=None, concurrency=1, using=None, **kwargs):
+        """
+        ``mget`` response for ``docs``, going through the cache if the
+        ``Document`` has one.
+        """
+        docs = list(docs)
+        # requests with extra parameters (routing, source filtering...) bypass the cache
+        if cls._cache is None or kwargs:
+            return {"docs": cls._mget_fetch(es, docs, index, chunk_size, concurrency, **kwargs)}
+
+        # only request the ids missing from the cache
+        cached, to_fetch = cls._mget_from_cache(docs, index, using)
+        fetched = cls._mget_fetch(es, to_fetch, index, chunk_size, concurrency)
+        return cls._mget_merge(docs, cached, fetched, index, using)
+
+    @classmethod
+    async def _amget_docs(cls, es, docs, index, chunk_size=None, concurrency=1, using=None, **kwargs):
+        """
+        Async version of :meth:`_mget_docs`.
+        """
+        docs = list(docs)
+        use_cache = cls._cache is not None and not kwargs
+        if use_cache:
+            cached, to_fetch = cls._mget_from_cache(docs, index, using)
+        else:
+            to_fetch = docs
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(chunk):
+            async with semaphore:
+                return (await es.mget(cls._mget_body(chunk), index=index, **kwargs))["docs"]
+
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in cls._mget_chunks(to_fetch, chunk_size)))
+        fetched = [doc for response in responses for doc in response]
+        if use_cache:
+            return cls._mget_merge(docs, cached, fetched, index, using)
+        return {"docs": fetched}
+
+    @classmethod
+    def _mget_body(cls, docs):
+        return {
             "docs": [
                 doc if isinstance(doc, collections_abc.Mapping) else {"_id": doc}
                 for doc in docs
             ]
         }
-        results = es.mget(body, index=cls._default_index(index), **kwargs)
 
+    @classmethod
+    def _mget_results(cls, results, raise_on_error, missing, trusted=False, view=False):
+        build = cls.view_class().from_es if view else functools.partial(cls.from_es, trusted=trusted)
         objs, error_docs, missing_docs = [], [], []
         for doc in results["docs"]:
             if doc.get("found"):
@@ -176,7 +871,7 @@ class Document(ObjectBase):
                     # expensive call to cls.from_es().
                     continue
 
-                objs.append(cls.from_es(doc))
+                objs.append(build(doc))
 
             elif doc.get("error"):
                 if raise_on_error:
@@ -213,16 +908,14 @@ class Document(ObjectBase):
         ``Elasticsearch.delete`` unchanged.
         """
         es = self._get_connection(using)
-        # extract routing etc from meta
-        doc_meta = {k: self.meta[k] for k in DOC_META_FIELDS if k in self.meta}
-
-        # Optimistic concurrency control
-        if "seq_no" in self.meta and "primary_term" in self.meta:
-            doc_meta["if_seq_no"] = self.meta["seq_no"]
-            doc_meta["if_primary_term"] = self.meta["primary_term"]
-
-        doc_meta.update(kwargs)
-        es.delete(index=self._get_index(index), **doc_meta)
+        # extract routing etc from meta, with optimistic concurrency control
+        meta = doc_meta(self)
+        meta.update(kwargs)
+        with operation("delete", self.__class__, self._get_index(index)) as op:
+            with op.phase("request"):
+                response = es.delete(index=self._get_index(index), **meta)
+            op.response(response)
+        self._invalidate_cache(index, using)
 
     def to_dict(self, include_meta=False, skip_empty=True):
         """
@@ -236,7 +929,7 @@ class Document(ObjectBase):
             ``[]``, ``{}``) to be left on the document. Those values will be
             stripped out otherwise as they make no difference in elasticsearch.
         """
-        d = super(Document, self).to_dict(skip_empty=skip_empty)
+        d = self._doc_type.serializer.to_dict(self._d_, skip_empty)
         if not include_meta:
             return d
 
@@ -250,6 +943,13 @@ class Document(ObjectBase):
         meta["_source"] = d
         return meta
 
+    def _to_body(self, skip_empty=True):
+        """
+        Same as ``to_dict()`` but with dates, ``Decimal``, ``Enum`` and
+        ``timedelta`` values already converted for the request body.
+        """
+        return self._doc_type.serializer.to_dict(self._d_, skip_empty, body=True)
+
     def update(
         self,
         using=None,
@@ -293,6 +993,26 @@ class Document(ObjectBase):
 
         :return operation result noop/updated
         """
+        es = self._get_connection(using)
+        with operation("update", self.__class__, self._get_index(index)) as op:
+            with op.phase("build"):
+                body, meta = self._update_body(
+                    detect_noop, doc_as_upsert, retry_on_conflict, script, script_id, scripted_upsert, upsert, fields
+                )
+            with op.phase("request"):
+                meta = es.update(index=self._get_index(index), body=body, refresh=refresh, **meta)
+            op.response(meta)
+        # update meta information from ES
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        if "doc" in body:
+            clear_dirty(self, body["doc"])
+
+        return meta if return_doc_meta else meta["result"]
+
+    def _update_body(
+        self, detect_noop, doc_as_upsert, retry_on_conflict, script, script_id, scripted_upsert, upsert, fields
+    ):
         body = {
             "doc_as_upsert": doc_as_upsert,
             "detect_noop": detect_noop,
@@ -324,12 +1044,19 @@ class Document(ObjectBase):
             # update given fields locally
             merge(self, fields)
 
-            # prepare data for ES
-            values = self.to_dict()
-
             # if fields were given: partial update
-            body["doc"] = {k: values.get(k) for k in fields.keys()}
+            body["doc"] = self._partial_doc(fields.keys())
 
+        return body, self._update_doc_meta(retry_on_conflict)
+
+    def _partial_doc(self, names):
+        """request body of the ``names`` fields, only these fields are serialized"""
+        values = self._doc_type.serializer.to_dict(
+            {k: self._d_[k] for k in names if k in self._d_}, body=True
+        )
+        return {k: values.get(k) for k in names}
+
+    def _update_doc_meta(self, retry_on_conflict=None):
         # extract routing etc from meta
         doc_meta = {k: self.meta[k] for k in DOC_META_FIELDS if k in self.meta}
 
@@ -345,16 +1072,14 @@ class Document(ObjectBase):
             doc_meta["if_seq_no"] = self.meta["seq_no"]
             doc_meta["if_primary_term"] = self.meta["primary_term"]
 
-        meta = self._get_connection(using).update(
-            index=self._get_index(index), body=body, refresh=refresh, **doc_meta
-        )
-        # update meta information from ES
+        return doc_meta
+
+    def _update_meta(self, meta):
+        """update meta information from ES"""
         for k in META_FIELDS:
             if "_" + k in meta:
                 setattr(self.meta, k, meta["_" + k])
 
-        return meta if return_doc_meta else meta["result"]
-
     def save(
         self,
         using=None,
@@ -384,31 +1109,582 @@ class Document(ObjectBase):
 
         :return operation result created/updated
         """
+        self._check_complete()
         if validate:
             self.full_clean()
 
         es = self._get_connection(using)
-        # extract routing etc from meta
-        doc_meta = {k: self.meta[k] for k in DOC_META_FIELDS if k in self.meta}
+        # extract routing etc from meta, with optimistic concurrency control
+        meta = doc_meta(self)
+        meta.update(kwargs)
+        with operation("save", self.__class__, self._get_index(index)) as op:
+            with op.phase("build"):
+                body = self._to_body(skip_empty=skip_empty)
+            with op.phase("request"):
+                meta = es.index(index=self._get_index(index), body=body, **meta)
+            op.response(meta)
+        # update meta information from ES
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        clear_dirty(self)
 
-        # Optimistic concurrency control
-        if "seq_no" in self.meta and "primary_term" in self.meta:
-            doc_meta["if_seq_no"] = self.meta["seq_no"]
-            doc_meta["if_primary_term"] = self.meta["primary_term"]
+        return meta if return_doc_meta else meta["result"]
 
-        doc_meta.update(kwargs)
-        meta = es.index(
-            index=self._get_index(index),
-            body=self.to_dict(skip_empty=skip_empty),
-            **doc_meta
-        )
+    def dirty_fields(self):
+        """
+        Names of the fields modified since the document was loaded or last
+        saved, see :meth:`save_changes`.
+        """
+        return dirty_fields(self)
+
+    def mark_dirty(self, *names):
+        """
+        Flag fields as modified. Assignments are tracked automatically, values
+        changed in place (eg. ``doc.tags.append(tag)`` or removing an item of a
+        ``Nested`` list) have to be flagged.
+        """
+        for name in names:
+            mark_dirty(self, name)
+
+    def save_changes(
+        self,
+        using=None,
+        index=None,
+        detect_noop=True,
+        doc_as_upsert=False,
+        refresh=False,
+        retry_on_conflict=None,
+        return_doc_meta=False,
+        **kwargs
+    ):
+        """
+        Send only the fields modified since the document was loaded or last
+        saved (assigned fields, including inside ``Object`` / ``Nested``
+        inner documents) as a partial update. No request is made when nothing
+        changed and ``'noop'`` is returned. Documents without ``meta.id`` are
+        saved as a whole with :meth:`save`.
+
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg detect_noop: Set to ``False`` to disable noop detection.
+        :arg doc_as_upsert: create the document from the modified fields if it
+            does not exist
+        :arg refresh: Control when the changes made by this request are visible
+            to search. Set to ``True`` for immediate effect.
+        :arg retry_on_conflict: see :meth:`update`
+        :arg return_doc_meta: set to ``True`` to return all metadata from the
+            update API call instead of only the operation result
+
+        Any additional keyword arguments will be passed to
+        ``Elasticsearch.update`` unchanged.
+
+        :return operation result noop/updated/created
+        """
+        if "id" not in self.meta:
+            return self.save(using=using, index=index, refresh=refresh, return_doc_meta=return_doc_meta, **kwargs)
+        body, meta = self._save_changes_body(detect_noop, doc_as_upsert, retry_on_conflict)
+        if body is None:
+            return {"result": "noop"} if return_doc_meta else "noop"
+        meta.update(kwargs)
+        es = self._get_connection(using)
+        with operation("save_changes", self.__class__, self._get_index(index)) as op:
+            with op.phase("request"):
+                meta = es.update(index=self._get_index(index), body=body, refresh=refresh, **meta)
+            op.response(meta)
         # update meta information from ES
-        for k in META_FIELDS:
-            if "_" + k in meta:
-                setattr(self.meta, k, meta["_" + k])
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        clear_dirty(self, body["doc"])
 
         return meta if return_doc_meta else meta["result"]
 
+    def _save_changes_body(self, detect_noop, doc_as_upsert, retry_on_conflict):
+        dirty = self.dirty_fields()
+        if not dirty:
+            return None, None
+        body = {
+            "doc": self._partial_doc(sorted(dirty)),
+            "detect_noop": detect_noop,
+            "doc_as_upsert": doc_as_upsert,
+        }
+        return body, self._update_doc_meta(retry_on_conflict)
+
+    @classmethod
+    def _get_async_connection(cls, using=None):
+        return instrumented(get_async_connection(cls._get_using(using)))
+
+    @classmethod
+    async def ainit(cls, index=None, using=None):
+        """
+        Async version of :meth:`init`: create the index with its settings and
+        mappings, or update the mappings if the index already exists.
+        """
+        i = cls._index
+        if index:
+            i = i.clone(name=index)
+        es = cls._get_async_connection(using or i._using)
+        body = i.to_dict()
+        if not await es.indices.exists(index=i._name):
+            return await es.indices.create(index=i._name, body=body)
+        mappings = body.pop("mappings", {})
+        if mappings:
+            return await es.indices.put_mapping(index=i._name, body=mappings)
+
+    @classmethod
+    def asearch(cls, using=None, index=None, trusted=False):
+        """
+        Create an :class:`~es_odm.async_search.AsyncSearch` instance that will
+        search over this ``Document`` through the async connection.
+        """
+        return AsyncSearch(
+            using=cls._get_using(using), index=cls._default_index(index), doc_type=[cls]
+        ).trusted(trusted)
+
+    @classmethod
+    async def aget(cls, id, using=None, index=None, trusted=False, **kwargs):
+        """
+        Async version of :meth:`get`.
+        """
+        index = cls._default_index(index)
+        with operation("aget", cls, index) as op:
+            cached = cls._cache is not None and not kwargs
+            if cached:
+                doc = cls._cached_hit(using, index, id)
+                if doc is not None:
+                    op.cached = True
+                    op.hits = 1
+                    with op.phase("hydrate"):
+                        return cls.from_es(doc, trusted=trusted)
+
+            es = cls._get_async_connection(using)
+            with op.phase("request"):
+                doc = await es.get(index=index, id=id, **kwargs)
+            if not doc.get("found", False):
+                op.hits = 0
+                return None
+            if cached:
+                cls._cache_hit(using, index, id, doc)
+            op.hits = 1
+            with op.phase("hydrate"):
+                return cls.from_es(doc, trusted=trusted)
+
+    @classmethod
+    async def aexists(cls, id, using=None, index=None, **kwargs):
+        """
+        Async version of :meth:`exists`.
+        """
+        es = cls._get_async_connection(using)
+        return await es.exists(index=cls._default_index(index), id=id, **kwargs)
+
+    @classmethod
+    async def amget(
+        cls,
+        docs,
+        using=None,
+        index=None,
+        raise_on_error=True,
+        missing="none",
+        trusted=False,
+        view=False,
+        chunk_size=MGET_CHUNK_SIZE,
+        concurrency=1,
+        **kwargs
+    ):
+        """
+        Async version of :meth:`mget`.
+        """
+        if missing not in ("raise", "skip", "none"):
+            raise ValueError("'missing' must be 'raise', 'skip', or 'none'.")
+        es = cls._get_async_connection(using)
+        index = cls._default_index(index)
+        with operation("amget", cls, index) as op:
+            with op.phase("request"):
+                results = await cls._amget_docs(es, docs, index, chunk_size, concurrency, using, **kwargs)
+            op.hits = sum(1 for doc in results["docs"] if doc.get("found"))
+            with op.phase("hydrate"):
+                return cls._mget_results(results, raise_on_error, missing, trusted, view)
+
+    async def adelete(self, using=None, index=None, **kwargs):
+        """
+        Async version of :meth:`delete`.
+        """
+        es = self._get_async_connection(using)
+        # extract routing etc from meta, with optimistic concurrency control
+        meta = doc_meta(self)
+        meta.update(kwargs)
+        with operation("adelete", self.__class__, self._get_index(index)) as op:
+            with op.phase("request"):
+                response = await es.delete(index=self._get_index(index), **meta)
+            op.response(response)
+        self._invalidate_cache(index, using)
+
+    async def aupdate(
+        self,
+        using=None,
+        index=None,
+        detect_noop=True,
+        doc_as_upsert=False,
+        refresh=False,
+        retry_on_conflict=None,
+        script=None,
+        script_id=None,
+        scripted_upsert=False,
+        upsert=None,
+        return_doc_meta=False,
+        **fields
+    ):
+        """
+        Async version of :meth:`update`.
+        """
+        es = self._get_async_connection(using)
+        with operation("aupdate", self.__class__, self._get_index(index)) as op:
+            with op.phase("build"):
+                body, meta = self._update_body(
+                    detect_noop, doc_as_upsert, retry_on_conflict, script, script_id, scripted_upsert, upsert, fields
+                )
+            with op.phase("request"):
+                meta = await es.update(index=self._get_index(index), body=body, refresh=refresh, **meta)
+            op.response(meta)
+        # update meta information from ES
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        if "doc" in body:
+            clear_dirty(self, body["doc"])
+
+        return meta if return_doc_meta else meta["result"]
+
+    async def asave(
+        self,
+        using=None,
+        index=None,
+        validate=True,
+        skip_empty=True,
+        return_doc_meta=False,
+        **kwargs
+    ):
+        """
+        Async version of :meth:`save`.
+        """
+        self._check_complete()
+        if validate:
+            self.full_clean()
+
+        es = self._get_async_connection(using)
+        # extract routing etc from meta, with optimistic concurrency control
+        meta = doc_meta(self)
+        meta.update(kwargs)
+        with operation("asave", self.__class__, self._get_index(index)) as op:
+            with op.phase("build"):
+                body = self._to_body(skip_empty=skip_empty)
+            with op.phase("request"):
+                meta = await es.index(index=self._get_index(index), body=body, **meta)
+            op.response(meta)
+        # update meta information from ES
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        clear_dirty(self)
+
+        return meta if return_doc_meta else meta["result"]
+
+    async def asave_changes(
+        self,
+        using=None,
+        index=None,
+        detect_noop=True,
+        doc_as_upsert=False,
+        refresh=False,
+        retry_on_conflict=None,
+        return_doc_meta=False,
+        **kwargs
+    ):
+        """
+        Async version of :meth:`save_changes`.
+        """
+        if "id" not in self.meta:
+            return await self.asave(
+                using=using, index=index, refresh=refresh, return_doc_meta=return_doc_meta, **kwargs
+            )
+        body, meta = self._save_changes_body(detect_noop, doc_as_upsert, retry_on_conflict)
+        if body is None:
+            return {"result": "noop"} if return_doc_meta else "noop"
+        meta.update(kwargs)
+        es = self._get_async_connection(using)
+        with operation("asave_changes", self.__class__, self._get_index(index)) as op:
+            with op.phase("request"):
+                meta = await es.update(index=self._get_index(index), body=body, refresh=refresh, **meta)
+            op.response(meta)
+        # update meta information from ES
+        self._update_meta(meta)
+        self._invalidate_cache(index, using)
+        clear_dirty(self, body["doc"])
+
+        return meta if return_doc_meta else meta["result"]
+
+    @classmethod
+    def _bulk(cls, actions, using=None, chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+              **kwargs):
+        es = cls._get_connection(using)
+        result = BulkResult()
+        if cls._cache is not None:
+            written = []
+            actions = cls._track_written(actions, written)
+        chunks = chunk_actions(actions, es.transport.serializer, chunk_size, max_chunk_bytes)
+        with operation("bulk", cls, cls._default_index()) as op:
+            while True:
+                with op.phase("build"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                lines, items, _ = chunk
+                send_chunk(es, lines, items, result, **kwargs)
+                cls._invalidate_search_cache()
+                if cls._cache is not None:
+                    # invalidate once the chunk is written so a concurrent get
+                    # cannot cache the previous version again
+                    for written_index, doc_id in written:
+                        cls._invalidate_id(written_index, doc_id, using)
+                    del written[:]
+        return result
+
+    @classmethod
+    def _track_written(cls, actions, written):
+        for action, source, doc in actions:
+            header = next(iter(action.values()))
+            written.append((header["_index"], header.get("_id")))
+            yield action, source, doc
+
+    @classmethod
+    def bulk_save(
+        cls,
+        docs,
+        using=None,
+        index=None,
+        validate=True,
+        skip_empty=True,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+        **kwargs
+    ):
+        """
+        Save many documents into elasticsearch through the ``_bulk`` endpoint.
+        ``docs`` can be any iterable (eg. a generator), actions are built
+        lazily and sent in chunks limited by both ``chunk_size`` documents and
+        ``max_chunk_bytes`` bytes. The ``meta`` of every saved instance is
+        updated the same way ``save()`` does.
+
+        :arg docs: iterable of instances to save
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg validate: set to ``False`` to skip validating the documents
+        :arg skip_empty: if set to ``False`` will cause empty values (``None``,
+            ``[]``, ``{}``) to be left on the documents.
+        :arg chunk_size: maximum number of documents per request
+        :arg max_chunk_bytes: maximum size of a request in bytes
+
+        Any additional keyword arguments will be passed to
+        ``Elasticsearch.bulk`` unchanged.
+
+        :return :class:`~es_odm.bulk.BulkResult`
+        """
+        def actions():
+            for doc in docs:
+                doc._check_complete()
+                if validate:
+                    doc.full_clean()
+                action, source = build_action(
+                    "index", doc._get_index(index), doc_meta(doc), doc._to_body(skip_empty=skip_empty)
+                )
+                yield action, source, doc
+
+        return cls._bulk(actions(), using=using, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, **kwargs)
+
+    @classmethod
+    def bulk_update(
+        cls,
+        docs,
+        fields=None,
+        using=None,
+        index=None,
+        doc_as_upsert=False,
+        retry_on_conflict=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+        **kwargs
+    ):
+        """
+        Partial update of many documents through the ``_bulk`` endpoint.
+
+        :arg docs: iterable of instances to update
+        :arg fields: names of the fields to send, empty values (``None``,
+            ``[]``, ``{}``) included, the whole document is sent as partial
+            document when omitted
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg doc_as_upsert: use the partial document as upsert value
+        :arg retry_on_conflict: how many times to retry the update on
+            version conflict, disables optimistic concurrency control
+        :arg chunk_size: maximum number of documents per request
+        :arg max_chunk_bytes: maximum size of a request in bytes
+
+        Any additional keyword arguments will be passed to
+        ``Elasticsearch.bulk`` unchanged.
+
+        :return :class:`~es_odm.bulk.BulkResult`
+        """
+        def actions():
+            for doc in docs:
+                if fields:
+                    # the requested fields are sent even when emptied
+                    values = doc._to_body(skip_empty=False)
+                    values = {k: values.get(k) for k in fields}
+                else:
+                    values = doc._to_body()
+                meta = doc_meta(doc)
+                if retry_on_conflict not in (None, 0):
+                    meta.pop("if_seq_no", None)
+                    meta.pop("if_primary_term", None)
+                if retry_on_conflict is not None:
+                    meta["retry_on_conflict"] = retry_on_conflict
+                body = {"doc": values}
+                if doc_as_upsert:
+                    body["doc_as_upsert"] = True
+                action, source = build_action("update", doc._get_index(index), meta, body)
+                yield action, source, doc
+
+        return cls._bulk(actions(), using=using, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, **kwargs)
+
+    @classmethod
+    def bulk_delete(
+        cls,
+        docs,
+        using=None,
+        index=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+        **kwargs
+    ):
+        r"""
+        Delete many documents through the ``_bulk`` endpoint.
+
+        :arg docs: iterable of instances or ``id``\s of the documents to delete
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+        :arg chunk_size: maximum number of documents per request
+        :arg max_chunk_bytes: maximum size of a request in bytes
+
+        Any additional keyword arguments will be passed to
+        ``Elasticsearch.bulk`` unchanged.
+
+        :return :class:`~es_odm.bulk.BulkResult`
+        """
+        def actions():
+            for doc in docs:
+                if isinstance(doc, Document):
+                    action, _ = build_action("delete", doc._get_index(index), doc_meta(doc))
+                else:
+                    action, _ = build_action("delete", cls._default_index(index), {"id": as_doc_id(doc)})
+                yield action, None, None
+
+        return cls._bulk(actions(), using=using, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, **kwargs)
+
+    @classmethod
+    def parallel_ingest(cls, source, workers=4, mode="thread", using=None, index=None, **kwargs):
+        """
+        Index a large iterable of instances (or raw dicts of field values)
+        building and serializing the documents in a pool of ``workers``
+        threads or processes while several bulk requests are in flight.
+        Rejected requests slow every sender down, see
+        :func:`~es_odm.ingest.parallel_ingest` for all the options.
+
+        :arg source: iterable of instances or dicts to index
+        :arg workers: size of the serialization pool
+        :arg mode: ``'thread'`` or ``'process'``
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+
+        :return :class:`~es_odm.bulk.BulkResult` with the final throughput
+            in its ``stats``
+        """
+        return parallel_ingest(cls, source, using=using, index=index, workers=workers, mode=mode, **kwargs)
+
+    @classmethod
+    def validate_many(cls, rows, on_error="collect", workers=None, mode="process", chunk_size=1000):
+        """
+        Validate many rows of raw field values against the model at once and
+        build an instance from the valid ones. Values of ``ObjectField`` /
+        ``NestedField`` fields are validated through their inner model so
+        their errors are located at their full path (eg.
+        ``("history", 1, "city")``).
+
+        :arg rows: iterable of dicts of field values
+        :arg on_error: ``'collect'`` the errors of the invalid rows with
+            their index, ``'skip'`` the invalid rows or ``'raise'`` a
+            :class:`~es_odm.validation.RowValidationError` for the first one
+        :arg workers: validate chunks of ``chunk_size`` rows in a pool of
+            ``workers`` processes, useful for large nested models
+        :arg mode: ``'process'`` or ``'thread'``
+
+        :return :class:`~es_odm.validation.ValidationResult`
+        """
+        return validate_many(cls, rows, on_error=on_error, workers=workers, mode=mode, chunk_size=chunk_size)
+
+    @classmethod
+    def export(cls, path, format=None, query=None, fields=None, batch_size=1000, keep_alive="1m", using=None,
+               index=None):
+        """
+        Write the documents matching ``query`` to an NDJSON or Parquet file,
+        a page of ``batch_size`` hits at a time from a point in time, see
+        :mod:`es_odm.transfer`.
+
+        :arg path: file to write
+        :arg format: ``'ndjson'`` or ``'parquet'`` (needs pyarrow), guessed
+            from the extension of ``path`` by default
+        :arg query: same as :meth:`iter_all`, all documents by default
+        :arg fields: only export these fields
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+
+        :return the number of documents written
+        """
+        return transfer.export(cls, path, format, query, fields, batch_size, keep_alive, using, index)
+
+    @classmethod
+    def import_file(cls, path, format=None, batch_size=1000, id_field=None, validate=True, on_bad_line=None,
+                    using=None, index=None, **kwargs):
+        """
+        Index the rows of an NDJSON (memory mapped) or Parquet file by
+        batches through :meth:`bulk_save`. Rows are exported hits
+        (``{"_id", "_source"}``) or dicts of field values. Lines that cannot
+        be decoded or validated do not stop the import, they are passed to
+        ``on_bad_line`` and reported in the ``failed`` items of the result
+        with their ``line`` number.
+
+        :arg path: file to read
+        :arg format: ``'ndjson'`` or ``'parquet'`` (needs pyarrow), guessed
+            from the extension of ``path`` by default
+        :arg batch_size: documents validated and sent per batch
+        :arg id_field: field used as ``_id`` for rows without one
+        :arg validate: set to ``False`` to skip validating the documents
+        :arg on_bad_line: called with a :class:`~es_odm.transfer.BadLine`
+        :arg index: elasticsearch index to use, if the ``Document`` is
+            associated with an index this can be omitted.
+        :arg using: connection alias to use, defaults to ``'default'``
+
+        Any additional keyword arguments will be passed to
+        ``Elasticsearch.bulk`` unchanged.
+
+        :return :class:`~es_odm.bulk.BulkResult`
+        """
+        return transfer.import_file(
+            cls, path, format, batch_size, id_field, validate, on_bad_line, using=using, index=index, **kwargs
+        )
+
     # for pydantic 1.9.0
     @classmethod
     def __try_update_forward_refs__(cls) -> None:
@@ -462,6 +1738,17 @@ class ESDocumentOptions(object):
             if hasattr(b, "_doc_type") and hasattr(b._doc_type, "mapping"):
                 self.mapping.update(b._doc_type.mapping, update_only=True)
 
+        # serialization plan used by to_dict() and the request bodies
+        self.serializer = DocSerializer(self.mapping, attrs.get("__fields__"))
+
+        # Object / Nested fields built on first access, see Field(lazy=True)
+        self.lazy_fields = frozenset(
+            name for name, field in attrs.get("__fields__", {}).items() if getattr(field.field_info, "lazy", False)
+        )
+        for name in self.lazy_fields:
+            if not isinstance(self.mapping[name], Object):
+                raise TypeError("Field {!r} is not an ObjectField / NestedField, it cannot be lazy.".format(name))
+
     @property
     def name(self):
         return self.mapping.properties.name
@@ -481,9 +1768,30 @@ class ESIndexMeta(ESDocumentMeta):
             # index = cls.construct_index(index_opts, bases)
             new_cls._index = index
             index.document(new_cls)
+            new_cls._cache = cls.construct_cache(attrs.pop("Cache", None))
+            new_cls._search_cache = cls.construct_search_cache(attrs.pop("SearchCache", None))
         cls._document_initialized = True
         return new_cls
 
+    @classmethod
+    def construct_cache(cls, opts):
+        if opts is None:
+            return None
+        return LRUCache(max_size=getattr(opts, "max_size", 1024), ttl=getattr(opts, "ttl", None))
+
+    @classmethod
+    def construct_search_cache(cls, opts):
+        if opts is None:
+            return None
+        return QueryCache(
+            storage=getattr(opts, "storage", None),
+            ttl=getattr(opts, "ttl", 60),
+            max_size=getattr(opts, "max_size", 256),
+            max_bytes=getattr(opts, "max_bytes", None),
+            invalidate_on_write=getattr(opts, "invalidate_on_write", True),
+            namespace=getattr(opts, "namespace", "search"),
+        )
+
     @classmethod
     def construct_index(cls, opts, bases):
         if opts is None:
@@ -13,8 +13,8 @@ from pydantic.fields import FieldInfo as PydanticFieldInfo
 from pydantic.fields import Undefined, UndefinedType
 from pydantic.typing import NoArgAnyCallable
 from elasticsearch_dsl import (
+    Binary,
     Boolean,
-    Byte,
     Completion,
     Date,
     DateRange,
@@ -28,7 +28,9 @@ from elasticsearch_dsl import (
     Text,
 )
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
 from pydantic.fields import ModelField
 from typing import TypeVar, Generic
 
@@ -57,17 +59,85 @@ class InnerFieldModel(Generic[InnerESModelType]):
             # them and just return the value as is
             return v
         inner_f = field.sub_fields[0]
+        model = inner_f.type_
+        if hasattr(model, "__fields__") and v.inner is not None:
+            # inner models are validated field by field so the errors are
+            # located at the path of the value (``profile.user_id``,
+            # ``history.0.city``)
+            errors, cleaned = [], []
+            many = isinstance(v.inner, (list, tuple))
+            for i, inner in enumerate(v.inner if many else [v.inner]):
+                if isinstance(inner, model):
+                    inner = inner.to_dict(skip_empty=False)
+                if not isinstance(inner, Mapping):
+                    errors.append(ErrorWrapper(TypeError("Invalid value"), loc=(i,) if many else ()))
+                    continue
+                values, inner_errors = validate_model_values(model, inner, loc=(i,) if many else ())
+                errors.extend(inner_errors)
+                cleaned.append(values)
+            if errors:
+                raise ValidationError(errors, model)
+            return cls(cleaned if many else cleaned[0])
         errors = []
         # Here we don't need the validated value, but we want the errors
         valid_value, error = inner_f.validate(v.inner, {}, loc='inner')
         if error:
             errors.append(error)
         if errors:
-            raise ValidationError(errors, cls)
+            raise ValidationError(errors, model if hasattr(model, "__config__") else BaseModel)
         # Validation passed without errors, return the same instance received
         return v
 
 
+def inner_model_field(field: ModelField) -> Optional[ModelField]:
+    """
+    ``ObjectField`` / ``NestedField`` of an inner model in ``field``, alone or
+    as a member of a ``Union`` (eg. ``Union[ObjectField[ProfileODM], dict]``).
+    """
+    for candidate in [field] + list(field.sub_fields or ()):
+        type_ = candidate.type_
+        if (
+            isinstance(type_, type)
+            and issubclass(type_, InnerFieldModel)
+            and candidate.sub_fields
+            and hasattr(candidate.sub_fields[0].type_, "__fields__")
+        ):
+            return candidate
+    return None
+
+
+def validate_model_values(model, values: Mapping, loc=()):
+    """
+    Validate the raw field ``values`` against the pydantic fields of
+    ``model`` (an ``ESModel`` or ``InnerESModel``), the values of ``Object``
+    / ``Nested`` fields through :meth:`InnerFieldModel.validate`.
+
+    Returns ``(values, errors)``: the coerced values and the
+    ``ErrorWrapper`` of every invalid one, located under ``loc``.
+    """
+    cleaned = dict(values)
+    errors = []
+    for name, field in model.__fields__.items():
+        field_loc = loc + (name,)
+        if name not in values:
+            if field.required:
+                errors.append(ErrorWrapper(MissingError(), loc=field_loc))
+            continue
+        value = values[name]
+        inner_field = inner_model_field(field) if value is not None else None
+        if inner_field is not None:
+            value = value if isinstance(value, InnerFieldModel) else inner_field.type_(value)
+            valid_value, error = inner_field.validate(value, cleaned, loc=field_loc, cls=model)
+            valid_value = valid_value.inner if isinstance(valid_value, InnerFieldModel) else valid_value
+        else:
+            valid_value, error = field.validate(value, cleaned, loc=field_loc, cls=model)
+        if error:
+            errors.append(error)
+        else:
+            cleaned[name] = valid_value
+    return cleaned, errors
+
+
 class ObjectField(InnerFieldModel, Generic[InnerESModelType]):
     """elasticsearch_dsl Object type"""
     def __init__(self, inner: Optional[InnerESModelType]):
@@ -105,6 +175,7 @@ class FieldInfo(PydanticFieldInfo):
         keyword = kwargs.pop('keyword', Undefined)
         fields = kwargs.pop('fields', Undefined)
         suggest = kwargs.pop('suggest', Undefined)
+        lazy = kwargs.pop('lazy', False)
 
         if sa_column is not Undefined:
             if sa_column_args is not Undefined:
@@ -129,6 +200,7 @@ class FieldInfo(PydanticFieldInfo):
         self.suggest = suggest
         self.keyword = keyword
         self.fields = fields
+        self.lazy = lazy
 
         self.extra = kwargs
 
@@ -167,6 +239,7 @@ def Field(  # noqa
     keyword: bool = False,
     fields: dict = None,
     suggest: bool = False,
+    lazy: bool = False,
 
     **extra: Any,
 ) -> Any:
@@ -199,6 +272,7 @@ def Field(  # noqa
         keyword=keyword,
         suggest=suggest,
         fields=fields,
+        lazy=lazy,
 
         **current_schema_extra,
         **extra,
@@ -207,7 +281,112 @@ def Field(  # noqa
     return field_info
 
 
-def get_dsl_field(field: Field) -> DSLField:
+def _text_field(field, multi, real_model) -> DSLField:
+    if hasattr(field.field_info, 'fields') and field.field_info.fields and isinstance(field.field_info.fields, dict):
+        _fields = dict(field.field_info.fields)
+        if hasattr(field.field_info, 'keyword') and field.field_info.keyword:
+            _fields["keyword"] = Keyword(multi=multi, ignore_above=512)
+        return Text(fields=_fields, multi=multi)
+    elif hasattr(field.field_info, 'keyword') and field.field_info.keyword:
+        return Text(fields={"keyword": Keyword(multi=multi, ignore_above=512)}, multi=multi)
+    return Text(multi=multi)
+
+
+def _object_field(field, multi, real_model) -> DSLField:
+    if real_model:
+        return Object(real_model)
+    if getattr(field, 'sub_fields'):
+        return Object(field.sub_fields[0].type_)
+    return Object()
+
+
+def _nested_field(field, multi, real_model) -> DSLField:
+    if real_model:
+        return Nested(real_model)
+    if getattr(field, 'sub_fields'):
+        return Nested(field.sub_fields[0].type_)
+    return Nested()
+
+
+def _simple_field(dsl_class):
+    def build(field, multi, real_model) -> DSLField:
+        return dsl_class(multi=multi)
+    return build
+
+
+# python type -> builder of the elasticsearch_dsl field, the most specific
+# type in the MRO of the annotation wins (eg. bool over int, datetime over date)
+DSL_FIELD_BUILDERS = {
+    str: _text_field,
+    float: _simple_field(Float),
+    bool: _simple_field(Boolean),
+    int: _simple_field(Integer),
+    datetime: _simple_field(Date),
+    date: _simple_field(Date),
+    timedelta: _simple_field(Integer),
+    time: _simple_field(Date),
+    Enum: _simple_field(Keyword),
+    # base64 encoded by the serializer
+    bytes: _simple_field(Binary),
+    Decimal: _simple_field(Float),
+    dict: _simple_field(Object),
+    ObjectField: _object_field,
+    NestedField: _nested_field,
+    KeywordField: _simple_field(Keyword),
+}
+
+_builders_by_type: Dict[Any, Any] = {}
+_dsl_fields_cache: Dict[Any, Any] = {}
+
+
+def _text_fallback(field, multi, real_model) -> DSLField:
+    return Text()
+
+
+def resolve_dsl_field_builder(type_):
+    """Find the builder of the elasticsearch_dsl field of a python type, memoized per type."""
+    try:
+        return _builders_by_type[type_]
+    except (KeyError, TypeError):
+        pass
+    builder = _text_fallback
+    for base in getattr(type_, '__mro__', ()):
+        if base in DSL_FIELD_BUILDERS:
+            builder = DSL_FIELD_BUILDERS[base]
+            break
+    try:
+        _builders_by_type[type_] = builder
+    except TypeError:
+        pass
+    return builder
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def _dsl_field_key(field):
+    field_info = field.field_info
+    try:
+        key = (
+            field.outer_type_,
+            field.type_,
+            getattr(field_info, 'keyword', None),
+            _freeze(getattr(field_info, 'fields', None)),
+        )
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _resolve_dsl_field(field: Field):
+    """``(builder, multi, real_model)`` of the elasticsearch_dsl field of a pydantic field."""
     multi = False
 
     real_model = None
@@ -227,54 +406,23 @@ def get_dsl_field(field: Field) -> DSLField:
     if hasattr(field.outer_type_, '_name') and getattr(field.outer_type_, '_name') == 'List':
         multi = True
 
-    if issubclass(field.type_, str):
-        if hasattr(field.field_info, 'fields') and field.field_info.fields and isinstance(field.field_info.fields, dict):
-            _fields = field.field_info.fields
-            if hasattr(field.field_info, 'keyword') and field.field_info.keyword:
-                _fields["keyword"] = Keyword(multi=multi, ignore_above=512)
-            return Text(fields=_fields, multi=multi)
-        elif hasattr(field.field_info, 'keyword') and field.field_info.keyword:
-            return Text(fields={"keyword": Keyword(multi=multi, ignore_above=512)}, multi=multi)
-        return Text(multi=multi)
-    if issubclass(field.type_, float):
-        return Float(multi=multi)
-    if issubclass(field.type_, bool):
-        return Boolean(multi=multi)
-    if issubclass(field.type_, int):
-        return Integer(multi=multi)
-    if issubclass(field.type_, datetime):
-        return Date(multi=multi)
-    if issubclass(field.type_, date):
-        return Date(multi=multi)
-    if issubclass(field.type_, timedelta):
-        return Integer(multi=multi)
-    if issubclass(field.type_, time):
-        return Date(multi=multi)
-    if issubclass(field.type_, Enum):
-        return Keyword(multi=multi)
-    if issubclass(field.type_, bytes):
-        return Byte(multi=multi)
-    if issubclass(field.type_, Decimal):
-        return Float(multi=multi)
-    if issubclass(field.type_, dict):
-        return Object(multi=multi)
-
-    # Object Nested Keyword
-    if issubclass(field.type_, ObjectField):
-        if real_model:
-            return Object(real_model)
-        if getattr(field, 'sub_fields'):
-            return Object(field.sub_fields[0].type_)
-        return Object()
-
-    if issubclass(field.type_, NestedField):
-        if real_model:
-            return Nested(real_model)
-        if getattr(field, 'sub_fields'):
-            return Nested(field.sub_fields[0].type_)
-        return Nested()
-
-    if issubclass(field.type_, KeywordField):
-        return Keyword(multi=multi)
+    return resolve_dsl_field_builder(field.type_), multi, real_model
 
-    return Text()
+
+def get_dsl_field(field: Field) -> DSLField:
+    """
+    Build the elasticsearch_dsl field of a pydantic field. Its resolution is
+    memoized by annotation and field options, every call returns a new dsl
+    field as models may change their mapping.
+    """
+    key = _dsl_field_key(field)
+    cached = _dsl_fields_cache.get(key) if key is not None else None
+    if cached is None:
+        cached = (_resolve_dsl_field(field), field.type_, field.outer_type_)
+        if key is not None:
+            _dsl_fields_cache[key] = cached
+    else:
+        field.type_, field.outer_type_ = cached[1:]
+
+    builder, multi, real_model = cached[0]
+    return builder(field, multi, real_model)
@@ -0,0 +1,312 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl.serializer import serializer
+
+from es_odm.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CHUNK_BYTES,
+    BulkResult,
+    build_action,
+    chunk_actions,
+    doc_meta,
+    line_size,
+    ndjson_body,
+)
+from es_odm.serializer import transport_serializer
+
+
+class IngestStats(object):
+    """
+    Running counters of a :func:`parallel_ingest`, passed to ``on_progress``.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.docs = 0
+        self.bytes = 0
+        self.failed = 0
+        self.requests = 0
+        self.rejections = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "IngestStats(docs={}, failed={}, docs/s={:.1f}, bytes/s={:.1f})".format(
+            self.docs, self.failed, self.docs_per_sec, self.bytes_per_sec
+        )
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def docs_per_sec(self):
+        elapsed = self.elapsed
+        return self.docs / elapsed if elapsed else 0.0
+
+    @property
+    def bytes_per_sec(self):
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed else 0.0
+
+    def add(self, docs=0, size=0, failed=0, requests=0, rejections=0):
+        with self._lock:
+            self.docs += docs
+            self.bytes += size
+            self.failed += failed
+            self.requests += requests
+            self.rejections += rejections
+
+
+class Throttle(object):
+    """
+    Delay shared by all the senders: grows exponentially every time
+    elasticsearch rejects a request (``429`` / ``es_rejected_execution_exception``)
+    and decays back on every successful request.
+    """
+
+    def __init__(self, initial_backoff=0.5, max_backoff=60.0):
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        delay = self.delay
+        if delay:
+            time.sleep(delay)
+
+    def reject(self):
+        with self._lock:
+            self.delay = min(self.max_backoff, max(self.initial_backoff, self.delay * 2))
+
+    def success(self):
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.initial_backoff else 0.0
+
+
+def is_rejection(item):
+    error = item.get("error")
+    error_type = error.get("type") if isinstance(error, dict) else error
+    return item.get("status") == 429 or error_type == "es_rejected_execution_exception"
+
+
+def row_id(doc):
+    """``_id`` of a document or of a raw dict of field values, ``None`` if it has none."""
+    if isinstance(doc, dict):
+        meta = doc.get("meta") or {}
+        return meta.get("id", doc.get("_id"))
+    return doc.meta.id if "id" in doc.meta else None
+
+
+def serialize_batch(doc_cls, batch, index=None, validate=True, skip_empty=True,
+                    chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES, serializer=serializer,
+                    start=0):
+    """
+    Build, validate and serialize a batch of documents (instances of
+    ``doc_cls`` or raw dicts of field values) with ``serializer``, the one of
+    the connection so the lines are encoded like ``bulk_save`` does. Runs in
+    the worker pool so it must stay a module level function.
+
+    Returns ``(chunks, errors)`` where ``chunks`` are ``(lines, count, size)``
+    ready to be sent to the ``_bulk`` endpoint and ``errors`` describe the
+    documents that could not be built, with their ``_id`` if they have one
+    and their ``row`` (position in the source, the batch starting at
+    ``start``).
+    """
+    errors = []
+
+    def actions():
+        for row, doc in enumerate(batch, start):
+            try:
+                if not isinstance(doc, doc_cls):
+                    doc = doc_cls(**doc)
+                if validate:
+                    doc.full_clean()
+                action, source = build_action(
+                    "index", doc._get_index(index), doc_meta(doc), doc._to_body(skip_empty=skip_empty)
+                )
+            except Exception as e:
+                errors.append({"_id": row_id(doc), "op_type": "index", "status": None, "error": repr(e), "row": row})
+                continue
+            yield action, source, None
+
+    chunks = [
+        (lines, len(items), size)
+        for lines, items, size in chunk_actions(actions(), serializer, chunk_size, max_chunk_bytes)
+    ]
+    return chunks, errors
+
+
+def send_with_backoff(es, lines, stats, throttle, result, max_retries=8, **kwargs):
+    """
+    Send a chunk of ``index`` actions, retrying the whole request on ``429``
+    and only the rejected items on partial rejections.
+    """
+    attempt = 0
+    # the bytes of the chunk are counted once, whatever the retries
+    size = sum(line_size(line) + 1 for line in lines)
+    while True:
+        throttle.wait()
+        try:
+            response = es.bulk(body=ndjson_body(lines), **kwargs)
+        except TransportError as e:
+            if e.status_code != 429 or attempt >= max_retries:
+                raise
+            throttle.reject()
+            stats.add(requests=1, rejections=1)
+            attempt += 1
+            continue
+
+        retry, done, failed = [], 0, 0
+        for i, resp_item in enumerate(response["items"]):
+            item = next(iter(resp_item.values()))
+            if is_rejection(item) and attempt < max_retries:
+                retry.append(i)
+            elif result.add("index", item):
+                done += 1
+            else:
+                failed += 1
+        stats.add(docs=done, size=size, failed=failed, requests=1, rejections=len(retry))
+        size = 0
+
+        if not retry:
+            throttle.success()
+            return result
+        # every index action is an action line followed by its source line
+        throttle.reject()
+        lines = [line for i in retry for line in lines[2 * i:2 * i + 2]]
+        attempt += 1
+
+
+def parallel_ingest(
+    doc_cls,
+    source,
+    using=None,
+    index=None,
+    workers=4,
+    mode="thread",
+    concurrency=2,
+    queue_size=8,
+    validate=True,
+    skip_empty=True,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+    max_retries=8,
+    initial_backoff=0.5,
+    max_backoff=60.0,
+    on_progress=None,
+    **kwargs
+):
+    """
+    Index ``source`` (an iterable of ``doc_cls`` instances or raw dicts)
+    building and serializing the documents in a thread or process pool of
+    ``workers`` while ``concurrency`` threads send the chunks to the
+    ``_bulk`` endpoint.
+
+    At most ``queue_size`` serialized chunks wait for a sender, so the memory
+    in flight stays bounded whatever the size of ``source``. Rejected
+    requests and items are retried after a delay shared by all the senders.
+    ``on_progress`` is called with the :class:`IngestStats` after every chunk.
+
+    ``meta`` of the instances is not updated since in ``"process"`` mode the
+    documents never leave the workers.
+    """
+    if mode not in ("thread", "process"):
+        raise ValueError("'mode' must be 'thread' or 'process'.")
+
+    es = doc_cls._get_connection(using)
+    # picklable for the process pool, unlike the instrumentation wrapper
+    body_serializer = transport_serializer(es) or serializer
+    stats = IngestStats()
+    throttle = Throttle(initial_backoff, max_backoff)
+    chunks = queue.Queue(maxsize=queue_size)
+    results = []
+    send_errors = []
+
+    def sender():
+        result = BulkResult()
+        results.append(result)
+        while True:
+            lines = chunks.get()
+            if lines is None:
+                return
+            # keep draining after an error so the producer never blocks
+            if send_errors:
+                continue
+            try:
+                send_with_backoff(es, lines, stats, throttle, result, max_retries, **kwargs)
+                if on_progress is not None:
+                    on_progress(stats)
+            except Exception as e:
+                # a dead sender would leave the producer blocked on a full queue
+                send_errors.append(e)
+
+    def batches():
+        """``(position of the first row, rows)`` of ``source``."""
+        batch, start = [], 0
+        for doc in source:
+            batch.append(doc)
+            if len(batch) == chunk_size:
+                yield start, batch
+                start += len(batch)
+                batch = []
+        if batch:
+            yield start, batch
+
+    validation_errors = []
+
+    def enqueue(future):
+        batch_chunks, errors = future.result()
+        if errors:
+            validation_errors.extend(errors)
+            stats.add(failed=len(errors))
+        for lines, _, _ in batch_chunks:
+            chunks.put(lines)
+
+    threads = [threading.Thread(target=sender, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+
+    executor_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    pending = collections.deque()
+    try:
+        with executor_cls(max_workers=workers) as executor:
+            for start, batch in batches():
+                if send_errors:
+                    break
+                pending.append(
+                    executor.submit(
+                        serialize_batch, doc_cls, batch, index, validate, skip_empty, chunk_size, max_chunk_bytes,
+                        body_serializer, start,
+                    )
+                )
+                while len(pending) >= workers * 2:
+                    enqueue(pending.popleft())
+            while pending:
+                enqueue(pending.popleft())
+    finally:
+        for _ in threads:
+            chunks.put(None)
+        for t in threads:
+            t.join()
+        # like Document._bulk, reads must not be served stale from the caches
+        if doc_cls._cache is not None:
+            for r in results:
+                for doc_id in r.created + r.updated:
+                    doc_cls._invalidate_id(index, doc_id, using)
+        doc_cls._invalidate_search_cache()
+
+    if send_errors:
+        raise send_errors[0]
+
+    result = BulkResult()
+    for r in results:
+        result.merge(r)
+    result.failed.extend(validation_errors)
+    result.stats = stats
+    return result
@@ -0,0 +1,318 @@
+"""
+Instrumentation of the ``Document`` operations. Listeners registered with
+:func:`add_listener` are called with an :class:`Operation` once every
+``get``, ``mget``, ``save``, ``update``, ``delete``, ``search`` and ``bulk``
+(and their async versions) is done::
+
+    from es_odm.instrumentation import LatencyHistogram, add_listener
+
+    histogram = LatencyHistogram()
+    add_listener(histogram)
+    ...
+    histogram.snapshot()
+
+Nothing is measured while no listener is registered.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger("es_odm.instrumentation")
+
+_listeners = []
+_current = contextvars.ContextVar("es_odm_operation", default=None)
+
+
+def add_listener(listener):
+    """Call ``listener(operation)`` after every operation."""
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    _listeners.remove(listener)
+
+
+def current_operation():
+    """:class:`Operation` being run in this thread / task, if any."""
+    return _current.get()
+
+
+class Operation(object):
+    """
+    Measures of one operation:
+
+    * ``name``: ``get``, ``mget``, ``save``, ``update``, ``delete``,
+      ``search``, ``bulk``... (``aget`` etc for the async versions)
+    * ``model``: name of the ``Document`` class, ``index``
+    * ``duration``: seconds, ``phases``: seconds spent building the body
+      (``build``), serializing it (``serialize``), waiting for elasticsearch
+      (``request``, serialization and decoding excluded), decoding the
+      response (``decode``) and building the instances (``hydrate``)
+    * ``request_bytes`` / ``response_bytes``: size of the JSON bodies, only
+      known for clients using a serializer (``None`` otherwise)
+    * ``hits``: number of documents returned, ``total`` hits of a search
+    * ``took`` and ``shards``: reported by elasticsearch when it does
+    * ``cached``: served by the ``get`` / ``mget`` / search cache
+    * ``error``: exception raised by the operation
+    """
+
+    def __init__(self, name, model, index=None):
+        self.name = name
+        self.model = model
+        self.index = index
+        self.phases = {}
+        self.request_bytes = None
+        self.response_bytes = None
+        self.hits = None
+        self.total = None
+        self.took = None
+        self.shards = None
+        self.cached = False
+        self.error = None
+        self.duration = None
+        self._in_phase = False
+        self._overhead = 0.0
+
+    def __repr__(self):
+        return "Operation({}.{}, duration={!r}, phases={!r})".format(
+            self.model, self.name, self.duration, self.phases
+        )
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_value is not None:
+            self.error = exc_value
+        for listener in list(_listeners):
+            try:
+                listener(self)
+            except Exception:
+                logger.exception("instrumentation listener %r failed", listener)
+        return False
+
+    def phase(self, name):
+        """Context manager adding the time spent in its block to ``name``."""
+        return _Phase(self, name)
+
+    def add_phase(self, name, elapsed):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+        # serializing / decoding inside another phase is not counted twice
+        if self._in_phase:
+            self._overhead += elapsed
+
+    def add_bytes(self, request=0, response=0):
+        if request:
+            self.request_bytes = (self.request_bytes or 0) + request
+        if response:
+            self.response_bytes = (self.response_bytes or 0) + response
+
+    def response(self, response, hits=None):
+        """Record what elasticsearch reports in ``response`` (``took``,
+        ``_shards``, total hits)."""
+        if not isinstance(response, dict):
+            return
+        if "took" in response:
+            self.took = (self.took or 0) + response["took"]
+        if "_shards" in response:
+            self.shards = response["_shards"]
+        total = response.get("hits", {}).get("total")
+        if total is not None:
+            self.total = total["value"] if isinstance(total, dict) else total
+        if hits is not None:
+            self.hits = (self.hits or 0) + hits
+
+
+class _Phase(object):
+    __slots__ = ("operation", "name", "started")
+
+    def __init__(self, operation, name):
+        self.operation = operation
+        self.name = name
+
+    def __enter__(self):
+        self.operation._in_phase = True
+        self.operation._overhead = 0.0
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        elapsed = time.perf_counter() - self.started
+        op = self.operation
+        op._in_phase = False
+        op.add_phase(self.name, elapsed - op._overhead)
+        return False
+
+
+class NullOperation(object):
+    """Returned by :func:`operation` when nothing listens, does nothing."""
+
+    cached = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+    def phase(self, name):
+        return self
+
+    def add_phase(self, name, elapsed):
+        pass
+
+    def add_bytes(self, request=0, response=0):
+        pass
+
+    def response(self, response, hits=None):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_OPERATION = NullOperation()
+
+
+def operation(name, doc_class, index=None):
+    """
+    :class:`Operation` to run ``name`` of ``doc_class`` (a ``Document``
+    class or a name) in.
+    """
+    if not _listeners:
+        return NULL_OPERATION
+    if isinstance(index, (list, tuple)):
+        index = ",".join(index)
+    return Operation(name, getattr(doc_class, "__name__", doc_class), index)
+
+
+def instrumented(es):
+    """Return the client ``es``, instrumented when someone listens."""
+    if _listeners:
+        instrument_client(es)
+    return es
+
+
+class InstrumentedSerializer(object):
+    """Serializer of a client transport recording its time and output size
+    in the current operation."""
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+
+    def __getattr__(self, name):
+        return getattr(self.serializer, name)
+
+    def dumps(self, data):
+        op = _current.get()
+        # bodies already serialized (eg. bulk) pass through
+        if op is None or isinstance(data, (str, bytes)):
+            return self.serializer.dumps(data)
+        started = time.perf_counter()
+        s = self.serializer.dumps(data)
+        op.add_phase("serialize", time.perf_counter() - started)
+        op.add_bytes(request=len(s.encode("utf-8")) if isinstance(s, str) else len(s))
+        return s
+
+
+class InstrumentedDeserializer(object):
+    """Deserializer of a client transport recording its time and input size
+    in the current operation."""
+
+    def __init__(self, deserializer):
+        self.deserializer = deserializer
+
+    def __getattr__(self, name):
+        return getattr(self.deserializer, name)
+
+    def loads(self, s, mimetype=None):
+        op = _current.get()
+        if op is None:
+            return self.deserializer.loads(s, mimetype)
+        started = time.perf_counter()
+        data = self.deserializer.loads(s, mimetype)
+        op.add_phase("decode", time.perf_counter() - started)
+        op.add_bytes(response=len(s.encode("utf-8")) if isinstance(s, str) else len(s or b""))
+        return data
+
+
+_instrument_lock = threading.Lock()
+
+
+def instrument_client(es):
+    """Wrap the serializer and deserializer of the transport of ``es``, once."""
+    transport = getattr(es, "transport", None)
+    if transport is None or getattr(transport, "_es_odm_instrumented", False):
+        return
+    with _instrument_lock:
+        if getattr(transport, "_es_odm_instrumented", False):
+            return
+        if getattr(transport, "serializer", None) is not None:
+            transport.serializer = InstrumentedSerializer(transport.serializer)
+        if getattr(transport, "deserializer", None) is not None:
+            transport.deserializer = InstrumentedDeserializer(transport.deserializer)
+        transport._es_odm_instrumented = True
+
+
+class LatencyHistogram(object):
+    """
+    Listener aggregating the duration of the operations per ``(model,
+    operation)`` into cumulative buckets, ready to be exported to a metrics
+    system.
+
+    :arg buckets: upper bounds of the buckets in seconds
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, op):
+        key = (op.model, op.name)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "count": 0,
+                    "errors": 0,
+                    "sum": 0.0,
+                    "phases": {},
+                    "buckets": [0] * (len(self.buckets) + 1),
+                }
+            series["count"] += 1
+            series["sum"] += op.duration
+            if op.error is not None:
+                series["errors"] += 1
+            series["buckets"][bisect.bisect_left(self.buckets, op.duration)] += 1
+            for phase, elapsed in op.phases.items():
+                series["phases"][phase] = series["phases"].get(phase, 0.0) + elapsed
+
+    def snapshot(self):
+        """
+        ``{(model, operation): {"count", "errors", "sum", "phases",
+        "buckets"}}`` where ``buckets`` maps every upper bound (``inf`` last)
+        to the cumulative count of operations.
+        """
+        with self._lock:
+            snapshot = {}
+            for key, series in self._series.items():
+                cumulative, total = {}, 0
+                for bound, count in zip(self.buckets + (float("inf"),), series["buckets"]):
+                    total += count
+                    cumulative[bound] = total
+                snapshot[key] = dict(series, phases=dict(series["phases"]), buckets=cumulative)
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,1201 @@
+"""
+In-process stand-in for an elasticsearch cluster, for tests and offline
+load testing of code built on ``Document``::
+
+    from es_odm.memory import add_memory_connection
+
+    add_memory_connection("default")
+    UserODM.init()
+    UserODM(id=1, username="alice").save()
+
+It implements the subset of the client API used by ``Document``: index, get,
+mget, exists, delete, update, bulk, search and msearch (``term``, ``terms``, ``match``,
+``range``, ``bool``... with ``sort``, ``search_after``, points in time and
+scroll), count, delete_by_query and the basic ``indices`` / ``cluster`` calls.
+Writes are refreshed immediately, there is a single shard and no scoring:
+every hit has a score of ``1.0``.
+
+Searches scan every document of their indices, only ``ids`` queries are
+looked up, so the backend is meant for test sized data. Aggregations are
+limited to the ``terms`` and ``filter`` buckets and the ``min``, ``max``,
+``sum``, ``avg`` and ``value_count`` metrics, the others are rejected with a
+400 error.
+"""
+import functools
+import itertools
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from fnmatch import fnmatch
+
+from elasticsearch.exceptions import HTTP_EXCEPTIONS, TransportError
+from elasticsearch.serializer import JSONSerializer
+from elasticsearch_dsl.connections import connections
+
+from es_odm.connections import add_async_connection
+
+
+SHARDS = {"total": 1, "successful": 1, "skipped": 0, "failed": 0}
+WRITE_SHARDS = {"total": 1, "successful": 1, "failed": 0}
+PRIMARY_TERM = 1
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def copy_json(value):
+    """Deep copy of JSON like data, much faster than ``copy.deepcopy``."""
+    if isinstance(value, dict):
+        return {k: copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_json(v) for v in value]
+    return value
+
+
+def deep_merge(target, source):
+    """Merge a partial document the way the update API does: objects are
+    merged recursively, any other value is replaced."""
+    for k, v in source.items():
+        if isinstance(v, dict) and isinstance(target.get(k), dict):
+            deep_merge(target[k], v)
+        else:
+            target[k] = copy_json(v)
+    return target
+
+
+def _error(status, error_type, reason, ignore=(), **extra):
+    """Raise the client exception of ``status`` unless it is in ``ignore``."""
+    info = {"error": {"root_cause": [{"type": error_type, "reason": reason}], "type": error_type,
+                      "reason": reason}, "status": status}
+    info.update(extra)
+    if isinstance(ignore, int):
+        ignore = (ignore,)
+    if status in ignore:
+        return info
+    raise HTTP_EXCEPTIONS.get(status, TransportError)(status, error_type, info)
+
+
+def _ndjson_lines(body):
+    """Objects of a ``_bulk`` / ``_msearch`` body, given as NDJSON or as a list."""
+    if isinstance(body, (str, bytes)):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        return [json.loads(line) for line in body.split("\n") if line.strip()]
+    return [json.loads(line) if isinstance(line, (str, bytes)) else line for line in body]
+
+
+def _split(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [v for v in value.split(",") if v]
+    return list(value)
+
+
+# source filtering
+
+def _wanted(path, patterns):
+    return any(fnmatch(path, p) for p in patterns)
+
+
+def _wanted_below(path, patterns):
+    prefix = path + "."
+    return any(p.startswith(prefix) or fnmatch(prefix, p) for p in patterns)
+
+
+def filter_source(source, includes=None, excludes=None, prefix=""):
+    """Apply ``_source`` includes / excludes (dotted paths, ``*`` wildcards)."""
+    out = {}
+    for k, v in source.items():
+        path = prefix + k
+        if excludes and _wanted(path, excludes):
+            continue
+        if includes and not _wanted(path, includes):
+            if not _wanted_below(path, includes):
+                continue
+            if isinstance(v, dict):
+                v = filter_source(v, includes, excludes, path + ".")
+            elif isinstance(v, list):
+                v = [filter_source(i, includes, excludes, path + ".") for i in v if isinstance(i, dict)]
+            else:
+                continue
+            if not v:
+                continue
+        elif excludes and isinstance(v, dict):
+            v = filter_source(v, None, excludes, path + ".")
+        out[k] = v
+    return out
+
+
+def source_filter(spec=None, includes=None, excludes=None):
+    """
+    Normalize the ``_source`` of a request (``True`` / ``False``, a field or a
+    list of fields, an includes / excludes dict) into ``(enabled, includes,
+    excludes)``.
+    """
+    if isinstance(spec, dict):
+        includes = _split(spec.get("includes", spec.get("include"))) or includes
+        excludes = _split(spec.get("excludes", spec.get("exclude"))) or excludes
+        spec = None
+    if spec is False or spec == "false":
+        return False, None, None
+    if spec not in (None, True, "true"):
+        includes = _split(spec)
+    return True, _split(includes), _split(excludes)
+
+
+def project(source, filtering):
+    enabled, includes, excludes = filtering
+    if not enabled:
+        return None
+    if includes or excludes:
+        return filter_source(source, includes, excludes)
+    return copy_json(source)
+
+
+# queries
+
+def _field_values(source, path):
+    values = [source]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                v = value[part]
+                if isinstance(v, list):
+                    found.extend(v)
+                else:
+                    found.append(v)
+        values = found
+    return [v for v in values if v is not None]
+
+
+def field_values(source, path):
+    values = _field_values(source, path)
+    # multi-fields (eg. "username.keyword") are stored in their parent field
+    if not values and "." in path:
+        parent, sub = path.rsplit(".", 1)
+        if sub in ("keyword", "raw"):
+            values = _field_values(source, parent)
+    return values
+
+
+def _normalize(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _equal(stored, value):
+    value = _normalize(value)
+    if stored == value:
+        return True
+    if isinstance(stored, bool) or isinstance(value, bool):
+        return str(stored).lower() == str(value).lower()
+    if isinstance(stored, (int, float)) and isinstance(value, str) or \
+            isinstance(stored, str) and isinstance(value, (int, float)):
+        try:
+            return float(stored) == float(value)
+        except ValueError:
+            return False
+    return False
+
+
+def _compare(stored, bound):
+    bound = _normalize(bound)
+    if isinstance(stored, str) and isinstance(bound, (int, float)):
+        try:
+            stored = float(stored)
+        except ValueError:
+            return None
+    elif isinstance(bound, str) and isinstance(stored, (int, float)):
+        try:
+            bound = float(bound)
+        except ValueError:
+            return None
+    try:
+        return (stored > bound) - (stored < bound)
+    except TypeError:
+        return None
+
+
+def tokens(value):
+    return TOKEN.findall(str(value).lower())
+
+
+def _single(spec):
+    """``{"field": value}`` of a leaf query, the value being either a plain
+    value or the dict of its parameters."""
+    (field, value), = ((k, v) for k, v in spec.items() if k not in ("boost", "_name"))
+    return field, value
+
+
+def _term(source, spec):
+    field, value = _single(spec)
+    if isinstance(value, dict):
+        value = value["value"]
+    return any(_equal(v, value) for v in field_values(source, field))
+
+
+def _terms(source, spec):
+    field, values = _single(spec)
+    return any(_equal(v, value) for v in field_values(source, field) for value in values)
+
+
+def _match(source, spec):
+    field, value = _single(spec)
+    operator = "or"
+    if isinstance(value, dict):
+        operator = value.get("operator", "or").lower()
+        value = value["query"]
+    stored = field_values(source, field)
+    if not isinstance(value, str):
+        return any(_equal(v, value) for v in stored)
+    wanted = set(tokens(value))
+    if not wanted:
+        return False
+    found = set(t for v in stored for t in tokens(v))
+    return wanted <= found if operator == "and" else bool(wanted & found)
+
+
+def _match_phrase(source, spec):
+    field, value = _single(spec)
+    if isinstance(value, dict):
+        value = value["query"]
+    phrase = " ".join(tokens(value))
+    return any(phrase in " ".join(tokens(v)) for v in field_values(source, field))
+
+
+def _multi_match(source, spec):
+    fields = [f.split("^", 1)[0] for f in spec.get("fields", [])]
+    query = {"query": spec["query"], "operator": spec.get("operator", "or")}
+    return any(_match(source, {f: query}) for f in fields)
+
+
+def _range(source, spec):
+    field, bounds = _single(spec)
+    checks = {"gt": lambda c: c > 0, "gte": lambda c: c >= 0, "lt": lambda c: c < 0, "lte": lambda c: c <= 0}
+    for value in field_values(source, field):
+        for op, check in checks.items():
+            if op in bounds:
+                c = _compare(value, bounds[op])
+                if c is None or not check(c):
+                    break
+        else:
+            return True
+    return False
+
+
+def _prefix(source, spec):
+    field, value = _single(spec)
+    if isinstance(value, dict):
+        value = value["value"]
+    return any(isinstance(v, str) and v.startswith(value) for v in field_values(source, field))
+
+
+def _wildcard(source, spec):
+    field, value = _single(spec)
+    if isinstance(value, dict):
+        value = value.get("value", value.get("wildcard"))
+    return any(isinstance(v, str) and fnmatch(v, value) for v in field_values(source, field))
+
+
+def _exists(source, spec):
+    return bool(field_values(source, spec["field"]))
+
+
+def _clauses(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _bool(doc, spec):
+    must = _clauses(spec.get("must")) + _clauses(spec.get("filter"))
+    should = _clauses(spec.get("should"))
+    if not all(matches(doc, q) for q in must):
+        return False
+    if any(matches(doc, q) for q in _clauses(spec.get("must_not"))):
+        return False
+    minimum = spec.get("minimum_should_match", 0 if must else 1)
+    if should and minimum:
+        return sum(1 for q in should if matches(doc, q)) >= int(minimum)
+    return True
+
+
+def _nested(doc, spec):
+    return matches(doc, spec["query"])
+
+
+LEAF_QUERIES = {
+    "term": _term,
+    "terms": _terms,
+    "match": _match,
+    "match_phrase": _match_phrase,
+    "multi_match": _multi_match,
+    "range": _range,
+    "prefix": _prefix,
+    "wildcard": _wildcard,
+    "exists": _exists,
+}
+
+
+def matches(doc, query):
+    """``True`` if the stored document ``doc`` matches the ``query`` dict."""
+    if not query:
+        return True
+    (name, spec), = query.items()
+    if name == "match_all":
+        return True
+    if name == "match_none":
+        return False
+    if name == "bool":
+        return _bool(doc, spec)
+    if name == "ids":
+        return doc.id in set(str(i) for i in spec["values"])
+    if name in ("constant_score", "nested"):
+        return matches(doc, spec.get("filter", spec.get("query")))
+    leaf = LEAF_QUERIES.get(name)
+    if leaf is None:
+        raise _UnsupportedQuery(name)
+    return leaf(doc.source, spec)
+
+
+def query_ids(query):
+    """
+    ``_id`` a document must have to match ``query`` (an ``ids`` query,
+    alone or required by a ``bool`` one), ``None`` when any may match.
+    """
+    if not query:
+        return None
+    (name, spec), = query.items()
+    if name == "ids":
+        return set(str(i) for i in spec["values"])
+    if name == "constant_score":
+        return query_ids(spec.get("filter"))
+    if name == "bool":
+        for clause in _clauses(spec.get("must")) + _clauses(spec.get("filter")):
+            ids = query_ids(clause)
+            if ids is not None:
+                return ids
+    return None
+
+
+class _UnsupportedQuery(Exception):
+    pass
+
+
+# sorting
+
+def sort_spec(sort):
+    """``[(field, order)]`` of a search ``sort``"""
+    spec = []
+    for item in _clauses(sort):
+        if isinstance(item, str):
+            field, order = item, "desc" if item == "_score" else "asc"
+        else:
+            (field, order), = item.items()
+            if isinstance(order, dict):
+                order = order.get("order", "asc")
+        spec.append((field, order))
+    return spec
+
+
+def sort_values(doc, spec):
+    values = []
+    for field, order in spec:
+        if field == "_score":
+            values.append(1.0)
+        elif field in ("_doc", "_shard_doc"):
+            values.append(doc.order)
+        elif field == "_id":
+            values.append(doc.id)
+        else:
+            found = field_values(doc.source, field)
+            if found:
+                values.append(min(found) if order == "asc" else max(found))
+            else:
+                values.append(None)
+    return values
+
+
+def compare_sort(a, b, spec):
+    for (_, order), x, y in zip(spec, a, b):
+        if x == y:
+            continue
+        # missing values are always last
+        if x is None:
+            return 1
+        if y is None:
+            return -1
+        c = _compare(x, y)
+        if c is None:
+            c = (str(x) > str(y)) - (str(x) < str(y))
+        if c:
+            return c if order == "asc" else -c
+    return 0
+
+
+# aggregations
+
+def _numbers(docs, field):
+    values = []
+    for doc in docs:
+        for value in field_values(doc.source, field):
+            if isinstance(value, bool):
+                continue
+            try:
+                values.append(float(value))
+            except (TypeError, ValueError):
+                pass
+    return values
+
+
+def _agg_min(docs, spec):
+    values = _numbers(docs, spec["field"])
+    return {"value": min(values) if values else None}
+
+
+def _agg_max(docs, spec):
+    values = _numbers(docs, spec["field"])
+    return {"value": max(values) if values else None}
+
+
+def _agg_sum(docs, spec):
+    return {"value": sum(_numbers(docs, spec["field"]), 0.0)}
+
+
+def _agg_avg(docs, spec):
+    values = _numbers(docs, spec["field"])
+    return {"value": sum(values) / len(values) if values else None}
+
+
+def _agg_value_count(docs, spec):
+    return {"value": sum(len(field_values(doc.source, spec["field"])) for doc in docs)}
+
+
+def _bucket(docs, aggs, **bucket):
+    bucket["doc_count"] = len(docs)
+    if aggs:
+        bucket.update(aggregate(docs, aggs))
+    return bucket
+
+
+def _agg_filter(docs, spec, aggs):
+    return _bucket([doc for doc in docs if matches(doc, spec)], aggs)
+
+
+def _bucket_keys(value):
+    """``(key, key_as_string)`` of a value, ``None`` for the ones that cannot be a bucket key."""
+    if isinstance(value, bool):
+        return int(value), str(value).lower()
+    if isinstance(value, (str, int, float)):
+        return value, None
+    return None
+
+
+def _agg_terms(docs, spec, aggs):
+    buckets = {}
+    for doc in docs:
+        # a document counts once per distinct value
+        for value in dict.fromkeys(filter(None, map(_bucket_keys, field_values(doc.source, spec["field"])))):
+            buckets.setdefault(value, []).append(doc)
+    min_doc_count = spec.get("min_doc_count", 1)
+    keys = [keys for keys, matched in buckets.items() if len(matched) >= min_doc_count]
+
+    # the last order first, the sort being stable
+    order = _clauses(spec.get("order")) + [{"_count": "desc"}, {"_key": "asc"}]
+    for item in reversed(order):
+        (by, direction), = item.items()
+        if by == "_count":
+            keys.sort(key=lambda k: len(buckets[k]), reverse=direction == "desc")
+        elif by == "_key":
+            keys.sort(key=lambda k: k[0], reverse=direction == "desc")
+        else:
+            raise _UnsupportedAggregation("terms ordered by [{}]".format(by))
+
+    size = spec.get("size", 10)
+    result = []
+    for key, key_as_string in keys[:size]:
+        bucket = {"key": key} if key_as_string is None else {"key": key, "key_as_string": key_as_string}
+        result.append(_bucket(buckets[(key, key_as_string)], aggs, **bucket))
+    return {
+        "doc_count_error_upper_bound": 0,
+        "sum_other_doc_count": sum(len(buckets[k]) for k in keys[size:]),
+        "buckets": result,
+    }
+
+
+METRIC_AGGREGATIONS = {
+    "min": _agg_min,
+    "max": _agg_max,
+    "sum": _agg_sum,
+    "avg": _agg_avg,
+    "value_count": _agg_value_count,
+}
+
+BUCKET_AGGREGATIONS = {
+    "terms": _agg_terms,
+    "filter": _agg_filter,
+}
+
+
+def aggregate(docs, aggs):
+    """``aggregations`` of a search response, computed on the matching ``docs``."""
+    result = {}
+    for name, definition in aggs.items():
+        sub_aggs = definition.get("aggs", definition.get("aggregations"))
+        (kind, spec), = ((k, v) for k, v in definition.items() if k not in ("aggs", "aggregations", "meta"))
+        if kind in METRIC_AGGREGATIONS:
+            result[name] = METRIC_AGGREGATIONS[kind](docs, spec)
+        elif kind in BUCKET_AGGREGATIONS:
+            result[name] = BUCKET_AGGREGATIONS[kind](docs, spec, sub_aggs)
+        else:
+            raise _UnsupportedAggregation(kind)
+    return result
+
+
+class _UnsupportedAggregation(Exception):
+    pass
+
+
+class StoredDoc(object):
+    __slots__ = ("index", "id", "source", "seq_no", "version", "routing", "order")
+
+    def __init__(self, index, id, source, seq_no, version, routing, order):
+        self.index = index
+        self.id = id
+        self.source = source
+        self.seq_no = seq_no
+        self.version = version
+        self.routing = routing
+        self.order = order
+
+    def meta(self):
+        meta = {
+            "_index": self.index,
+            "_type": "_doc",
+            "_id": self.id,
+            "_version": self.version,
+            "_seq_no": self.seq_no,
+            "_primary_term": PRIMARY_TERM,
+        }
+        if self.routing is not None:
+            meta["_routing"] = self.routing
+        return meta
+
+
+class MemoryIndex(object):
+    def __init__(self, name, settings=None, mappings=None, aliases=None):
+        self.name = name
+        self.docs = {}
+        self.seq_no = -1
+        self.settings = {}
+        self.mappings = {}
+        self.aliases = dict(aliases or {})
+        self.put_settings(settings or {})
+        self.put_mapping(mappings or {})
+
+    def put_settings(self, settings):
+        for k, v in settings.items():
+            if k == "index" and isinstance(v, dict):
+                self.put_settings(v)
+                continue
+            if k.startswith("index."):
+                k = k[len("index."):]
+            self.settings[k] = v if isinstance(v, dict) or v is None else str(v)
+
+    def put_mapping(self, mappings):
+        deep_merge(self.mappings, mappings)
+
+
+class MemoryIndices(object):
+    """``es.indices`` of :class:`MemoryElasticsearch`"""
+
+    def __init__(self, es):
+        self.es = es
+
+    def create(self, index, body=None, ignore=(), **params):
+        body = body or {}
+        with self.es._lock:
+            if index in self.es._indices:
+                return _error(400, "resource_already_exists_exception",
+                              "index [{}] already exists".format(index), ignore)
+            self.es._indices[index] = MemoryIndex(
+                index, body.get("settings"), body.get("mappings"), body.get("aliases")
+            )
+        return {"acknowledged": True, "shards_acknowledged": True, "index": index}
+
+    def exists(self, index, **params):
+        try:
+            return bool(self.es._resolve(index))
+        except TransportError:
+            return False
+
+    def delete(self, index, ignore=(), **params):
+        with self.es._lock:
+            names = self.es._resolve(index, ignore=ignore)
+            if isinstance(names, dict):
+                return names
+            for name in names:
+                del self.es._indices[name]
+        return {"acknowledged": True}
+
+    def put_mapping(self, body, index=None, ignore=(), **params):
+        for name in self.es._resolve(index, ignore=ignore):
+            self.es._indices[name].put_mapping(body)
+        return {"acknowledged": True}
+
+    def get_mapping(self, index=None, **params):
+        return {name: {"mappings": copy_json(self.es._indices[name].mappings)} for name in self.es._resolve(index)}
+
+    def put_settings(self, body, index=None, **params):
+        for name in self.es._resolve(index):
+            self.es._indices[name].put_settings(body)
+        return {"acknowledged": True}
+
+    def get_settings(self, index=None, name=None, **params):
+        return {
+            i: {"settings": {"index": {
+                k: v for k, v in self.es._indices[i].settings.items() if name is None or fnmatch(k, name)
+            }}}
+            for i in self.es._resolve(index)
+        }
+
+    def exists_alias(self, name, index=None, **params):
+        return any(name in i.aliases for i in self.es._indices.values())
+
+    def refresh(self, index=None, **params):
+        self.es._resolve(index)
+        return {"_shards": SHARDS}
+
+    def flush(self, index=None, **params):
+        return self.refresh(index)
+
+    def forcemerge(self, index=None, **params):
+        return self.refresh(index)
+
+
+class MemoryCluster(object):
+    """``es.cluster`` of :class:`MemoryElasticsearch`"""
+
+    def __init__(self, es):
+        self.es = es
+
+    def health(self, index=None, **params):
+        if index is not None:
+            self.es._resolve(index)
+        return {
+            "cluster_name": "memory",
+            "status": "green",
+            "timed_out": False,
+            "number_of_nodes": 1,
+            "number_of_data_nodes": 1,
+            "active_primary_shards": len(self.es._indices),
+            "active_shards": len(self.es._indices),
+            "unassigned_shards": 0,
+        }
+
+
+class MemoryElasticsearch(object):
+    """
+    Elasticsearch client keeping the documents in memory, see the module
+    documentation. Safe to use from several threads.
+
+    :arg auto_create_index: create missing indices on writes, like
+        elasticsearch does by default
+    """
+
+    def __init__(self, auto_create_index=True):
+        self.auto_create_index = auto_create_index
+        self.transport = _Transport()
+        self.indices = MemoryIndices(self)
+        self.cluster = MemoryCluster(self)
+        self._indices = {}
+        self._lock = threading.RLock()
+        self._order = itertools.count()
+        self._pits = {}
+        self._scrolls = {}
+
+    def __repr__(self):
+        return "MemoryElasticsearch(indices={})".format(sorted(self._indices))
+
+    # helpers
+
+    def _resolve(self, index=None, ignore=(), create=False):
+        """Names of the indices matched by ``index`` (names, aliases,
+        wildcards, comma separated lists or ``None`` for all)."""
+        patterns = _split(index) or ["*"]
+        names = []
+        for pattern in patterns:
+            if pattern in ("_all", "*"):
+                names.extend(self._indices)
+            elif pattern in self._indices:
+                names.append(pattern)
+            elif "*" in pattern:
+                names.extend(n for n in self._indices if fnmatch(n, pattern))
+            else:
+                aliased = [n for n, i in self._indices.items() if pattern in i.aliases]
+                if aliased:
+                    names.extend(aliased)
+                elif create and self.auto_create_index:
+                    self._indices[pattern] = MemoryIndex(pattern)
+                    names.append(pattern)
+                else:
+                    return _error(404, "index_not_found_exception", "no such index [{}]".format(pattern),
+                                  ignore, index=pattern)
+        return list(dict.fromkeys(names))
+
+    def _write_index(self, index):
+        names = self._resolve(index, create=True)
+        if len(names) != 1:
+            _error(400, "illegal_argument_exception",
+                   "index [{}] does not resolve to a single index".format(index))
+        return self._indices[names[0]]
+
+    def _find(self, index, id):
+        names = self._resolve(index)
+        if isinstance(names, dict):
+            return None
+        for name in names:
+            doc = self._indices[name].docs.get(str(id))
+            if doc is not None:
+                return doc
+        return None
+
+    @staticmethod
+    def _check_occ(doc, index, id, if_seq_no, if_primary_term):
+        if if_seq_no is None and if_primary_term is None:
+            return None
+        if doc is None or int(if_seq_no) != doc.seq_no or int(if_primary_term) != PRIMARY_TERM:
+            current = "[{}] and primary term [{}]".format(doc.seq_no, PRIMARY_TERM) if doc else "[-2]"
+            return {
+                "status": 409,
+                "type": "version_conflict_engine_exception",
+                "reason": "[{}]: version conflict, required seqNo [{}], primary term [{}]. current document "
+                          "has seqNo {}".format(id, if_seq_no, if_primary_term, current),
+                "index": index.name,
+            }
+        return None
+
+    def _store(self, index, id, source, current, routing=None):
+        index.seq_no += 1
+        doc = StoredDoc(
+            index.name,
+            id,
+            source,
+            index.seq_no,
+            current.version + 1 if current is not None else 1,
+            routing,
+            current.order if current is not None else next(self._order),
+        )
+        index.docs[id] = doc
+        return doc
+
+    @staticmethod
+    def _write_result(doc, result):
+        meta = doc.meta()
+        meta.update({"result": result, "_shards": WRITE_SHARDS})
+        return meta
+
+    def _op_index(self, index, source, id=None, op_type="index", if_seq_no=None, if_primary_term=None,
+                  routing=None):
+        """``(response, error)`` of an index / create operation"""
+        with self._lock:
+            idx = self._write_index(index)
+            if id is None:
+                id, op_type = uuid.uuid4().hex[:20], "create"
+            id = str(id)
+            current = idx.docs.get(id)
+            if op_type == "create" and current is not None:
+                return None, {"status": 409, "type": "version_conflict_engine_exception",
+                              "reason": "[{}]: version conflict, document already exists".format(id),
+                              "index": idx.name}
+            error = self._check_occ(current, idx, id, if_seq_no, if_primary_term)
+            if error:
+                return None, error
+            doc = self._store(idx, id, copy_json(source), current, routing)
+            return self._write_result(doc, "created" if current is None else "updated"), None
+
+    def _op_update(self, index, id, body, if_seq_no=None, if_primary_term=None, routing=None, **params):
+        with self._lock:
+            idx = self._write_index(index)
+            id = str(id)
+            current = idx.docs.get(id)
+            error = self._check_occ(current, idx, id, if_seq_no, if_primary_term)
+            if error:
+                return None, error
+            if "script" in body:
+                return None, {"status": 400, "type": "illegal_argument_exception",
+                              "reason": "scripts are not supported by the in-memory backend",
+                              "index": idx.name}
+            doc = body.get("doc")
+            if current is None:
+                upsert = doc if body.get("doc_as_upsert") else body.get("upsert")
+                if upsert is None:
+                    return None, {"status": 404, "type": "document_missing_exception",
+                                  "reason": "[_doc][{}]: document missing".format(id), "index": idx.name}
+                stored = self._store(idx, id, copy_json(upsert), None, routing)
+                return self._write_result(stored, "created"), None
+            source = deep_merge(copy_json(current.source), doc or {})
+            if body.get("detect_noop", True) and source == current.source:
+                return self._write_result(current, "noop"), None
+            stored = self._store(idx, id, source, current, routing or current.routing)
+            return self._write_result(stored, "updated"), None
+
+    def _op_delete(self, index, id, if_seq_no=None, if_primary_term=None, **params):
+        with self._lock:
+            idx = self._write_index(index)
+            id = str(id)
+            current = idx.docs.get(id)
+            error = self._check_occ(current, idx, id, if_seq_no, if_primary_term)
+            if error:
+                return None, error
+            if current is None:
+                idx.seq_no += 1
+                return {"_index": idx.name, "_type": "_doc", "_id": id, "_version": 1, "result": "not_found",
+                        "_seq_no": idx.seq_no, "_primary_term": PRIMARY_TERM, "_shards": WRITE_SHARDS}, None
+            del idx.docs[id]
+            idx.seq_no += 1
+            current.seq_no = idx.seq_no
+            current.version += 1
+            return self._write_result(current, "deleted"), None
+
+    @staticmethod
+    def _raise_or_return(response, error, ignore=()):
+        if error is None:
+            return response
+        return _error(error["status"], error["type"], error["reason"], ignore, index=error.get("index"))
+
+    # document APIs
+
+    def info(self, **params):
+        return {"name": "memory", "cluster_name": "memory", "version": {"number": "7.17.0"},
+                "tagline": "You Know, for Search"}
+
+    def ping(self, **params):
+        return True
+
+    def index(self, index, body, id=None, op_type="index", if_seq_no=None, if_primary_term=None, routing=None,
+              ignore=(), **params):
+        response, error = self._op_index(index, body, id, op_type, if_seq_no, if_primary_term, routing)
+        return self._raise_or_return(response, error, ignore)
+
+    def create(self, index, id, body, ignore=(), **params):
+        return self.index(index, body, id=id, op_type="create", ignore=ignore, **params)
+
+    def get(self, index, id, _source=None, _source_includes=None, _source_excludes=None, ignore=(), **params):
+        doc = self._find(index, id)
+        if doc is None:
+            response = {"_index": index, "_type": "_doc", "_id": str(id), "found": False}
+            if isinstance(ignore, int):
+                ignore = (ignore,)
+            if 404 in ignore:
+                return response
+            raise HTTP_EXCEPTIONS[404](404, json.dumps(response), response)
+        hit = doc.meta()
+        hit["found"] = True
+        source = project(doc.source, source_filter(_source, _source_includes, _source_excludes))
+        if source is not None:
+            hit["_source"] = source
+        return hit
+
+    def get_source(self, index, id, **params):
+        return self.get(index, id, **params)["_source"]
+
+    def exists(self, index, id, **params):
+        return self._find(index, id) is not None
+
+    def mget(self, body, index=None, _source=None, _source_includes=None, _source_excludes=None, **params):
+        if "ids" in body:
+            docs = [{"_id": i} for i in body["ids"]]
+        else:
+            docs = body["docs"]
+        filtering = source_filter(_source, _source_includes, _source_excludes)
+        response = []
+        for spec in docs:
+            doc_index = spec.get("_index", index)
+            doc = self._find(doc_index, spec["_id"])
+            if doc is None:
+                response.append({"_index": doc_index, "_type": "_doc", "_id": str(spec["_id"]), "found": False})
+                continue
+            hit = doc.meta()
+            hit["found"] = True
+            source = project(doc.source, source_filter(spec["_source"]) if "_source" in spec else filtering)
+            if source is not None:
+                hit["_source"] = source
+            response.append(hit)
+        return {"docs": response}
+
+    def delete(self, index, id, ignore=(), **params):
+        response, error = self._op_delete(index, id, **params)
+        if error is None and response["result"] == "not_found":
+            return _error(404, "not_found", "document [{}] not found".format(id), ignore, **response)
+        return self._raise_or_return(response, error, ignore)
+
+    def update(self, index, id, body, ignore=(), **params):
+        response, error = self._op_update(index, id, body, **params)
+        return self._raise_or_return(response, error, ignore)
+
+    def bulk(self, body, index=None, **params):
+        start = time.perf_counter()
+        lines = _ndjson_lines(body)
+
+        items, errors = [], False
+        i = 0
+        while i < len(lines):
+            (op_type, header), = lines[i].items()
+            i += 1
+            source = None
+            if op_type != "delete":
+                source = lines[i]
+                i += 1
+            item_index = header.get("_index", index)
+            occ = {"if_seq_no": header.get("if_seq_no"), "if_primary_term": header.get("if_primary_term")}
+            if op_type in ("index", "create"):
+                response, error = self._op_index(item_index, source, header.get("_id"), op_type,
+                                                 routing=header.get("routing"), **occ)
+            elif op_type == "update":
+                response, error = self._op_update(item_index, header["_id"], source, **occ)
+            elif op_type == "delete":
+                response, error = self._op_delete(item_index, header["_id"], **occ)
+            else:
+                response, error = None, {"status": 400, "type": "illegal_argument_exception",
+                                         "reason": "unknown action [{}]".format(op_type)}
+
+            if error is not None:
+                errors = True
+                items.append({op_type: {"_index": item_index, "_type": "_doc", "_id": header.get("_id"),
+                                        "status": error["status"],
+                                        "error": {"type": error["type"], "reason": error["reason"]}}})
+                continue
+            response.pop("_shards", None)
+            response["status"] = {"created": 201, "not_found": 404}.get(response["result"], 200)
+            items.append({op_type: response})
+        return {"took": int((time.perf_counter() - start) * 1000), "errors": errors, "items": items}
+
+    # search APIs
+
+    def _search_docs(self, index, body):
+        """Matching documents of a search body, sorted, with their sort values."""
+        pit = body.get("pit")
+        if pit is not None:
+            if pit["id"] not in self._pits:
+                _error(404, "search_context_missing_exception", "No search context found for id [{}]".format(
+                    pit["id"]))
+            docs = self._pits[pit["id"]]
+        else:
+            names = self._resolve(index)
+            ids = query_ids(body.get("query"))
+            with self._lock:
+                if ids is None:
+                    docs = [doc for name in names for doc in self._indices[name].docs.values()]
+                else:
+                    # looked up instead of scanning every document
+                    found = (self._indices[name].docs.get(i) for name in names for i in ids)
+                    docs = [doc for doc in found if doc is not None]
+
+        query = body.get("query")
+        post_filter = body.get("post_filter")
+        try:
+            docs = [
+                doc for doc in docs
+                if matches(doc, query) and (post_filter is None or matches(doc, post_filter))
+            ]
+        except _UnsupportedQuery as e:
+            _error(400, "parsing_exception", "unknown query [{}] for the in-memory backend".format(e.args[0]))
+
+        spec = sort_spec(body.get("sort"))
+        if spec:
+            keyed = [(sort_values(doc, spec), doc) for doc in docs]
+            keyed.sort(key=functools.cmp_to_key(lambda a, b: compare_sort(a[0], b[0], spec)))
+            after = body.get("search_after")
+            if after is not None:
+                keyed = [(values, doc) for values, doc in keyed if compare_sort(values, after, spec) > 0]
+            return keyed, True
+        docs.sort(key=lambda doc: doc.order)
+        return [(None, doc) for doc in docs], False
+
+    def _hit(self, doc, values, body, filtering):
+        hit = {"_index": doc.index, "_type": "_doc", "_id": doc.id, "_score": None if values else 1.0}
+        if doc.routing is not None:
+            hit["_routing"] = doc.routing
+        source = project(doc.source, filtering)
+        if source is not None:
+            hit["_source"] = source
+        if body.get("seq_no_primary_term"):
+            hit["_seq_no"] = doc.seq_no
+            hit["_primary_term"] = PRIMARY_TERM
+        if body.get("version"):
+            hit["_version"] = doc.version
+        if values is not None:
+            hit["sort"] = values
+        return hit
+
+    def _response(self, keyed, body, start, offset, size, filtering):
+        hits = [self._hit(doc, values, body, filtering) for values, doc in keyed[offset:offset + size]]
+        return {
+            "took": int((time.perf_counter() - start) * 1000),
+            "timed_out": False,
+            "_shards": SHARDS,
+            "hits": {
+                "total": {"value": len(keyed), "relation": "eq"},
+                "max_score": 1.0 if keyed else None,
+                "hits": hits,
+            },
+        }
+
+    def _aggregations(self, index, body, keyed, aggs):
+        if "post_filter" in body or "search_after" in body:
+            # aggregations ignore both
+            matched = {key: body[key] for key in ("query", "pit") if key in body}
+            keyed, _ = self._search_docs(index, matched)
+        try:
+            return aggregate([doc for _, doc in keyed], aggs)
+        except _UnsupportedQuery as e:
+            _error(400, "parsing_exception", "unknown query [{}] for the in-memory backend".format(e.args[0]))
+        except _UnsupportedAggregation as e:
+            _error(400, "illegal_argument_exception",
+                   "aggregation [{}] is not supported by the in-memory backend".format(e.args[0]))
+
+    def search(self, body=None, index=None, scroll=None, _source=None, _source_includes=None,
+               _source_excludes=None, **params):
+        start = time.perf_counter()
+        body = dict(body or {})
+        # named body parameters of the 8.x style client
+        for k in ("query", "sort", "size", "from_", "search_after", "pit", "post_filter", "aggs"):
+            if k in params:
+                body[k.rstrip("_")] = params.pop(k)
+        size = int(params.get("size", body.get("size", 10)))
+        offset = int(params.get("from_", body.get("from", 0)))
+        filtering = source_filter(body.get("_source", _source), _source_includes, _source_excludes)
+
+        keyed, _ = self._search_docs(index, body)
+        response = self._response(keyed, body, start, offset, size, filtering)
+        aggs = body.get("aggs", body.get("aggregations"))
+        if aggs:
+            response["aggregations"] = self._aggregations(index, body, keyed, aggs)
+        if "pit" in body:
+            response["pit_id"] = body["pit"]["id"]
+        if scroll is not None:
+            scroll_id = uuid.uuid4().hex
+            self._scrolls[scroll_id] = (keyed, body, offset + size, size, filtering)
+            response["_scroll_id"] = scroll_id
+        return response
+
+    def msearch(self, body, index=None, **params):
+        start = time.perf_counter()
+        lines = _ndjson_lines(body)
+        responses = []
+        for header, search in zip(lines[::2], lines[1::2]):
+            try:
+                response = self.search(body=search, index=header.get("index", index))
+            except TransportError as e:
+                # every search fails on its own
+                response = e.info
+            else:
+                response["status"] = 200
+            responses.append(response)
+        return {"took": int((time.perf_counter() - start) * 1000), "responses": responses}
+
+    def scroll(self, body=None, scroll_id=None, **params):
+        start = time.perf_counter()
+        scroll_id = scroll_id or (body or {}).get("scroll_id")
+        if scroll_id not in self._scrolls:
+            _error(404, "search_context_missing_exception", "No search context found for id [{}]".format(scroll_id))
+        keyed, body, offset, size, filtering = self._scrolls[scroll_id]
+        self._scrolls[scroll_id] = (keyed, body, offset + size, size, filtering)
+        response = self._response(keyed, body, start, offset, size, filtering)
+        response["_scroll_id"] = scroll_id
+        return response
+
+    def clear_scroll(self, body=None, scroll_id=None, ignore=(), **params):
+        ids = _split(scroll_id or (body or {}).get("scroll_id")) or []
+        for i in ids:
+            self._scrolls.pop(i, None)
+        return {"succeeded": True, "num_freed": len(ids)}
+
+    def count(self, body=None, index=None, **params):
+        body = dict(body or {})
+        if "query" in params:
+            body["query"] = params.pop("query")
+        keyed, _ = self._search_docs(index, {"query": body.get("query")})
+        return {"count": len(keyed), "_shards": SHARDS}
+
+    def delete_by_query(self, index, body, **params):
+        start = time.perf_counter()
+        with self._lock:
+            keyed, _ = self._search_docs(index, {"query": body.get("query")})
+            for _, doc in keyed:
+                self._op_delete(doc.index, doc.id)
+        return {"took": int((time.perf_counter() - start) * 1000), "timed_out": False, "total": len(keyed),
+                "deleted": len(keyed), "failures": []}
+
+    def open_point_in_time(self, index, keep_alive=None, **params):
+        names = self._resolve(index)
+        with self._lock:
+            docs = [doc for name in names for doc in self._indices[name].docs.values()]
+        pit_id = uuid.uuid4().hex
+        self._pits[pit_id] = docs
+        return {"id": pit_id}
+
+    def close_point_in_time(self, body=None, ignore=(), **params):
+        pit_id = (body or {}).get("id")
+        if self._pits.pop(pit_id, None) is None:
+            return _error(404, "search_context_missing_exception",
+                          "No search context found for id [{}]".format(pit_id), ignore)
+        return {"succeeded": True, "num_freed": 1}
+
+
+class _Transport(object):
+    """the only part of the transport used by ``Document``"""
+
+    def __init__(self):
+        self.serializer = JSONSerializer()
+
+
+class AsyncMemoryElasticsearch(object):
+    """
+    ``AsyncElasticsearch`` counterpart of :class:`MemoryElasticsearch`, every
+    call is run on the wrapped (possibly shared) in-memory backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryElasticsearch()
+        self.transport = self.backend.transport
+        self.indices = _AsyncNamespace(self.backend.indices)
+        self.cluster = _AsyncNamespace(self.backend.cluster)
+
+    def __getattr__(self, name):
+        return _async(getattr(self.backend, name))
+
+    async def close(self):
+        pass
+
+
+class _AsyncNamespace(object):
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def __getattr__(self, name):
+        return _async(getattr(self.namespace, name))
+
+
+def _async(method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        return method(*args, **kwargs)
+    return wrapper
+
+
+def add_memory_connection(alias="default", backend=None, async_=True):
+    """
+    Register an in-memory backend as the ``alias`` connection (and async
+    connection when ``async_`` is set) and return it.
+    """
+    backend = backend or MemoryElasticsearch()
+    connections.add_connection(alias, backend)
+    if async_:
+        add_async_connection(alias, AsyncMemoryElasticsearch(backend))
+    return backend
@@ -2,7 +2,7 @@ from typing import (
     Any,
     ClassVar,
     Dict,
-    Set,
+    FrozenSet,
     Type,
 )
 
@@ -13,6 +13,16 @@ from pydantic.main import BaseConfig, ModelMetaclass
 from es_odm.document import ESIndexMeta, InnerESDocumentMeta
 
 
+# config kwargs accepted by pydantic, computed once per process
+ALLOWED_CONFIG_KWARGS: FrozenSet[str] = frozenset(
+    key
+    for key in dir(BaseConfig)
+    if not (
+        key.startswith("__") and key.endswith("__")
+    )  # skip dunder methods and attributes
+)
+
+
 class ESModelMetaclass(ModelMetaclass, ESIndexMeta):
     __config__: Type[BaseConfig]
     __fields__: Dict[str, Any]
@@ -47,17 +57,10 @@ class ESModelMetaclass(ModelMetaclass, ESIndexMeta):
         # Duplicate logic from Pydantic to filter config kwargs because if they are
         # passed directly including the registry Pydantic will pass them over to the
         # superclass causing an error
-        allowed_config_kwargs: Set[str] = {
-            key
-            for key in dir(BaseConfig)
-            if not (
-                key.startswith("__") and key.endswith("__")
-            )  # skip dunder methods and attributes
-        }
         pydantic_kwargs = kwargs.copy()
         config_kwargs = {
             key: pydantic_kwargs.pop(key)
-            for key in pydantic_kwargs.keys() & allowed_config_kwargs
+            for key in pydantic_kwargs.keys() & ALLOWED_CONFIG_KWARGS
         }
 
         if 'Config' not in dict_used:
@@ -122,17 +125,10 @@ class InnerESModelMetaclass(ModelMetaclass, InnerESDocumentMeta):
         # Duplicate logic from Pydantic to filter config kwargs because if they are
         # passed directly including the registry Pydantic will pass them over to the
         # superclass causing an error
-        allowed_config_kwargs: Set[str] = {
-            key
-            for key in dir(BaseConfig)
-            if not (
-                key.startswith("__") and key.endswith("__")
-            )  # skip dunder methods and attributes
-        }
         pydantic_kwargs = kwargs.copy()
         config_kwargs = {
             key: pydantic_kwargs.pop(key)
-            for key in pydantic_kwargs.keys() & allowed_config_kwargs
+            for key in pydantic_kwargs.keys() & ALLOWED_CONFIG_KWARGS
         }
 
         new_cls = super().__new__(cls, name, bases, dict_used, **config_kwargs)
@@ -0,0 +1,306 @@
+"""
+Coalescing of many small independent searches into ``_msearch`` requests,
+each search still gets its own ``Response`` of typed hits::
+
+    with SearchBatch() as batch:
+        admins = batch.add(UserODM.search().filter("term", role="admin"))
+        orders = batch.add(OrderODM.search().sort("-created_at")[:10])
+    admins.result()
+
+In async code (eg. the resolvers of a GraphQL query) the searches executed
+during the same tick of the event loop are sent together::
+
+    batcher = AsyncSearchBatcher()
+    admins, orders = await asyncio.gather(batcher.execute(s1), batcher.execute(s2))
+
+The searches are grouped by connection and sent ``max_searches`` at a time.
+A failing search only fails its own result, with the exception its own
+``execute()`` would have raised. Searches served by the ``SearchCache`` of
+their ``Document`` are not sent. The request parameters of a search go to
+its header or to its body, the ones ``_msearch`` cannot carry (eg.
+``scroll`` or ``filter_path``) are rejected when the search is added.
+"""
+import asyncio
+
+from elasticsearch.exceptions import HTTP_EXCEPTIONS, TransportError
+from elasticsearch_dsl.connections import get_connection
+
+from es_odm.connections import get_async_connection
+from es_odm.instrumentation import NULL_OPERATION, instrumented, operation
+from es_odm.search import ESSearch
+
+DEFAULT_MAX_SEARCHES = 100
+
+# request parameters of a search sent in its _msearch header
+MSEARCH_HEADER_PARAMS = frozenset((
+    "routing", "preference", "search_type", "request_cache", "allow_no_indices", "expand_wildcards",
+    "ignore_unavailable", "ignore_throttled", "allow_partial_search_results", "ccs_minimize_roundtrips",
+))
+# request parameters of a search sent in its body, under the same name
+MSEARCH_BODY_PARAMS = frozenset((
+    "track_total_hits", "track_scores", "timeout", "terminate_after", "version", "seq_no_primary_term",
+    "explain", "min_score", "stats", "_source",
+))
+# source filtering parameters, sent as the _source of the body
+SOURCE_FILTER_PARAMS = {"_source_includes": "includes", "_source_excludes": "excludes"}
+MSEARCH_PARAMS = MSEARCH_HEADER_PARAMS | MSEARCH_BODY_PARAMS | frozenset(SOURCE_FILTER_PARAMS)
+
+
+def check_msearch_params(search):
+    """Raise ``ValueError`` when a parameter of ``search`` cannot be sent through ``_msearch``."""
+    for name in search._params:
+        if name not in MSEARCH_PARAMS:
+            raise ValueError("The {!r} parameter of a search cannot be sent through _msearch.".format(name))
+
+
+def msearch_body(searches):
+    """
+    ``_msearch`` body of ``searches``, a header and a body per search. The
+    parameters of a search go to its header or to its body, see
+    ``MSEARCH_HEADER_PARAMS`` and ``MSEARCH_BODY_PARAMS``.
+    """
+    body = []
+    for s in searches:
+        check_msearch_params(s)
+        header = {"index": s._index} if s._index else {}
+        search = s.to_dict()
+        source = {}
+        for name, value in s._params.items():
+            if name in MSEARCH_HEADER_PARAMS:
+                header[name] = value
+            elif name in MSEARCH_BODY_PARAMS:
+                search[name] = value
+            else:
+                source[SOURCE_FILTER_PARAMS[name]] = value.split(",") if isinstance(value, str) else value
+        if source:
+            # like the parameters of a search, they win over its _source
+            search["_source"] = source
+        body.append(header)
+        body.append(search)
+    return body
+
+
+def response_error(item):
+    """Client exception of a failed search of a ``_msearch`` response."""
+    error = item["error"]
+    status = item.get("status", 500)
+    error_type = error.get("type") if isinstance(error, dict) else error
+    return HTTP_EXCEPTIONS.get(status, TransportError)(status, error_type, item)
+
+
+class SearchResult(object):
+    """Result of a search added to a :class:`SearchBatch`."""
+
+    def __init__(self, batch):
+        self._batch = batch
+        self._response = None
+        self._error = None
+        self._done = False
+
+    def __repr__(self):
+        return "SearchResult(done={})".format(self._done)
+
+    def done(self):
+        return self._done
+
+    def set_result(self, response):
+        self._response, self._done = response, True
+
+    def set_exception(self, error):
+        self._error, self._done = error, True
+
+    def result(self):
+        """``Response`` of the search, the batch is sent first if needed."""
+        if not self._done:
+            self._batch.flush()
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
+class _Pending(object):
+    __slots__ = ("search", "cache", "key", "future")
+
+    def __init__(self, search, future):
+        if not isinstance(search, ESSearch):
+            raise TypeError("Only the searches built by Document.search() can be batched.")
+        if "scroll" in search._params:
+            raise ValueError("Scroll searches cannot be sent through _msearch.")
+        check_msearch_params(search)
+        self.search = search
+        self.future = future
+        self.cache, self.key = search._query_cache()
+
+    def cached(self):
+        """Resolve the future from the ``SearchCache``, if it has the response."""
+        response = self.cache.get(self.key) if self.cache is not None else None
+        if response is None:
+            return False
+        # nothing to store back
+        self.cache = None
+        self.resolve(response, NULL_OPERATION)
+        return True
+
+    def resolve(self, item, op):
+        if self.future.done():
+            # cancelled by its caller
+            return
+        if "error" in item:
+            self.future.set_exception(response_error(item))
+            return
+        if self.cache is not None:
+            self.cache.set(self.key, item)
+        try:
+            self.search._response = self.search._build_response(op, item)
+        except Exception as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(self.search._response)
+
+    def fail(self, error):
+        if not self.future.done():
+            self.future.set_exception(error)
+
+
+def _batches(pending, max_searches):
+    by_using = {}
+    for p in pending:
+        by_using.setdefault(p.search._using, []).append(p)
+    for using, group in by_using.items():
+        for i in range(0, len(group), max_searches):
+            yield using, group[i:i + max_searches]
+
+
+class SearchBatch(object):
+    """
+    Collects searches and sends them in ``_msearch`` requests, when the
+    ``with`` block exits, ``max_searches`` are pending or the result of one
+    of them is asked for.
+
+    :arg max_searches: maximum number of searches per request
+
+    Any additional keyword arguments will be passed to
+    ``Elasticsearch.msearch`` unchanged.
+    """
+
+    def __init__(self, max_searches=DEFAULT_MAX_SEARCHES, **kwargs):
+        self.max_searches = max_searches
+        self.kwargs = kwargs
+        self._pending = []
+
+    def __repr__(self):
+        return "SearchBatch(pending={})".format(len(self._pending))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._pending = []
+        return False
+
+    def add(self, search):
+        """
+        Add ``search`` to the batch.
+
+        :return :class:`SearchResult` of the search
+        """
+        pending = _Pending(search, SearchResult(self))
+        if not pending.cached():
+            self._pending.append(pending)
+            if len(self._pending) >= self.max_searches:
+                self.flush()
+        return pending.future
+
+    def flush(self):
+        """Send the pending searches."""
+        pending, self._pending = self._pending, []
+        for using, batch in _batches(pending, self.max_searches):
+            self._send(instrumented(get_connection(using)), batch)
+
+    def _send(self, es, batch):
+        with operation("msearch", "SearchBatch") as op:
+            try:
+                with op.phase("request"):
+                    response = es.msearch(body=msearch_body(p.search for p in batch), **self.kwargs)
+            except Exception as e:
+                # the whole request failed, so did every search
+                op.error = e
+                for p in batch:
+                    p.fail(e)
+                return
+            with op.phase("hydrate"):
+                for p, item in zip(batch, response["responses"]):
+                    p.resolve(item, op)
+
+
+class AsyncSearchBatcher(object):
+    """
+    Sends the searches executed during the same tick of the event loop in
+    ``_msearch`` requests, at most ``max_searches`` per request. Meant to
+    live as long as a request of the application, not to be shared between
+    event loops.
+
+    Any additional keyword arguments will be passed to
+    ``AsyncElasticsearch.msearch`` unchanged.
+    """
+
+    def __init__(self, max_searches=DEFAULT_MAX_SEARCHES, **kwargs):
+        self.max_searches = max_searches
+        self.kwargs = kwargs
+        self._pending = []
+        self._scheduled = False
+        self._tasks = set()
+
+    def __repr__(self):
+        return "AsyncSearchBatcher(pending={})".format(len(self._pending))
+
+    def execute(self, search):
+        """
+        Future of the ``Response`` of ``search``, to be awaited.
+        """
+        loop = asyncio.get_running_loop()
+        pending = _Pending(search, loop.create_future())
+        if pending.cached():
+            return pending.future
+        self._pending.append(pending)
+        if len(self._pending) >= self.max_searches:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return pending.future
+
+    def _flush(self):
+        self._scheduled = False
+        pending, self._pending = self._pending, []
+        for using, batch in _batches(pending, self.max_searches):
+            task = asyncio.ensure_future(self._send(instrumented(get_async_connection(using)), batch))
+            # keep a reference until it is done
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Send the pending searches now and wait for all the requests."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _send(self, es, batch):
+        with operation("amsearch", "AsyncSearchBatcher") as op:
+            try:
+                with op.phase("request"):
+                    response = await es.msearch(body=msearch_body(p.search for p in batch), **self.kwargs)
+            except Exception as e:
+                op.error = e
+                for p in batch:
+                    p.fail(e)
+                return
+            with op.phase("hydrate"):
+                for p, item in zip(batch, response["responses"]):
+                    p.resolve(item, op)
@@ -0,0 +1,215 @@
+import collections.abc as collections_abc
+
+from elasticsearch_dsl.document import ObjectBase
+from elasticsearch_dsl.field import Object
+from elasticsearch_dsl.search import Search
+from elasticsearch_dsl.utils import AttrDict, AttrList
+
+
+class FieldNotLoaded(AttributeError):
+    """
+    Raised when accessing a field of a partial instance that was not loaded
+    by its :class:`Projection`.
+    """
+
+
+def field_tree(doc_class, paths):
+    """
+    Nested dict of the dotted ``paths`` of ``doc_class``, ``None`` marking a
+    field loaded as a whole::
+
+        field_tree(UserODM, ["id", "profile.nickname"])
+        # {"id": None, "profile": {"nickname": None}}
+    """
+    tree = {}
+    for path in paths:
+        node, mapping = tree, doc_class._doc_type.mapping
+        parts = path.split(".")
+        for i, part in enumerate(parts):
+            # dynamic objects (``dict`` fields) have no properties to check
+            if mapping is not None and part not in mapping:
+                raise ValueError("Unknown field {!r} for {}.".format(path, doc_class.__name__))
+            if i == len(parts) - 1:
+                node[part] = None
+                break
+            if part in node and node[part] is None:
+                # the parent object is already loaded as a whole
+                break
+            field = mapping[part] if mapping is not None else None
+            if mapping is not None and not isinstance(field, Object):
+                raise ValueError("{!r} is not an object field of {}.".format(part, doc_class.__name__))
+            mapping = field._doc_class._doc_type.mapping if field is not None else None
+            if mapping is not None and not any(True for _ in mapping):
+                mapping = None
+            node = node.setdefault(part, {})
+    return tree
+
+
+class LoadedFields(object):
+    """
+    Fields loaded on a partial (inner) document, attached to the instances
+    built by a :class:`Projection`.
+    """
+
+    __slots__ = ("path", "includes", "excludes")
+
+    def __init__(self, path="", includes=None, excludes=None):
+        self.path = path
+        self.includes = includes
+        self.excludes = excludes
+
+    def __repr__(self):
+        return "LoadedFields(path={!r}, includes={!r}, excludes={!r})".format(
+            self.path, self.includes, self.excludes
+        )
+
+    def is_loaded(self, name):
+        if self.includes is not None and name not in self.includes:
+            return False
+        return not (self.excludes and name in self.excludes and self.excludes[name] is None)
+
+    def check(self, doc, name):
+        if name not in doc._d_ and name in doc._doc_type.mapping and not self.is_loaded(name):
+            raise FieldNotLoaded(
+                "Field {!r} of {} was not loaded by the projection, add it to only() "
+                "or remove it from defer() to access it.".format(self.path + name, type(doc).__name__)
+            )
+
+    def child(self, name):
+        includes = self.includes.get(name) if self.includes is not None else None
+        excludes = self.excludes.get(name) if self.excludes else None
+        if includes is None and not excludes:
+            return None
+        return LoadedFields(self.path + name + ".", includes, excludes)
+
+    def apply(self, doc):
+        """Mark ``doc`` and its loaded inner documents as partial."""
+        super(AttrDict, doc).__setattr__("_projection", self)
+        names = set(self.includes or ()) | set(self.excludes or ())
+        for name in names:
+            child = self.child(name)
+            value = doc._d_.get(name)
+            if child is None or value is None:
+                continue
+            if isinstance(value, AttrList):
+                value = value._l_
+            for v in value if isinstance(value, list) else [value]:
+                if isinstance(v, ObjectBase):
+                    child.apply(v)
+        return doc
+
+
+class Projection(object):
+    """
+    Subset of the fields of a ``Document``, created by ``Document.only()`` or
+    ``Document.defer()``::
+
+        UserSummary = UserODM.only("id", "username", "profile.nickname")
+        user = UserSummary.get(42)
+        user.profile.nickname
+        user.age  # raises FieldNotLoaded
+
+    Only these fields are requested from ``_source`` and the instances built
+    are partial: accessing a field that was not loaded raises
+    :class:`FieldNotLoaded` and they cannot be saved as a whole, use
+    ``update()`` instead.
+    """
+
+    def __init__(self, doc_class, includes=(), excludes=()):
+        self.doc_class = doc_class
+        self.includes = tuple(includes)
+        self.excludes = tuple(excludes)
+        self.loaded = LoadedFields(
+            includes=field_tree(doc_class, self.includes) if self.includes else None,
+            excludes=field_tree(doc_class, self.excludes) if self.excludes else None,
+        )
+
+    def __repr__(self):
+        return "Projection({}, includes={!r}, excludes={!r})".format(
+            self.doc_class.__name__, self.includes, self.excludes
+        )
+
+    def source(self):
+        """``_source`` filter of the projection, as accepted by ``Search.source()``"""
+        source = {}
+        if self.includes:
+            source["includes"] = list(self.includes)
+        if self.excludes:
+            source["excludes"] = list(self.excludes)
+        return source
+
+    def _params(self, kwargs):
+        params = dict(kwargs)
+        if self.includes:
+            params["_source_includes"] = list(self.includes)
+        if self.excludes:
+            params["_source_excludes"] = list(self.excludes)
+        return params
+
+    def _apply(self, doc):
+        return self.loaded.apply(doc) if doc is not None else None
+
+    def from_es(self, hit, trusted=False):
+        return self._apply(self.doc_class.from_es(hit, trusted=trusted))
+
+    def get(self, id, using=None, index=None, trusted=False, **kwargs):
+        """
+        Same as ``Document.get`` but only loads the fields of the projection.
+        """
+        return self._apply(self.doc_class.get(id, using=using, index=index, trusted=trusted, **self._params(kwargs)))
+
+    def mget(self, docs, using=None, index=None, **kwargs):
+        """
+        Same as ``Document.mget`` but only loads the fields of the projection.
+        """
+        return [self._apply(doc) for doc in self.doc_class.mget(docs, using=using, index=index, **self._params(kwargs))]
+
+    def imget(self, docs, using=None, index=None, **kwargs):
+        """
+        Same as ``Document.imget`` but only loads the fields of the projection.
+        """
+        for doc in self.doc_class.imget(docs, using=using, index=index, **self._params(kwargs)):
+            yield self._apply(doc)
+
+    def search(self, using=None, index=None, trusted=False):
+        """
+        Same as ``Document.search`` but only loads the fields of the projection.
+        """
+        s = self.doc_class.search(using=using, index=index, trusted=trusted)
+        return s.source(**self.source()).projection(self)
+
+    def iter_all(self, query=None, using=None, index=None, **kwargs):
+        """
+        Same as ``Document.iter_all`` but only loads the fields of the projection.
+        """
+        if isinstance(query, Search):
+            s = query.source(**self.source())
+        else:
+            s = self.search(using=using, index=index)
+            if isinstance(query, collections_abc.Mapping):
+                s = s.update_from_dict({"query": query})
+            elif query is not None:
+                s = s.query(query)
+        for doc in self.doc_class.iter_all(s, using=using, index=index, **kwargs):
+            yield self._apply(doc)
+
+    async def aget(self, id, using=None, index=None, trusted=False, **kwargs):
+        """
+        Async version of :meth:`get`.
+        """
+        doc = await self.doc_class.aget(id, using=using, index=index, trusted=trusted, **self._params(kwargs))
+        return self._apply(doc)
+
+    async def amget(self, docs, using=None, index=None, **kwargs):
+        """
+        Async version of :meth:`mget`.
+        """
+        docs = await self.doc_class.amget(docs, using=using, index=index, **self._params(kwargs))
+        return [self._apply(doc) for doc in docs]
+
+    def asearch(self, using=None, index=None, trusted=False):
+        """
+        Async version of :meth:`search`.
+        """
+        s = self.doc_class.asearch(using=using, index=index, trusted=trusted)
+        return s.source(**self.source()).projection(self)
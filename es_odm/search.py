@@ -0,0 +1,152 @@
+from elasticsearch_dsl.connections import get_connection
+from elasticsearch_dsl.search import Search
+
+from es_odm.instrumentation import NULL_OPERATION, instrumented, operation
+
+
+class ESSearch(Search):
+    """
+    :class:`~elasticsearch_dsl.Search` returned by ``Document.search()``.
+
+    With ``trusted()`` the hits are built without coercing the values returned
+    by elasticsearch, see ``Document.from_es``. With ``projection()`` they are
+    partial instances, see ``Document.only``. With ``views()`` they are
+    read-only :class:`~es_odm.views.HitView`.
+
+    The responses are cached when the ``Document`` searched has a
+    ``SearchCache``, unless ``cache(False)`` is used.
+    """
+
+    def __init__(self, **kwargs):
+        super(ESSearch, self).__init__(**kwargs)
+        self._trusted = False
+        self._projection = None
+        self._use_cache = True
+        self._as_view = False
+
+    def _clone(self):
+        s = super(ESSearch, self)._clone()
+        s._trusted = self._trusted
+        s._projection = self._projection
+        s._use_cache = self._use_cache
+        s._as_view = self._as_view
+        return s
+
+    def trusted(self, trusted=True):
+        """
+        Build the hits of this search without coercion (dates stay strings),
+        inner documents of ``Object`` / ``Nested`` fields are still built.
+        """
+        s = self._clone()
+        s._trusted = trusted
+        return s
+
+    def projection(self, projection):
+        """
+        Build the hits as partial instances of an :class:`~es_odm.projection.Projection`,
+        the ``_source`` filter is set by ``Projection.search()``.
+        """
+        s = self._clone()
+        s._projection = projection
+        return s
+
+    def views(self, enabled=True):
+        """
+        Build the hits as read-only :class:`~es_odm.views.HitView` with the raw
+        ``_source`` values, much cheaper than ``Document`` instances for hits
+        that are only read. ``to_model()`` of a view returns the instance.
+        """
+        s = self._clone()
+        s._as_view = enabled
+        return s
+
+    def cache(self, enabled=True):
+        """
+        Serve this search from the ``SearchCache`` of its ``Document``
+        (default), or always send it to elasticsearch with ``cache(False)``.
+        """
+        s = self._clone()
+        s._use_cache = enabled
+        return s
+
+    def _query_cache(self):
+        """
+        ``(cache, key)`` of this search, ``(None, None)`` when it is not
+        cached: no ``SearchCache``, ``cache(False)``, scrolls and point in
+        time searches.
+        """
+        if not self._use_cache or len(self._doc_type) != 1:
+            return None, None
+        cache = getattr(self._doc_type[0], "_search_cache", None)
+        if cache is None or "scroll" in self._params:
+            return None, None
+        body = self.to_dict()
+        if "pit" in body:
+            return None, None
+        return cache, cache.key(self._index, body, self._params, using=self._using)
+
+    def _operation(self, name):
+        model = self._doc_type[0] if self._doc_type else self.__class__
+        return operation(name, model, self._index)
+
+    def execute(self, ignore_cache=False):
+        """
+        Execute the search and return an instance of ``Response`` wrapping all
+        the data.
+
+        :arg ignore_cache: if set to ``True``, consecutive calls will hit
+            ES, while cached result will be ignored. Defaults to `False`
+        """
+        if ignore_cache or not hasattr(self, "_response"):
+            with self._operation("search") as op:
+                cache, key = self._query_cache()
+                response = cache.get(key) if cache is not None else None
+                if response is not None:
+                    op.cached = True
+                else:
+                    es = instrumented(get_connection(self._using))
+                    with op.phase("request"):
+                        response = es.search(index=self._index, body=self.to_dict(), **self._params)
+                    if cache is not None:
+                        cache.set(key, response)
+                self._response = self._build_response(op, response)
+        return self._response
+
+    def delete(self):
+        """
+        delete() executes the query by delegating to delete_by_query()
+        """
+        response = super(ESSearch, self).delete()
+        self._invalidate_query_cache()
+        return response
+
+    def _invalidate_query_cache(self):
+        for doc_type in self._doc_type:
+            if hasattr(doc_type, "_invalidate_search_cache"):
+                doc_type._invalidate_search_cache()
+
+    def _build_response(self, op, response):
+        op.response(response, hits=len(response["hits"]["hits"]))
+        with op.phase("hydrate"):
+            response = self._response_class(self, response)
+            # hits are built lazily, build them here when they are measured
+            if op is not NULL_OPERATION:
+                response.hits
+        return response
+
+    def _get_result(self, hit, parent_class=None):
+        result = self._build_result(hit, parent_class)
+        if self._projection is not None and isinstance(result, self._projection.doc_class):
+            self._projection.loaded.apply(result)
+        return result
+
+    def _build_result(self, hit, parent_class=None):
+        if self._as_view and "_nested" not in hit:
+            for doc_type in self._doc_type:
+                if hasattr(doc_type, "view_class") and doc_type._matches(hit):
+                    return doc_type.view_class().from_es(hit)
+        if self._trusted and "_nested" not in hit and "inner_hits" not in hit:
+            for doc_type in self._doc_type:
+                if hasattr(doc_type, "_matches") and doc_type._matches(hit):
+                    return doc_type.from_es(hit, trusted=True)
+        return super(ESSearch, self)._get_result(hit, parent_class)
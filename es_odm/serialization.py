@@ -0,0 +1,127 @@
+import collections.abc as collections_abc
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+
+from elasticsearch_dsl.field import Date, Field, Object
+from elasticsearch_dsl.utils import AttrList
+
+
+TIME_TYPES = (date, datetime, time)
+MULTI_TYPES = (list, tuple, AttrList)
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, TIME_TYPES) else value
+
+
+def _decimal(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _enum(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def _seconds(value):
+    # timedelta fields are mapped as Integer by get_dsl_field
+    return int(value.total_seconds()) if isinstance(value, timedelta) else value
+
+
+def _inner_to_dict(value):
+    if isinstance(value, collections_abc.Mapping):
+        return value
+    return value.to_dict()
+
+
+def _inner_to_body(value):
+    if isinstance(value, collections_abc.Mapping):
+        return value
+    to_body = getattr(value, "_to_body", None)
+    return to_body() if to_body is not None else value.to_dict()
+
+
+def _has_custom_serialize(field):
+    return type(field)._serialize is not Field._serialize
+
+
+def dict_converter(field):
+    """converter used by ``to_dict()``, same result as ``Field.serialize``"""
+    if isinstance(field, Object):
+        return _inner_to_dict
+    if _has_custom_serialize(field):
+        return field._serialize
+    return None
+
+
+def body_converter(field, type_=None):
+    """converter used for request bodies, the values are ready to be dumped to JSON"""
+    if isinstance(field, Object):
+        return _inner_to_body
+    if _has_custom_serialize(field):
+        return field._serialize
+    if not isinstance(type_, type):
+        return _iso if isinstance(field, Date) else None
+    if issubclass(type_, TIME_TYPES) or isinstance(field, Date):
+        return _iso
+    if issubclass(type_, Decimal):
+        return _decimal
+    if issubclass(type_, Enum):
+        return _enum
+    if issubclass(type_, timedelta):
+        return _seconds
+    return None
+
+
+class DocSerializer(object):
+    """
+    Serialization plan of a document class, built once when the class is
+    created from its mapping and its pydantic fields.
+
+    Unlike ``ObjectBase.to_dict`` the mapping is not looked up for every
+    field on every call: only the fields with a converter (inner documents,
+    dates, ``Decimal``, ``Enum``, ``timedelta``) do any work.
+    """
+
+    def __init__(self, mapping, model_fields=None):
+        model_fields = model_fields or {}
+        self.fields = []
+        self.dict_plan = {}
+        self.body_plan = {}
+        for name in mapping:
+            field = mapping[name]
+            model_field = model_fields.get(name)
+            self.fields.append(name)
+            self.dict_plan[name] = dict_converter(field)
+            self.body_plan[name] = body_converter(field, getattr(model_field, "type_", None))
+
+    def __repr__(self):
+        return "DocSerializer({})".format(", ".join(self.fields))
+
+    def to_dict(self, data, skip_empty=True, body=False):
+        """
+        Serialize the ``_d_`` of a document.
+
+        :arg skip_empty: strip empty values (``None``, ``[]``, ``{}``)
+        :arg body: also convert dates, ``Decimal``, ``Enum`` and ``timedelta``
+            so the result can be dumped to JSON as is
+        """
+        plan = self.body_plan if body else self.dict_plan
+        out = {}
+        for k, v in data.items():
+            convert = plan.get(k)
+            if isinstance(v, MULTI_TYPES):
+                if isinstance(v, AttrList):
+                    v = v._l_
+                if convert is not None:
+                    v = [None if i is None else convert(i) for i in v]
+            elif convert is not None and v is not None:
+                v = convert(v)
+
+            # don't serialize empty values
+            # careful not to include numeric zeros
+            if skip_empty and v in ([], {}, None):
+                continue
+
+            out[k] = v
+        return out
@@ -0,0 +1,153 @@
+"""
+JSON serializer of the request and response bodies, backed by orjson when it
+is installed and by the standard library otherwise::
+
+    from es_odm.serializer import register_serializer
+
+    connections.create_connection(hosts=["localhost"])
+    register_serializer()  # the "default" alias
+
+Values are encoded the way ``get_dsl_field`` maps their type: dates, times
+and datetimes as ISO 8601 strings, ``timedelta`` as integer seconds,
+``Decimal`` as float, ``Enum`` as its value and ``bytes`` as base64.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+
+from elasticsearch.exceptions import SerializationError
+from elasticsearch.serializer import JSONSerializer
+from elasticsearch_dsl.connections import get_connection
+from elasticsearch_dsl.utils import AttrList
+
+from es_odm.connections import get_async_connection
+from es_odm.instrumentation import InstrumentedDeserializer, InstrumentedSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+TIME_TYPES = (date, datetime, time)
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_default(data):
+    """
+    JSON value of the ``data`` neither orjson nor ``json`` encode natively,
+    raises ``TypeError`` for unknown types.
+    """
+    if isinstance(data, TIME_TYPES):
+        return data.isoformat()
+    if isinstance(data, timedelta):
+        # timedelta fields are mapped as Integer by get_dsl_field
+        return int(data.total_seconds())
+    if isinstance(data, Decimal):
+        return float(data)
+    if isinstance(data, Enum):
+        return data.value
+    if isinstance(data, (bytes, bytearray)):
+        return base64.b64encode(data).decode("ascii")
+    if isinstance(data, uuid.UUID):
+        return str(data)
+    if isinstance(data, AttrList):
+        return data._l_
+    if isinstance(data, (set, frozenset)):
+        return list(data)
+    # documents and AttrDict
+    to_dict = getattr(data, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    raise TypeError("Unable to serialize %r (type: %s)" % (data, type(data)))
+
+
+class ESJSONSerializer(JSONSerializer):
+    """
+    ``JSONSerializer`` using orjson when available, see
+    :func:`encode_default` for the types it encodes besides the JSON ones.
+    ``dumps_bytes`` skips the ``str`` round trip, it is used for the lines of
+    the ``_bulk`` requests.
+    """
+
+    mimetype = "application/json"
+
+    def default(self, data):
+        try:
+            return encode_default(data)
+        except TypeError:
+            return super(ESJSONSerializer, self).default(data)
+
+    def dumps_bytes(self, data):
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, str):
+            return data.encode("utf-8")
+        try:
+            if orjson is not None:
+                return orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+            return json.dumps(data, default=self.default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except (ValueError, TypeError) as e:
+            raise SerializationError(data, e)
+
+    def dumps(self, data):
+        # don't serialize strings
+        if isinstance(data, (str, bytes)):
+            return data
+        if orjson is None:
+            return super(ESJSONSerializer, self).dumps(data)
+        return self.dumps_bytes(data).decode("utf-8")
+
+    def loads(self, s):
+        if orjson is None:
+            return super(ESJSONSerializer, self).loads(s)
+        try:
+            return orjson.loads(s)
+        except (ValueError, TypeError) as e:
+            raise SerializationError(s, e)
+
+
+serializer = ESJSONSerializer()
+
+
+def use_serializer(es, serializer=serializer):
+    """
+    Encode the request bodies and decode the JSON responses of the client
+    ``es`` with ``serializer``, the instrumentation wrappers are kept.
+    """
+    transport = es.transport
+    if isinstance(transport.serializer, InstrumentedSerializer):
+        transport.serializer.serializer = serializer
+    else:
+        transport.serializer = serializer
+    deserializer = getattr(transport, "deserializer", None)
+    if isinstance(deserializer, InstrumentedDeserializer):
+        deserializer = deserializer.deserializer
+    if deserializer is not None and hasattr(deserializer, "serializers"):
+        if deserializer.default is deserializer.serializers.get(serializer.mimetype):
+            deserializer.default = serializer
+        deserializer.serializers[serializer.mimetype] = serializer
+    return es
+
+
+def transport_serializer(es):
+    """Serializer of the request bodies of ``es``, without the instrumentation wrapper."""
+    transport = getattr(es, "transport", None)
+    if transport is None:
+        return None
+    s = transport.serializer
+    return s.serializer if isinstance(s, InstrumentedSerializer) else s
+
+
+def register_serializer(using="default", serializer=serializer, async_=False):
+    """
+    :func:`use_serializer` for the client registered as ``using``, the
+    ``AsyncElasticsearch`` one with ``async_``.
+    """
+    es = get_async_connection(using) if async_ else get_connection(using)
+    return use_serializer(es, serializer)
@@ -0,0 +1,272 @@
+import time
+
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl.exceptions import IllegalOperation
+from elasticsearch_dsl.utils import merge
+
+from es_odm.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CHUNK_BYTES,
+    BulkResult,
+    as_doc_id,
+    build_action,
+    chunk_actions,
+    doc_meta,
+    send_chunk,
+)
+from es_odm.document import Document, clear_dirty, mark_dirty
+from es_odm.instrumentation import operation
+
+
+class SessionFlushError(Exception):
+    """
+    Raised by :meth:`ESSession.flush` when some writes failed, the others were
+    applied. ``result`` is the :class:`~es_odm.bulk.BulkResult` of the writes
+    that were sent and ``errors`` its ``failed`` items.
+
+    When a request itself failed (connection error, rejection...) ``error``
+    is its exception and ``unsent`` the ``(op_type, index, id)`` of the
+    writes that were not applied, they stay pending in the session for the
+    next :meth:`~ESSession.flush`. Any other exception is raised as is, the
+    unsent writes staying pending too.
+    """
+
+    def __init__(self, result, unsent=(), error=None):
+        self.result = result
+        self.errors = result.failed
+        self.unsent = list(unsent)
+        self.error = error
+        if self.errors:
+            first = self.errors[0]
+            message = "{} of {} writes failed, first: {} {!r} {}".format(
+                len(self.errors), len(self.errors) + result.success, first["op_type"], first["_id"], first["error"]
+            )
+        else:
+            message = "{} writes applied".format(result.success)
+        if self.unsent:
+            message += ", {} not sent: {!r}".format(len(self.unsent), error)
+        super(SessionFlushError, self).__init__(message)
+
+
+class _Write(object):
+    __slots__ = ("op_type", "doc", "doc_class", "index", "id", "fields")
+
+    def __init__(self, op_type, doc, doc_class, index, id, fields=None):
+        self.op_type = op_type
+        self.doc = doc
+        self.doc_class = doc_class
+        self.index = index
+        self.id = id
+        self.fields = fields
+
+
+class ESSession(object):
+    """
+    Unit of work buffering the writes of many documents, of any models and
+    indices, and sending them in one ``_bulk`` request per connection::
+
+        with ESSession() as session:
+            session.add(user)
+            session.update(order, status="paid")
+            session.delete(cart)
+
+    Writes to the same ``_id`` are coalesced: the last ``add`` / ``delete``
+    wins and the fields of successive updates are merged. Pending writes are
+    sent by :meth:`flush`, when leaving the ``with`` block without an
+    exception, or as soon as ``max_writes`` are pending or the oldest pending
+    one is ``flush_interval`` seconds old (checked on every write). The
+    ``meta`` of the instances is updated like ``save()`` does and failures
+    raise a :class:`SessionFlushError` once the request is done.
+
+    :arg using: connection alias of every write, by default the one of the
+        ``Document`` of each instance
+    :arg max_writes: flush once this many writes are pending
+    :arg flush_interval: flush once the oldest pending write is this many
+        seconds old, ``None`` to only flush on exit or ``max_writes``
+    :arg validate: set to ``False`` to skip validating the saved documents
+    :arg chunk_size: maximum number of documents per request
+    :arg max_chunk_bytes: maximum size of a request in bytes
+
+    Any additional keyword arguments will be passed to
+    ``Elasticsearch.bulk`` unchanged.
+    """
+
+    def __init__(self, using=None, max_writes=DEFAULT_CHUNK_SIZE, flush_interval=None, validate=True,
+                 chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES, **kwargs):
+        self.using = using
+        self.max_writes = max_writes
+        self.flush_interval = flush_interval
+        self.validate = validate
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.kwargs = kwargs
+        self._pending = {}
+        self._since = None
+
+    def __repr__(self):
+        return "ESSession(pending={})".format(len(self._pending))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            # the block failed, its writes are dropped
+            self.rollback()
+        return False
+
+    def _key(self, doc_class, index, doc_id, doc=None):
+        using = doc_class._get_using(self.using)
+        # documents without an id cannot be coalesced
+        return (using, index, str(doc_id)) if doc_id is not None else (using, index, id(doc))
+
+    def _write(self, write):
+        key = self._key(write.doc_class, write.index, write.id, write.doc)
+        if key not in self._pending and self._since is None:
+            self._since = time.monotonic()
+        self._pending[key] = write
+        self._maybe_flush()
+        return write
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self.max_writes or (
+            self.flush_interval is not None and time.monotonic() - self._since >= self.flush_interval
+        ):
+            self.flush()
+
+    def add(self, doc, index=None):
+        """Save (index) ``doc``, replacing any pending write of its ``_id``."""
+        doc._check_complete()
+        doc_id = doc.meta.id if "id" in doc.meta else None
+        return self._write(_Write("index", doc, type(doc), doc._get_index(index), doc_id))
+
+    def update(self, doc, index=None, **fields):
+        """
+        Partial update of ``fields`` of ``doc``, applied to the instance right
+        away like ``update()`` does.
+        """
+        if not fields:
+            raise IllegalOperation("You cannot update a document without updating individual fields.")
+        if "id" not in doc.meta:
+            raise IllegalOperation("You cannot update a document without an id, add() it instead.")
+        index = doc._get_index(index)
+        merge(doc, fields)
+        for name in fields:
+            mark_dirty(doc, name)
+        pending = self._pending.get(self._key(type(doc), index, doc.meta.id))
+        if pending is None:
+            return self._write(_Write("update", doc, type(doc), index, doc.meta.id, set(fields)))
+        if pending.op_type == "delete":
+            raise IllegalOperation("Document {!r} is deleted in this session.".format(doc.meta.id))
+        if pending.doc is not doc:
+            merge(pending.doc, fields)
+        if pending.op_type == "update":
+            pending.fields.update(fields)
+        self._maybe_flush()
+        return pending
+
+    def delete(self, doc, doc_class=None, index=None):
+        """
+        Delete ``doc``, an instance or the ``_id`` of a document of
+        ``doc_class``, replacing any pending write of its ``_id``.
+        """
+        if isinstance(doc, Document):
+            return self._write(_Write("delete", doc, type(doc), doc._get_index(index), doc.meta.id))
+        if doc_class is None:
+            raise ValueError("'doc_class' is required to delete a document by id.")
+        return self._write(_Write("delete", None, doc_class, doc_class._default_index(index), as_doc_id(doc)))
+
+    def rollback(self):
+        """Drop the pending writes, the instances keep their local changes."""
+        self._pending.clear()
+        self._since = None
+
+    def _action(self, write):
+        if write.op_type == "delete":
+            meta = doc_meta(write.doc) if write.doc is not None else {"id": write.id}
+            action, _ = build_action("delete", write.index, meta)
+            return action, None, write.doc
+        if write.op_type == "update":
+            body = {"doc": write.doc._partial_doc(write.fields)}
+            action, source = build_action("update", write.index, doc_meta(write.doc), body)
+            return action, source, write.doc
+        if self.validate:
+            write.doc.full_clean()
+        action, source = build_action("index", write.index, doc_meta(write.doc), write.doc._to_body())
+        return action, source, write.doc
+
+    def flush(self):
+        """
+        Send the pending writes, one ``_bulk`` request (per ``chunk_size``
+        documents) per connection. Writes stay pending until their request is
+        sent: whatever interrupts the flush, the others are kept for the next
+        one.
+
+        :return :class:`~es_odm.bulk.BulkResult`
+        """
+        result = BulkResult()
+        if not self._pending:
+            return result
+        # build every action first, nothing is sent when a document is invalid
+        by_using = {}
+        for key, write in self._pending.items():
+            by_using.setdefault(key[0], []).append((key, write, self._action(write)))
+
+        unsent, error = [], None
+        try:
+            for using, writes in by_using.items():
+                written = BulkResult()
+                sent = 0
+                try:
+                    es = writes[0][1].doc_class._get_connection(using)
+                    with operation("session_flush", "ESSession"):
+                        chunks = chunk_actions((action for _, _, action in writes), es.transport.serializer,
+                                               self.chunk_size, self.max_chunk_bytes)
+                        try:
+                            for lines, items, _ in chunks:
+                                send_chunk(es, lines, items, written, **self.kwargs)
+                                sent += len(items)
+                        except TransportError as e:
+                            # the previous chunks are applied, the others are kept
+                            error = e
+                            unsent.extend(writes[sent:])
+                finally:
+                    for key, _, _ in writes[:sent]:
+                        del self._pending[key]
+                    self._written(using, writes[:sent], written, writes[sent:])
+                    result.merge(written)
+        finally:
+            self._since = time.monotonic() if self._pending else None
+
+        if result.failed or unsent:
+            raise SessionFlushError(
+                result, [(write.op_type, write.index, write.id) for _, write, _ in unsent], error
+            ) from error
+        return result
+
+    @staticmethod
+    def _doc_id(write):
+        return write.doc.meta.id if write.doc is not None and "id" in write.doc.meta else write.id
+
+    def _written(self, using, writes, result, unsent=()):
+        failed = {(f["op_type"], f["_id"]) for f in result.failed}
+        doc_classes = set()
+        # a request that failed may still have been applied, its writes are
+        # dropped from the caches too
+        for _, write, _ in unsent:
+            doc_classes.add(write.doc_class)
+            write.doc_class._invalidate_id(write.index, self._doc_id(write), using)
+        for _, write, _ in writes:
+            doc_classes.add(write.doc_class)
+            doc_id = self._doc_id(write)
+            write.doc_class._invalidate_id(write.index, doc_id, using)
+            if write.doc is not None and write.op_type != "delete" and (write.op_type, doc_id) not in failed:
+                # updates only sent their fields
+                clear_dirty(write.doc, write.fields)
+        for doc_class in doc_classes:
+            doc_class._invalidate_search_cache()
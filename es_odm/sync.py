@@ -0,0 +1,280 @@
+"""
+Incremental synchronization of SQL rows into a ``Document``::
+
+    from sqlmodel import Session, select
+    from es_odm.sync import FileCheckpoint, SQLAlchemySource, SyncEngine
+
+    with Session(engine) as session:
+        source = SQLAlchemySource(session, select(Hero), Hero.updated_at, Hero.id)
+        SyncEngine(HeroODM, source, FileCheckpoint("hero-sync.json")).run()
+
+Rows are read by pages ordered by ``(updated_at, primary key)`` starting after
+the watermark of the previous run, mapped to the fields of the model like
+``orm_mode`` does and upserted through ``_bulk`` with the ``primary_key``
+field of the model as ``_id``, the columns of a row that are ``NULL`` are
+cleared in the document. Unchanged documents are reported as ``noop``
+by elasticsearch. The watermark is saved after every page so an interrupted
+run resumes where it stopped.
+
+Deleted rows are not detected, the watermark only sees inserted and updated
+ones.
+"""
+import datetime
+import decimal
+import json
+import os
+
+from es_odm.bulk import DEFAULT_CHUNK_SIZE, BulkResult
+
+
+def primary_key_field(doc_class):
+    """Name of the ``Field(primary_key=True)`` of ``doc_class``."""
+    for name, field in doc_class.__fields__.items():
+        if getattr(field.field_info, "primary_key", False):
+            return name
+    raise ValueError("{} has no primary_key field to use as _id.".format(doc_class.__name__))
+
+
+def row_value(row, name):
+    if isinstance(row, dict):
+        return row.get(name)
+    return getattr(row, name, None)
+
+
+def row_has(row, name):
+    if isinstance(row, dict):
+        return name in row
+    return hasattr(row, name)
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        (kind, value), = value.items()
+        if kind == "datetime":
+            return datetime.datetime.fromisoformat(value)
+        if kind == "date":
+            return datetime.date.fromisoformat(value)
+        return decimal.Decimal(value)
+    return value
+
+
+class MemoryCheckpoint(object):
+    """Watermark kept in memory, for a single process."""
+
+    def __init__(self, watermark=None):
+        self.watermark = watermark
+
+    def load(self):
+        return self.watermark
+
+    def save(self, watermark):
+        self.watermark = watermark
+
+
+class FileCheckpoint(object):
+    """
+    Watermark stored as JSON in ``path``, replaced atomically so a crash never
+    leaves a partial file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return "FileCheckpoint({!r})".format(self.path)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return _decode(data["updated"]), _decode(data["primary_key"])
+
+    def save(self, watermark):
+        updated, primary_key = watermark
+        tmp = "{}.tmp".format(self.path)
+        with open(tmp, "w") as f:
+            json.dump({"updated": _encode(updated), "primary_key": _encode(primary_key)}, f)
+        os.replace(tmp, self.path)
+
+
+class DBAPISource(object):
+    """
+    Rows of ``table`` read through a DB-API ``connection`` (eg. ``sqlite3``).
+
+    :arg where: extra SQL condition of the rows to sync
+    :arg placeholder: parameter marker of the driver, ``?`` or ``%s``
+    """
+
+    def __init__(self, connection, table, updated_column="updated_at", primary_key_column="id", columns=None,
+                 where=None, placeholder="?"):
+        self.connection = connection
+        self.table = table
+        self.updated_key = updated_column
+        self.primary_key = primary_key_column
+        self.columns = columns
+        self.where = where
+        self.placeholder = placeholder
+
+    def fetch(self, watermark, limit):
+        conditions, params = [], []
+        if self.where:
+            conditions.append("({})".format(self.where))
+        if watermark is not None:
+            p = self.placeholder
+            conditions.append("({u} > {p} OR ({u} = {p} AND {k} > {p}))".format(u=self.updated_key, k=self.primary_key,
+                                                                              p=p))
+            params.extend([watermark[0], watermark[0], watermark[1]])
+        sql = "SELECT {} FROM {}".format(", ".join(self.columns) if self.columns else "*", self.table)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY {}, {} LIMIT {}".format(self.updated_key, self.primary_key, int(limit))
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+class SQLAlchemySource(object):
+    """
+    Rows of a SQLAlchemy / SQLModel ``select()`` executed by ``session`` (a
+    ``Session`` or a ``Connection``). ``updated_column`` and
+    ``primary_key_column`` are columns of the selected entity
+    (eg. ``Hero.updated_at``), rows can be ORM instances or plain rows.
+    """
+
+    def __init__(self, session, query, updated_column, primary_key_column):
+        from sqlalchemy import and_, or_
+
+        self._and, self._or = and_, or_
+        self.session = session
+        self.query = query
+        self.updated_column = updated_column
+        self.primary_key_column = primary_key_column
+        self.updated_key = updated_column.key
+        self.primary_key = primary_key_column.key
+
+    def fetch(self, watermark, limit):
+        stmt = self.query
+        if watermark is not None:
+            updated, primary_key = watermark
+            stmt = stmt.where(self._or(
+                self.updated_column > updated,
+                self._and(self.updated_column == updated, self.primary_key_column > primary_key),
+            ))
+        stmt = stmt.order_by(self.updated_column, self.primary_key_column).limit(limit)
+        rows = []
+        for row in self.session.execute(stmt):
+            # select(Model) yields one ORM instance per row
+            if len(row) == 1 and hasattr(row[0], "__table__"):
+                rows.append(row[0])
+            else:
+                rows.append(dict(row._mapping))
+        return rows
+
+
+class SyncError(Exception):
+    """
+    Raised when elasticsearch rejected some documents of a page, the
+    checkpoint stays before that page so the next run retries it.
+    """
+
+    def __init__(self, result):
+        self.result = result
+        super(SyncError, self).__init__("{} documents failed to sync, first: {}".format(
+            len(result.failed), result.failed[0]))
+
+
+class SyncEngine(object):
+    """
+    Upsert the rows of ``source`` (a :class:`SQLAlchemySource` or
+    :class:`DBAPISource`) newer than the watermark of ``checkpoint`` into
+    ``doc_class``, ``batch_size`` rows per page and ``_bulk`` request.
+
+    Rows that fail validation are reported in the ``failed`` items of the
+    result with their ``_id`` and skipped, failures of elasticsearch raise a
+    :class:`SyncError` without moving the checkpoint past the page.
+    """
+
+    def __init__(self, doc_class, source, checkpoint=None, batch_size=DEFAULT_CHUNK_SIZE, using=None, index=None,
+                 validate=True):
+        self.doc_class = doc_class
+        self.source = source
+        self.checkpoint = checkpoint if checkpoint is not None else MemoryCheckpoint()
+        self.batch_size = batch_size
+        self.using = using
+        self.index = index
+        self.validate = validate
+        self.id_field = primary_key_field(doc_class)
+        self.fields = list(doc_class.__fields__)
+
+    def build(self, row):
+        """Instance of the model of a row, with its primary key as ``_id``."""
+        values = {}
+        for name in self.fields:
+            value = row_value(row, name)
+            if value is not None:
+                values[name] = value
+        doc = self.doc_class(meta={"id": values.get(self.id_field)}, **values)
+        if self.validate:
+            doc.full_clean()
+        return doc
+
+    def run(self, max_pages=None):
+        """
+        Sync the rows changed since the last run, page by page.
+
+        :arg max_pages: stop after this many pages, all by default
+
+        :return :class:`~es_odm.bulk.BulkResult` of all the pages, with the
+            number of rows read in ``rows``
+        """
+        result = BulkResult()
+        result.rows = 0
+        watermark = self.checkpoint.load()
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            rows = self.source.fetch(watermark, self.batch_size)
+            if not rows:
+                break
+            pages += 1
+            result.rows += len(rows)
+
+            docs = []
+            for row in rows:
+                try:
+                    docs.append(self.build(row))
+                except Exception as e:
+                    result.failed.append({"_id": row_value(row, self.id_field), "op_type": "update", "status": None,
+                                          "error": repr(e)})
+            # NULL columns are sent as explicit nulls, the upsert would keep
+            # the previous value of the fields left out
+            fields = [name for name in self.fields if any(row_has(row, name) for row in rows)]
+            page = self.doc_class.bulk_update(
+                docs, fields=fields, using=self.using, index=self.index, doc_as_upsert=True,
+                chunk_size=self.batch_size,
+            )
+            result.merge(page)
+            if page.failed:
+                raise SyncError(page)
+
+            last = rows[-1]
+            watermark = (row_value(last, self.source.updated_key), row_value(last, self.source.primary_key))
+            self.checkpoint.save(watermark)
+            if len(rows) < self.batch_size:
+                break
+        return result
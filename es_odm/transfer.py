@@ -0,0 +1,179 @@
+"""
+Streaming export and import of the documents of a ``Document`` to NDJSON or
+Parquet files, used by ``Document.export()`` and ``Document.import_file()``.
+
+Exported NDJSON files hold one ``{"_id": ..., "_source": {...}}`` object per
+line, Parquet files one column per field, typed after the mapping, plus an
+``_id`` column. Both are written a page at a time from a point in time cursor
+and read back in batches, so the memory used does not depend on the size of
+the file.
+"""
+import json
+import mmap
+import os
+
+from es_odm.bulk import BulkResult
+from es_odm.columns import JSON_METADATA, _import, arrow_schema, hits_to_columns
+
+
+FORMATS = ("ndjson", "parquet")
+
+
+def file_format(path, format=None):
+    """``format`` or the one of the extension of ``path``, NDJSON by default."""
+    if format is None:
+        format = "parquet" if str(path).endswith((".parquet", ".pq")) else "ndjson"
+    if format not in FORMATS:
+        raise ValueError("Unknown format {!r}, use one of {}.".format(format, ", ".join(FORMATS)))
+    return format
+
+
+class BadLine(object):
+    """Line (or Parquet row) of an imported file that could not be indexed."""
+
+    __slots__ = ("line", "error", "text")
+
+    def __init__(self, line, error, text=None):
+        self.line = line
+        self.error = error
+        self.text = text
+
+    def __repr__(self):
+        return "BadLine(line={}, error={!r})".format(self.line, self.error)
+
+    def to_dict(self):
+        return {"_id": None, "op_type": "index", "status": None, "error": repr(self.error), "line": self.line}
+
+
+def iter_ndjson_lines(path):
+    """
+    ``(line number, bytes)`` of the non blank lines of ``path``, read through
+    a memory map so large files are paged in by the OS instead of being
+    loaded.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            number = 0
+            for line in iter(mm.readline, b""):
+                number += 1
+                if line.strip():
+                    yield number, line
+
+
+def iter_ndjson_rows(path):
+    """``(line number, row or None, error)`` of every line of an NDJSON file."""
+    for number, line in iter_ndjson_lines(path):
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, BadLine(number, e, line.decode("utf-8", "replace").rstrip("\n"))
+
+
+def iter_parquet_rows(path, batch_size):
+    pq = _import("pyarrow.parquet")
+    parquet = pq.ParquetFile(path)
+    schema = parquet.schema_arrow
+    encoded = [field.name for field in schema if field.metadata == JSON_METADATA]
+    number = 0
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            number += 1
+            try:
+                for name in encoded:
+                    if row.get(name) is not None:
+                        row[name] = json.loads(row[name])
+            except ValueError as e:
+                yield number, None, BadLine(number, e)
+                continue
+            yield number, row, None
+
+
+def build_doc(doc_cls, row, id_field=None, validate=True):
+    """Instance of ``doc_cls`` for an exported hit or a dict of field values."""
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object, got {}.".format(type(row).__name__))
+    if "_source" in row:
+        _id, source = row.get("_id"), row["_source"]
+    else:
+        source = dict(row)
+        _id = source.pop("_id", None)
+    source = {k: v for k, v in source.items() if v is not None}
+    if _id is None and id_field is not None:
+        _id = source.get(id_field)
+    doc = doc_cls(meta={"id": _id} if _id is not None else {}, **source)
+    if validate:
+        doc.full_clean()
+    return doc
+
+
+def import_file(doc_cls, path, format=None, batch_size=1000, id_field=None, validate=True, on_bad_line=None,
+                using=None, index=None, **kwargs):
+    """
+    Index the rows of the file ``path`` into ``doc_cls`` by batches of
+    ``batch_size`` through ``bulk_save``. Lines that cannot be decoded or
+    validated are reported to ``on_bad_line`` (a :class:`BadLine`) and added
+    to the ``failed`` items of the result with their ``line`` number instead
+    of stopping the import.
+    """
+    format = file_format(path, format)
+    rows = iter_parquet_rows(path, batch_size) if format == "parquet" else iter_ndjson_rows(path)
+    result = BulkResult()
+
+    def bad_line(bad):
+        result.failed.append(bad.to_dict())
+        if on_bad_line is not None:
+            on_bad_line(bad)
+
+    batch = []
+    for number, row, error in rows:
+        if error is None:
+            try:
+                batch.append(build_doc(doc_cls, row, id_field, validate))
+            except Exception as e:
+                error = BadLine(number, e)
+        if error is not None:
+            bad_line(error)
+        if len(batch) >= batch_size:
+            result.merge(doc_cls.bulk_save(batch, using=using, index=index, validate=False, **kwargs))
+            batch = []
+    if batch:
+        result.merge(doc_cls.bulk_save(batch, using=using, index=index, validate=False, **kwargs))
+    return result
+
+
+def export(doc_cls, path, format=None, query=None, fields=None, batch_size=1000, keep_alive="1m", using=None,
+           index=None):
+    """
+    Write the documents of ``doc_cls`` matching ``query`` to ``path``, one
+    page of ``batch_size`` hits at a time. Returns the number of documents
+    written.
+    """
+    format = file_format(path, format)
+    pages = doc_cls._iter_pages(query, batch_size, fields, keep_alive, using, index)
+    if format == "parquet":
+        return export_parquet(doc_cls, path, pages, fields)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for hits in pages:
+            for hit in hits:
+                f.write(json.dumps({"_id": hit["_id"], "_source": hit.get("_source", {})}, separators=(",", ":")))
+                f.write("\n")
+            count += len(hits)
+    return count
+
+
+def export_parquet(doc_cls, path, pages, fields=None):
+    pa = _import("pyarrow")
+    pq = _import("pyarrow.parquet")
+    fields = list(fields) if fields is not None else list(doc_cls._doc_type.mapping)
+    # typed after the mapping, a field missing from the first page has the type of the next ones
+    schema = arrow_schema(doc_cls, fields, meta_id=True)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for hits in pages:
+            batch = hits_to_columns(doc_cls, fields, [hits], meta_id=True).to_arrow(schema)
+            writer.write_table(pa.Table.from_batches([batch]))
+            count += len(hits)
+    return count
@@ -0,0 +1,107 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pydantic import ValidationError
+
+from es_odm.field import validate_model_values
+
+
+ON_ERROR = ("collect", "skip", "raise")
+
+
+class RowValidationError(ValueError):
+    """
+    Raised by ``validate_many(on_error="raise")`` for the first invalid row,
+    ``index`` is its position in the rows and ``errors`` the pydantic errors
+    (``{"loc", "msg", "type"}`` dicts).
+    """
+
+    def __init__(self, index, errors):
+        super(RowValidationError, self).__init__("Row {} is invalid: {}".format(index, errors))
+        self.index = index
+        self.errors = errors
+
+
+class ValidationResult(object):
+    """
+    Result of ``validate_many``: ``valid`` holds the instances built from the
+    valid rows and ``indices`` their positions in the rows, ``errors`` one
+    ``{"index", "errors"}`` dict per invalid row (empty when skipped).
+    """
+
+    def __init__(self):
+        self.valid = []
+        self.indices = []
+        self.errors = []
+
+    def __repr__(self):
+        return "ValidationResult(valid={}, errors={})".format(len(self.valid), len(self.errors))
+
+    def __iter__(self):
+        return iter(self.valid)
+
+    def __len__(self):
+        return len(self.valid)
+
+
+def validate_rows(doc_cls, rows, start=0):
+    """
+    ``(index, values, errors)`` of every row of ``rows``, ``values`` being the
+    coerced field values of the valid ones. Runs in the worker pool so it
+    must stay a module level function.
+    """
+    results = []
+    for i, row in enumerate(rows, start):
+        if not isinstance(row, dict):
+            results.append((i, None, [{"loc": (), "msg": "row must be a dict", "type": "type_error.dict"}]))
+            continue
+        values, errors = validate_model_values(doc_cls, row)
+        if errors:
+            results.append((i, None, ValidationError(errors, doc_cls).errors()))
+        else:
+            results.append((i, values, None))
+    return results
+
+
+def validate_many(doc_cls, rows, on_error="collect", workers=None, mode="process", chunk_size=1000):
+    """
+    Validate ``rows`` (dicts of raw field values) against ``doc_cls`` and
+    build an instance from every valid row. With ``workers`` the rows are
+    validated by chunks of ``chunk_size`` in a pool of processes (or threads
+    with ``mode="thread"``), instances are still built in the caller.
+    """
+    if on_error not in ON_ERROR:
+        raise ValueError("'on_error' must be one of {}.".format(", ".join(ON_ERROR)))
+    if mode not in ("thread", "process"):
+        raise ValueError("'mode' must be 'thread' or 'process'.")
+
+    result = ValidationResult()
+
+    def collect(validated):
+        for index, values, errors in validated:
+            if errors is None:
+                result.valid.append(doc_cls(**values))
+                result.indices.append(index)
+            elif on_error == "raise":
+                raise RowValidationError(index, errors)
+            elif on_error == "collect":
+                result.errors.append({"index": index, "errors": errors})
+
+    rows = list(rows)
+    if not workers or len(rows) <= chunk_size:
+        collect(validate_rows(doc_cls, rows))
+        return result
+
+    executor_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        futures = [
+            executor.submit(validate_rows, doc_cls, rows[start:start + chunk_size], start)
+            for start in range(0, len(rows), chunk_size)
+        ]
+        try:
+            # chunks are collected in order so "raise" reports the first bad row
+            for future in futures:
+                collect(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    return result
@@ -0,0 +1,121 @@
+"""
+Read-only views of hits, much lighter than ``Document`` instances: one
+``__slots__`` class per ``Document`` holding the raw ``_source`` values at
+fixed offsets, without ``AttrDict``, meta object nor coercion::
+
+    for user in UserODM.search().views():
+        user.username, user.meta.id, user.meta.score
+
+    user.to_model()  # full UserODM instance
+
+Values are the ones returned by elasticsearch: dates stay strings and inner
+objects are plain dicts / lists.
+"""
+from elasticsearch_dsl.exceptions import IllegalOperation
+
+
+class HitMeta(object):
+    """Meta data of a hit of a view."""
+
+    __slots__ = ("id", "index", "score", "sort", "version", "seq_no", "primary_term", "routing")
+
+    def __init__(self, hit):
+        self.id = hit.get("_id")
+        self.index = hit.get("_index")
+        self.score = hit.get("_score")
+        self.sort = hit.get("sort")
+        self.version = hit.get("_version")
+        self.seq_no = hit.get("_seq_no")
+        self.primary_term = hit.get("_primary_term")
+        self.routing = hit.get("_routing")
+
+    def __repr__(self):
+        return "HitMeta(id={!r}, index={!r}, score={!r})".format(self.id, self.index, self.score)
+
+    def __contains__(self, name):
+        return getattr(self, name, None) is not None
+
+    def to_hit(self):
+        hit = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                hit[name if name == "sort" else "_" + name] = value
+        return hit
+
+
+class HitView(object):
+    """
+    Base of the view classes built by :func:`view_class`, its subclasses
+    have one slot per field of their ``Document``.
+    """
+
+    __slots__ = ("meta",)
+
+    _doc_class = None
+    _fields = ()
+    _setters = ()
+
+    @classmethod
+    def from_es(cls, hit):
+        view = object.__new__(cls)
+        HitView.meta.__set__(view, HitMeta(hit))
+        source = hit.get("_source") or {}
+        for name, set_ in cls._setters:
+            set_(view, source.get(name))
+        return view
+
+    def __setattr__(self, name, value):
+        raise IllegalOperation("{} is read-only, use to_model() to modify it.".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        self.__setattr__(name, None)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(name, getattr(self, name)) for name in self._fields
+        ))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.meta.id == other.meta.id and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((type(self), self.meta.id))
+
+    def to_dict(self):
+        """``_source`` of the hit, without the missing fields."""
+        source = {}
+        for name in self._fields:
+            value = getattr(self, name)
+            if value is not None:
+                source[name] = value
+        return source
+
+    def to_model(self, trusted=False):
+        """
+        Full instance of the ``Document`` of the view, see
+        ``Document.from_es`` for ``trusted``.
+        """
+        hit = self.meta.to_hit()
+        hit["_source"] = self.to_dict()
+        return self._doc_class.from_es(hit, trusted=trusted)
+
+
+def view_class(doc_class):
+    """
+    :class:`HitView` subclass of ``doc_class`` with one slot per field of its
+    mapping, created once.
+    """
+    view = doc_class.__dict__.get("_view_class")
+    if view is None:
+        fields = tuple(name for name in doc_class._doc_type.mapping if name != "meta")
+        view = type(doc_class.__name__ + "View", (HitView,), {
+            "__slots__": fields,
+            "__module__": doc_class.__module__,
+            "_doc_class": doc_class,
+            "_fields": fields,
+        })
+        view._setters = tuple((name, view.__dict__[name].__set__) for name in fields)
+        # not a field of the pydantic model, set on the class directly
+        type.__setattr__(doc_class, "_view_class", view)
+    return view
@@ -0,0 +1,100 @@
+import copy
+import inspect
+
+import pytest
+from elasticsearch_dsl.connections import connections
+
+from es_odm.connections import remove_async_connection
+from es_odm.memory import MemoryElasticsearch, add_memory_connection
+
+# requests recorded by RecordingMemoryES, by namespace of the client
+RECORDED = {
+    None: ("get", "mget", "index", "update", "delete", "bulk", "search", "msearch", "open_point_in_time",
+           "close_point_in_time"),
+    "indices": ("refresh", "forcemerge", "put_settings"),
+    "cluster": ("health",),
+}
+
+
+def arguments(signature, args, kwargs):
+    """``{name: value}`` of the arguments of a call, positional or not."""
+    bound = signature.bind(*args, **kwargs).arguments
+    for parameter in signature.parameters.values():
+        if parameter.kind == parameter.VAR_KEYWORD:
+            bound.update(bound.pop(parameter.name, {}))
+    return dict(bound)
+
+
+class RecordingMemoryES(MemoryElasticsearch):
+    """
+    ``MemoryElasticsearch`` recording the ``(name, arguments)`` of the
+    requests of ``RECORDED`` in ``calls``. ``fail()`` makes a request raise and
+    ``rewrite()`` changes its responses.
+    """
+
+    def __init__(self):
+        super(RecordingMemoryES, self).__init__()
+        self.calls = []
+        self._failures = {}
+        self._rewrites = {}
+        for namespace, names in RECORDED.items():
+            target = self if namespace is None else getattr(self, namespace)
+            for name in names:
+                setattr(target, name, self._recording(name, getattr(target, name)))
+
+    def _recording(self, name, method):
+        signature = inspect.signature(method)
+
+        def call(*args, **kwargs):
+            # copied, the bodies of paginated requests are reused
+            self.calls.append((name, copy.deepcopy(arguments(signature, args, kwargs))))
+            error = self._failures.pop((name, self.sent(name)), None)
+            if error is not None:
+                raise error
+            response = method(*args, **kwargs)
+            rewrite = self._rewrites.get(name)
+            return rewrite(response) if rewrite is not None else response
+        return call
+
+    def sent(self, name):
+        """Number of ``name`` requests received, ``count`` being the count API."""
+        return len(self.requests(name))
+
+    def requests(self, name):
+        """Arguments of the ``name`` requests received, by name."""
+        return [kwargs for call, kwargs in self.calls if call == name]
+
+    def fail(self, name, error, call=1):
+        """Raise ``error`` on the ``call``-th ``name`` request."""
+        self._failures[(name, call)] = error
+
+    def rewrite(self, name, func):
+        """Pass the responses of the ``name`` requests through ``func``."""
+        self._rewrites[name] = func
+
+
+@pytest.fixture
+def memory_es():
+    """
+    Function registering a new :class:`RecordingMemoryES` (or the
+    ``MemoryElasticsearch`` given as ``client``) as the sync and async
+    connection of an alias and returning it. Any other ``client`` (eg. an
+    ``Elasticsearch`` with a fake connection class) is only registered as
+    the sync connection. The connections are removed after the test.
+    """
+    aliases = []
+
+    def connect(alias, client=None):
+        aliases.append(alias)
+        if client is None or isinstance(client, MemoryElasticsearch):
+            return add_memory_connection(alias, client or RecordingMemoryES())
+        connections.add_connection(alias, client)
+        return client
+
+    yield connect
+    for alias in aliases:
+        connections.remove_connection(alias)
+        try:
+            remove_async_connection(alias)
+        except KeyError:
+            pass
@@ -0,0 +1,36 @@
+import asyncio
+
+from es_odm import ESModel, Field
+
+
+class AsyncUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-async-index'
+
+
+def test_async_get_save_and_search(memory_es):
+    es = memory_es("async-test")
+    AsyncUserODM(meta={"id": "1"}, id=1, username="test_username").save(using="async-test", refresh=True)
+
+    async def run():
+        doc = await AsyncUserODM.aget("1", using="async-test")
+        assert doc.username == "test_username"
+        assert doc.meta.seq_no == 0
+
+        doc.username = "new_username"
+        assert await doc.asave(using="async-test") == "updated"
+        # optimistic concurrency control uses the meta loaded by aget
+        assert es.requests("index")[-1]["if_seq_no"] == 0 and es.requests("index")[-1]["if_primary_term"] == 1
+        assert doc.meta.seq_no == 1
+
+        docs = await AsyncUserODM.amget(["1", "2"], using="async-test")
+        assert docs[0].username == "new_username" and docs[1] is None
+
+        hits = [hit async for hit in AsyncUserODM.asearch(using="async-test").filter("term", id=1)]
+        assert isinstance(hits[0], AsyncUserODM)
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+import json
+import typing
+
+from es_odm import ESModel, Field
+
+
+class BulkUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    tags: typing.List[str] = Field(None, description="tags", keyword=True)
+
+    class Index:
+        name = 'test-bulk-index'
+
+
+def bulk_lines(es, request=-1):
+    """decoded lines of a recorded _bulk request"""
+    return [json.loads(line) for line in es.requests("bulk")[request]["body"].splitlines()]
+
+
+def test_bulk_save_chunks_and_updates_meta(memory_es):
+    es = memory_es("bulk-test")
+
+    docs = [BulkUserODM(id=i, username="user-%d" % i, meta={"id": str(i)}) for i in range(5)]
+    # stale optimistic concurrency control values
+    docs.append(BulkUserODM(id=5, username="broken", meta={"id": "bad", "seq_no": 9, "primary_term": 1}))
+    result = BulkUserODM.bulk_save((d for d in docs), using="bulk-test", chunk_size=2)
+
+    assert es.sent("bulk") == 3
+    assert result.created == ["0", "1", "2", "3", "4"]
+    assert result.failed[0]["_id"] == "bad"
+    assert result.failed[0]["status"] == 409
+    assert docs[1].meta.seq_no == 1
+    assert docs[1].meta.version == 1
+    assert bulk_lines(es, 0)[0] == {"index": {"_index": "test-bulk-index", "_id": "0"}}
+    assert bulk_lines(es, 0)[1] == {"id": 0, "username": "user-0"}
+
+
+def test_bulk_delete_and_update(memory_es):
+    es = memory_es("bulk-test")
+    BulkUserODM.bulk_save([BulkUserODM(id=i, meta={"id": str(i)}) for i in range(3)], using="bulk-test")
+
+    result = BulkUserODM.bulk_delete(["1", {"_id": "2"}], using="bulk-test", max_chunk_bytes=1)
+    assert result.deleted == ["1", "2"]
+    assert es.sent("bulk") == 3
+
+    doc = BulkUserODM(id=0, username="new-name", meta={"id": "0", "seq_no": 0, "primary_term": 1})
+    result = BulkUserODM.bulk_update([doc], fields=["username"], using="bulk-test")
+    assert result.updated == ["0"]
+    assert bulk_lines(es) == [
+        {"update": {"_index": "test-bulk-index", "_id": "0", "if_seq_no": 0, "if_primary_term": 1}},
+        {"doc": {"username": "new-name"}},
+    ]
+    assert doc.meta.seq_no == 5
+
+
+def test_bulk_update_sends_emptied_fields(memory_es):
+    es = memory_es("bulk-test")
+    BulkUserODM(id=1, username="name", tags=["a"], meta={"id": "1"}).save(using="bulk-test")
+
+    doc = BulkUserODM(id=1, username=None, tags=[], meta={"id": "1"})
+    BulkUserODM.bulk_update([doc], fields=["username", "tags"], using="bulk-test")
+    assert bulk_lines(es)[1] == {"doc": {"username": None, "tags": []}}
+    assert BulkUserODM.get(1, using="bulk-test").to_dict(skip_empty=False)["tags"] == []
@@ -0,0 +1,56 @@
+import pytest
+
+from es_odm import ESModel, Field
+
+
+class BulkLoadedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-bulk-load-users'
+        settings = {"number_of_replicas": 2}
+
+
+def settings(es, index):
+    return es.indices.get_settings(index=index)[index]["settings"]["index"]
+
+
+def test_settings_are_tuned_then_restored(memory_es):
+    es = memory_es("bulk-load-test")
+    index = BulkLoadedUserODM._default_index()
+    BulkLoadedUserODM.init(using="bulk-load-test")
+    es.indices.put_settings(index=index, body={"index": {"refresh_interval": "30s", "number_of_replicas": 1}})
+
+    with BulkLoadedUserODM.bulk_load_mode(using="bulk-load-test", forcemerge=True, max_num_segments=1) as name:
+        assert name == index
+        current = settings(es, index)
+        assert current["refresh_interval"] == "-1" and current["number_of_replicas"] == "0"
+        BulkLoadedUserODM.bulk_save([BulkLoadedUserODM(meta={"id": 1}, id=1, username="a")], using="bulk-load-test")
+
+    current = settings(es, index)
+    # the value declared in class Index wins over the previous one
+    assert current["number_of_replicas"] == "2"
+    assert current["refresh_interval"] == "30s"
+    calls = dict(es.calls[-4:])
+    # the memory backend refreshes on forcemerge too
+    assert [c[0] for c in es.calls[-4:]] == ["refresh", "forcemerge", "refresh", "health"]
+    assert calls["forcemerge"]["max_num_segments"] == 1
+    assert calls["health"]["wait_for_status"] == "yellow"
+
+
+def test_missing_index_is_created_and_settings_restored_on_error(memory_es):
+    es = memory_es("bulk-load-error-test")
+
+    with pytest.raises(ZeroDivisionError):
+        with BulkLoadedUserODM.bulk_load_mode(index="test-bulk-load-v2", using="bulk-load-error-test",
+                                              settings={"index.translog.durability": "async"}):
+            assert settings(es, "test-bulk-load-v2")["translog.durability"] == "async"
+            1 / 0
+
+    current = settings(es, "test-bulk-load-v2")
+    assert current["number_of_replicas"] == "2"
+    assert current.get("refresh_interval") is None and current.get("translog.durability") is None
+    # nothing else is done after a failed block
+    assert [c[0] for c in es.calls] == ["put_settings", "put_settings"]
@@ -0,0 +1,86 @@
+from es_odm import ESModel, Field
+from es_odm.cache import LRUCache
+
+
+class CachedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-cache-index'
+
+    class Cache:
+        max_size = 2
+        ttl = 60
+
+
+def test_lru_cache_evicts_and_expires():
+    now = [0]
+    cache = LRUCache(max_size=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.info() == {"hits": 1, "misses": 2, "evictions": 1, "size": 1, "max_size": 2, "ttl": 10}
+
+
+def requested_ids(es, name):
+    return [r["id"] if name == "get" else [d["_id"] for d in r["body"]["docs"]] for r in es.requests(name)]
+
+
+def test_get_and_mget_read_through_cache(memory_es):
+    es = memory_es("cache-test")
+    CachedUserODM.bulk_save(
+        [CachedUserODM(meta={"id": str(i)}, id=i, username="user-%d" % i) for i in (1, 2)], using="cache-test"
+    )
+    CachedUserODM._cache.clear()
+
+    first = CachedUserODM.get("1", using="cache-test")
+    second = CachedUserODM.get("1", using="cache-test")
+    assert requested_ids(es, "get") == ["1"]
+    assert first is not second and second.username == "user-1"
+
+    docs = CachedUserODM.mget(["1", "2", "404"], using="cache-test")
+    assert requested_ids(es, "mget") == [["2", "404"]]
+    assert [d.id if d else None for d in docs] == [1, 2, None]
+
+    # saving the instance invalidates its cache entry
+    second.username = "changed"
+    second.save(using="cache-test")
+    assert CachedUserODM.get("1", using="cache-test").username == "changed"
+    assert requested_ids(es, "get") == ["1", "1"]
+    assert CachedUserODM.cache_info()["hits"] == 2
+
+
+class AliasedUserODM(ESModel):
+    """user document read and written through an alias"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-cache-users'
+
+    class Cache:
+        max_size = 16
+
+
+def test_writes_through_an_alias_invalidate_the_cached_reads(memory_es):
+    for alias in ("cache-alias-test", "cache-alias-other"):
+        es = memory_es(alias)
+        es.indices.create("test-cache-users-v1", body={"aliases": {"test-cache-users": {}}})
+        AliasedUserODM(meta={"id": 1}, id=1, username=alias).save(using=alias, index="test-cache-users-v1")
+
+    for name in ("first", "second"):
+        user = AliasedUserODM.get(1, using="cache-alias-test")
+        assert user.meta.index == "test-cache-users-v1"
+        user.username = name
+        user.save(using="cache-alias-test")
+        assert AliasedUserODM.get(1, using="cache-alias-test").username == name
+
+    # the entries of another cluster are not shared
+    assert AliasedUserODM.get(1, using="cache-alias-other").username == "cache-alias-other"
+    assert AliasedUserODM.mget([1], using="cache-alias-other")[0].username == "cache-alias-other"
@@ -0,0 +1,164 @@
+import datetime
+
+import pytest
+
+from es_odm import ESModel, Field
+from elasticsearch_dsl import Date
+
+from es_odm.columns import Column, Columns, aggregations_to_columns, hits_to_columns, pack_bits, to_epoch_millis
+
+
+class ColumnUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    score: float = Field(None, description="score")
+    active: bool = Field(None, description="active")
+    created: datetime.datetime = Field(None, description="creation date")
+
+    class Index:
+        name = 'test-columns-index'
+
+
+def add_users(alias, count):
+    ColumnUserODM.bulk_save([
+        ColumnUserODM(
+            meta={"id": i},
+            id=i,
+            username="user-%d" % (i % 3) if i != 4 else None,
+            score=i / 2,
+            active=i % 2 == 0,
+            created=datetime.datetime(2022, 1, 1 + i),
+        )
+        for i in range(count)
+    ], using=alias, refresh=True)
+
+
+def test_search_to_columns_types_columns_after_the_mapping(memory_es):
+    memory_es("columns-test")
+    add_users("columns-test", 5)
+    columns = ColumnUserODM.search_to_columns(batch_size=2, using="columns-test", with_id=True)
+
+    assert columns.names == ["_id", "id", "username", "score", "active", "created"]
+    assert [columns[n].kind for n in columns.names] == ["keyword", "int", "keyword", "float", "bool", "datetime"]
+    assert columns["id"].values.typecode == "q"
+    assert sorted(columns["id"].values) == [0, 1, 2, 3, 4]
+
+    rows = sorted(zip(*columns.to_pydict().values()), key=lambda r: r[1])
+    assert rows[4][2] is None and columns["username"].null_count == 1
+    assert rows[1][2:5] == ("user-1", 0.5, False)
+    assert rows[2][5] == datetime.datetime(2022, 1, 3, tzinfo=datetime.timezone.utc)
+    # keywords are dictionary encoded
+    assert sorted(columns["username"].dictionary()) == ["user-0", "user-1", "user-2"]
+
+
+def test_search_to_columns_selected_fields_and_query(memory_es):
+    memory_es("columns-query-test")
+    add_users("columns-query-test", 5)
+    columns = ColumnUserODM.search_to_columns({"term": {"active": True}}, fields=["id"], using="columns-query-test")
+    assert columns.names == ["id"]
+    assert sorted(columns["id"].values) == [0, 2, 4]
+
+
+def test_multi_valued_fields_need_an_object_column():
+    column = Column("tags", "keyword")
+    with pytest.raises(ValueError):
+        column.append(["a", "b"])
+    column = Column("tags")
+    column.append(["a", "b"])
+    assert column.to_pylist() == [["a", "b"]]
+
+
+def test_date_columns_read_every_elasticsearch_format():
+    hits = [
+        {"_id": str(i), "_source": {"created": value}}
+        for i, value in enumerate(["2022-01-02T03:04:05Z", "2022-01-02T03:04:05.120+00:00", "1641092645000",
+                                   1641092645000, "2022/01/02 03:04:05"])
+    ]
+    columns = hits_to_columns(ColumnUserODM, ["created"], [hits])
+    # the last one is parsed by the Date field of the mapping
+    assert list(columns["created"].values) == [1641092645000, 1641092645120] + [1641092645000] * 3
+
+    with pytest.raises(ValueError):
+        Column("created", "datetime").append("2022/01/02 03:04:05")
+
+
+@pytest.mark.parametrize("value, format, expected", [
+    ("20220102", "basic_date", 1641081600000),
+    ("2022", "year", 1640995200000),
+    ("02/01/2022 03:04", "dd/MM/yyyy HH:mm||epoch_millis", 1641092640000),
+    ("1641092645000", "dd/MM/yyyy HH:mm||epoch_millis", 1641092645000),
+    ("1641092645", "epoch_second", 1641092645000),
+    ("2022-01-02T03:04:05.120Z", "strict_date_optional_time", 1641092645120),
+])
+def test_date_values_are_parsed_with_the_formats_of_the_field(value, format, expected):
+    assert to_epoch_millis(value, Date(format=format)) == expected
+
+
+def test_pack_bits():
+    assert pack_bits(bytearray([1, 0, 1, 1, 0, 0, 0, 0, 1])) == bytes([0b1101, 1])
+
+
+def test_aggregations_to_columns_flattens_buckets():
+    aggregations = {
+        "gender": {"buckets": [
+            {"key": 1, "doc_count": 3, "by_day": {"buckets": [
+                {"key": 1640995200000, "key_as_string": "2022-01-01", "doc_count": 2, "avg_age": {"value": 30.5}},
+                {"key": 1641081600000, "key_as_string": "2022-01-02", "doc_count": 1, "avg_age": {"value": 20.0}},
+            ]}},
+            {"key": 2, "doc_count": 1, "by_day": {"buckets": []}},
+        ]},
+    }
+    columns = aggregations_to_columns(aggregations)
+    assert columns.names == ["gender", "by_day", "doc_count", "avg_age"]
+    assert [columns[n].kind for n in columns.names] == ["int", "keyword", "int", "float"]
+    assert columns.to_pydict() == {
+        "gender": [1, 1, 2],
+        "by_day": ["2022-01-01", "2022-01-02", None],
+        "doc_count": [2, 1, 1],
+        "avg_age": [30.5, 20.0, None],
+    }
+
+
+def sample_columns():
+    columns = [Column("id", "int"), Column("score", "float"), Column("active", "bool"), Column("created", "datetime"),
+               Column("username", "keyword"), Column("tags")]
+    rows = [
+        (1, 0.5, True, "2022-01-02T00:00:00Z", "alice", ["a"]),
+        (None, None, None, None, None, None),
+        (3, 1.5, False, 1641168000000, "alice", ["b", "c"]),
+    ]
+    result = Columns(columns)
+    for row in rows:
+        result.append_row(row)
+    return result
+
+
+def test_columns_to_numpy():
+    np = pytest.importorskip("numpy")
+    arrays = sample_columns().to_numpy()
+    assert arrays["id"].dtype == np.int64 and arrays["id"].mask.tolist() == [False, True, False]
+    assert np.isnan(arrays["score"][1]) and arrays["score"][2] == 1.5
+    assert arrays["active"].tolist() == [True, None, False]
+    assert arrays["created"].dtype == np.dtype("datetime64[ms]")
+    assert str(arrays["created"][0]) == "2022-01-02T00:00:00.000" and np.isnat(arrays["created"][1])
+    assert arrays["username"].tolist() == [0, -1, 0]
+    assert arrays["tags"].tolist() == [["a"], None, ["b", "c"]]
+
+
+def test_columns_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    batch = sample_columns().to_arrow()
+    assert batch.schema.field("created").type == pa.timestamp("ms", tz="UTC")
+    assert batch.column(4).type == pa.dictionary(pa.int32(), pa.string())
+    assert batch.to_pydict() == {
+        "id": [1, None, 3],
+        "score": [0.5, None, 1.5],
+        "active": [True, None, False],
+        "created": [
+            datetime.datetime(2022, 1, 2, tzinfo=datetime.timezone.utc), None,
+            datetime.datetime(2022, 1, 3, tzinfo=datetime.timezone.utc),
+        ],
+        "username": ["alice", None, "alice"],
+        "tags": [["a"], None, ["b", "c"]],
+    }
@@ -0,0 +1,90 @@
+import typing
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField
+
+
+class AddressODM(InnerESModel):
+    """address document"""
+    city: str = Field(None, description="city", keyword=True)
+
+
+class DirtyUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+    tags: typing.List[str] = Field(None, description="tags", keyword=True)
+    address: typing.Union[ObjectField[AddressODM], dict] = Field(None, description="address")
+    history: typing.Union[NestedField[AddressODM], list] = Field(None, description="previous addresses")
+
+    class Index:
+        name = 'test-dirty-index'
+
+
+SOURCE = {
+    "id": 1,
+    "username": "alice",
+    "age": 30,
+    "address": {"city": "Paris"},
+    "history": [{"city": "Lyon"}, {"city": "Nice"}],
+}
+
+
+def connect(memory_es):
+    es = memory_es("dirty-test")
+    es.index("test-dirty-index", SOURCE, id="1")
+    return es
+
+
+def updates(es):
+    return [request["body"]["doc"] for request in es.requests("update")]
+
+
+def test_loaded_document_is_clean(memory_es):
+    connect(memory_es)
+    for trusted in (False, True):
+        user = DirtyUserODM.get(1, using="dirty-test", trusted=trusted)
+        assert user.dirty_fields() == set()
+        # reading missing fields assigns their empty values without changing anything
+        assert not user.tags
+        assert user.dirty_fields() == set()
+
+
+def test_save_changes_sends_only_modified_fields(memory_es):
+    es = connect(memory_es)
+    user = DirtyUserODM.get(1, using="dirty-test")
+
+    assert user.save_changes(using="dirty-test") == "noop"
+    assert updates(es) == []
+
+    user.age = 31
+    user.history[1].city = "Marseille"
+    assert user.dirty_fields() == {"age", "history"}
+    assert user.save_changes(using="dirty-test") == "updated"
+
+    assert updates(es)[0] == {"age": 31, "history": [{"city": "Lyon"}, {"city": "Marseille"}]}
+    assert es.requests("update")[0]["if_seq_no"] == 0
+    assert user.meta.seq_no == 1
+    assert user.dirty_fields() == set()
+
+    user.address.city = "Berlin"
+    user.username = None
+    user.save_changes(using="dirty-test")
+    assert updates(es)[1] == {"address": {"city": "Berlin"}, "username": None}
+    assert DirtyUserODM.get(1, using="dirty-test").to_dict()["address"] == {"city": "Berlin"}
+
+
+def test_in_place_changes_and_new_documents(memory_es):
+    es = connect(memory_es)
+    user = DirtyUserODM.get(1, using="dirty-test")
+    user.tags.append("admin")
+    assert user.dirty_fields() == set()
+    user.mark_dirty("tags")
+    user.save_changes(using="dirty-test")
+    assert updates(es) == [{"tags": ["admin"]}]
+
+    new_user = DirtyUserODM(id=2, username="bob")
+    assert new_user.dirty_fields() == {"id", "username"}
+    assert new_user.save_changes(using="dirty-test") == "created"
+    assert es.requests("index")[-1]["body"] == {"id": 2, "username": "bob"}
+    assert new_user.dirty_fields() == set()
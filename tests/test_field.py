@@ -0,0 +1,63 @@
+import datetime
+import enum
+import typing
+
+from elasticsearch_dsl import Boolean, Date, Integer, Keyword, Object, Text
+
+from es_odm import ESModel, Field, InnerESModel, ObjectField
+from es_odm.field import resolve_dsl_field_builder
+
+
+class Color(enum.Enum):
+    red = "red"
+
+
+class Level(enum.IntEnum):
+    low = 1
+
+
+class TagODM(InnerESModel):
+    """tag document"""
+    name: str = Field(None, description="name", keyword=True)
+
+
+class FirstODM(ESModel):
+    """first document sharing fields with SecondODM"""
+    tag: typing.Union[ObjectField[TagODM], dict] = Field(None, description="tag")
+    name: str = Field(None, description="name", keyword=True)
+
+
+class SecondODM(ESModel):
+    """second document sharing fields with FirstODM"""
+    tag: typing.Union[ObjectField[TagODM], dict] = Field(None, description="tag")
+    name: str = Field(None, description="name", fields={"raw": {"type": "keyword"}})
+
+
+def test_resolver_uses_most_specific_type():
+    field = FirstODM.__fields__["name"]
+    assert isinstance(resolve_dsl_field_builder(bool)(field, False, None), Boolean)
+    assert isinstance(resolve_dsl_field_builder(Level)(field, False, None), Integer)
+    assert isinstance(resolve_dsl_field_builder(Color)(field, False, None), Keyword)
+    assert isinstance(resolve_dsl_field_builder(datetime.datetime)(field, False, None), Date)
+    assert isinstance(resolve_dsl_field_builder(typing.Any)(field, False, None), Text)
+
+
+def test_dsl_fields_are_memoized_by_annotation_and_options():
+    first, second = FirstODM._doc_type.mapping, SecondODM._doc_type.mapping
+    assert isinstance(first["tag"], Object)
+    assert first["tag"] == second["tag"] and first["tag"] is not second["tag"]
+    assert first["name"] is not second["name"]
+    assert SecondODM.__fields__["tag"].type_ is FirstODM.__fields__["tag"].type_
+
+
+def test_models_do_not_share_dsl_fields():
+    class ThirdODM(ESModel):
+        """document changing its mapping"""
+        tag: typing.Union[ObjectField[TagODM], dict] = Field(None, description="tag")
+        name: str = Field(None, description="name", keyword=True)
+
+    mapping = ThirdODM._doc_type.mapping
+    mapping["tag"]._params["enabled"] = False
+    mapping["name"]._params["ignore_above"] = 64
+    assert "enabled" not in FirstODM._doc_type.mapping["tag"].to_dict()
+    assert "ignore_above" not in FirstODM._doc_type.mapping["name"].to_dict()
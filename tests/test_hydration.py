@@ -0,0 +1,53 @@
+import copy
+import datetime
+import typing
+
+from es_odm import ESModel, Field, InnerESModel, NestedField
+
+
+class OrderLineODM(InnerESModel):
+    """order line document"""
+    sku: str = Field(None, description="sku", keyword=True)
+    created_at: datetime.datetime = Field(None, description="created at")
+
+
+class OrderODM(ESModel):
+    """order document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    created_at: datetime.datetime = Field(None, description="created at")
+    lines: typing.Union[NestedField[OrderLineODM], list] = Field(None, description="order lines")
+
+    class Index:
+        name = 'test-order-index'
+
+
+HIT = {
+    "_index": "test-order-index",
+    "_id": "1",
+    "_seq_no": 2,
+    "_primary_term": 1,
+    "_source": {
+        "id": 1,
+        "created_at": "2022-01-01T10:00:00",
+        "lines": [{"sku": "a", "created_at": "2022-01-01T10:00:00"}, {"sku": "b"}],
+    },
+}
+
+
+def test_trusted_from_es_builds_inner_docs_without_coercion():
+    doc = OrderODM.from_es(copy.deepcopy(HIT), trusted=True)
+
+    assert doc.meta.id == "1"
+    assert doc.meta.seq_no == 2
+    assert doc.created_at == "2022-01-01T10:00:00"
+    assert isinstance(doc.lines[0], OrderLineODM)
+    assert doc.lines[1].sku == "b"
+    assert doc.to_dict() == HIT["_source"]
+
+
+def test_validated_from_es_coerces_values():
+    doc = OrderODM.from_es(copy.deepcopy(HIT))
+
+    assert doc.created_at == datetime.datetime(2022, 1, 1, 10)
+    assert isinstance(doc.lines[0], OrderLineODM)
+    assert OrderODM.search().trusted()._get_result(copy.deepcopy(HIT)).created_at == "2022-01-01T10:00:00"
@@ -0,0 +1,143 @@
+import datetime
+import enum
+import pickle
+
+import pytest
+
+from elasticsearch.exceptions import TransportError
+
+from es_odm import ESModel, Field
+from es_odm.serializer import ESJSONSerializer, register_serializer
+
+
+class IngestUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-ingest-index'
+
+
+class CachedIngestUserODM(ESModel):
+    """user document read through the caches"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-ingest-cached-index'
+
+    class Cache:
+        max_size = 16
+
+    class SearchCache:
+        ttl = 60
+
+
+def reject_second_request(es):
+    """reject the first request and the first item of the second one"""
+    es.fail("bulk", TransportError(429, "es_rejected_execution_exception", {}), call=1)
+
+    def rewrite(response):
+        if es.sent("bulk") == 2:
+            item = response["items"][0]["index"]
+            # as if it had never been indexed
+            es.delete(item["_index"], item["_id"])
+            response["items"][0] = {"index": {"status": 429, "error": {"type": "es_rejected_execution_exception"}}}
+        return response
+    es.rewrite("bulk", rewrite)
+
+
+def test_parallel_ingest_retries_rejections(memory_es):
+    reject_second_request(memory_es("ingest-test"))
+    progress = []
+
+    rows = ({"id": i, "username": "user-%d" % i} for i in range(50))
+    result = IngestUserODM.parallel_ingest(
+        rows, workers=2, using="ingest-test", chunk_size=10, concurrency=1,
+        initial_backoff=0.001, on_progress=progress.append, refresh=True,
+    )
+
+    hits = IngestUserODM.search(using="ingest-test").extra(size=100).execute()
+    assert sorted(hit.id for hit in hits) == list(range(50))
+    assert len(result.created) == 50
+    assert not result.failed
+    assert result.stats.docs == 50
+    assert result.stats.rejections == 2
+    assert progress
+
+    # retried items are not counted twice
+    memory_es("ingest-accepting-test")
+    rows = ({"id": i, "username": "user-%d" % i} for i in range(50))
+    expected = IngestUserODM.parallel_ingest(rows, workers=2, using="ingest-accepting-test", chunk_size=10)
+    assert result.stats.bytes == expected.stats.bytes
+
+
+def test_failing_progress_callback_is_raised(memory_es):
+    memory_es("ingest-progress-test")
+
+    def on_progress(stats):
+        raise ZeroDivisionError()
+
+    rows = ({"id": i, "username": "user-%d" % i} for i in range(100))
+    with pytest.raises(ZeroDivisionError):
+        IngestUserODM.parallel_ingest(
+            rows, workers=1, using="ingest-progress-test", chunk_size=5, concurrency=1, queue_size=1,
+            on_progress=on_progress,
+        )
+
+
+def test_ingested_documents_are_not_read_from_the_caches(memory_es):
+    memory_es("ingest-cache-test")
+    CachedIngestUserODM(meta={"id": 1}, id=1, username="old").save(using="ingest-cache-test", refresh=True)
+    assert CachedIngestUserODM.get(1, using="ingest-cache-test").username == "old"
+    search = CachedIngestUserODM.search(using="ingest-cache-test").filter("term", id=1)
+    assert search.execute()[0].username == "old"
+
+    rows = [{"meta": {"id": 1}, "id": 1, "username": "new"}, {"meta": {"id": 2}, "id": "two"}, {"id": "three"}]
+    result = CachedIngestUserODM.parallel_ingest(rows, using="ingest-cache-test", chunk_size=2, refresh=True)
+
+    assert CachedIngestUserODM.get(1, using="ingest-cache-test").username == "new"
+    assert search.execute(ignore_cache=True)[0].username == "new"
+    # invalid rows can be found back in the source
+    assert [(f["_id"], f["row"]) for f in result.failed] == [(2, 1), (None, 2)]
+
+
+class Level(enum.Enum):
+    low = "low"
+    high = "high"
+
+
+class TimedTaskODM(ESModel):
+    """task document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    level: Level = Field(None, description="level")
+    duration: datetime.timedelta = Field(None, description="duration")
+
+    class Index:
+        name = 'test-ingest-tasks'
+
+
+class RecordingSerializer(ESJSONSerializer):
+    lines = 0
+
+    def dumps_bytes(self, data):
+        RecordingSerializer.lines += 1
+        return super(RecordingSerializer, self).dumps_bytes(data)
+
+
+def test_parallel_ingest_uses_the_registered_serializer(memory_es):
+    memory_es("ingest-serializer-test")
+    register_serializer("ingest-serializer-test", RecordingSerializer())
+    rows = [{"id": i, "level": Level.high, "duration": datetime.timedelta(minutes=i)} for i in range(4)]
+    # the Integer field of the mapping does not clean timedelta values
+    result = TimedTaskODM.parallel_ingest(rows, workers=2, using="ingest-serializer-test", chunk_size=2,
+                                          validate=False)
+
+    assert len(result.created) == 4
+    # an action and a source line per document
+    assert RecordingSerializer.lines == 8
+    source = TimedTaskODM.search(using="ingest-serializer-test").filter("term", id=3).execute()[0].to_dict()
+    assert source == {"id": 3, "level": "high", "duration": 180}
+    # sent to the workers of the process mode
+    assert isinstance(pickle.loads(pickle.dumps(RecordingSerializer())), RecordingSerializer)
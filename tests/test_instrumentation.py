@@ -0,0 +1,87 @@
+import json
+
+from elasticsearch import Connection, Elasticsearch
+
+from es_odm import ESModel, Field
+from es_odm.instrumentation import LatencyHistogram, add_listener, remove_listener
+
+
+class InstrumentedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-instrumentation-index'
+
+
+SEARCH_RESPONSE = {
+    "took": 7,
+    "timed_out": False,
+    "_shards": {"total": 2, "successful": 2, "skipped": 0, "failed": 0},
+    "hits": {"total": {"value": 1, "relation": "eq"}, "max_score": 1.0, "hits": [
+        {"_index": "test-instrumentation-index", "_id": "1", "_score": 1.0, "_source": {"id": 1, "username": "a"}},
+    ]},
+}
+
+
+class SearchConnection(Connection):
+    def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None):
+        return 200, {"x-elastic-product": "Elasticsearch"}, json.dumps(
+            SEARCH_RESPONSE if url.endswith("_search") else {"version": {"number": "7.17.0"}, "tagline": "t"}
+        )
+
+
+def record():
+    operations = []
+    add_listener(operations.append)
+    return operations
+
+
+def test_operations_report_phases_and_server_stats(memory_es):
+    memory_es("instrumentation-test")
+    operations = record()
+    try:
+        user = InstrumentedUserODM(meta={"id": 1}, id=1, username="alice")
+        user.save(using="instrumentation-test")
+        InstrumentedUserODM.get(1, using="instrumentation-test")
+        InstrumentedUserODM.mget(["1", "2"], using="instrumentation-test")
+        InstrumentedUserODM.bulk_save([user], using="instrumentation-test")
+        list(InstrumentedUserODM.search(using="instrumentation-test"))
+    finally:
+        remove_listener(operations.append)
+
+    assert [op.name for op in operations] == ["save", "get", "mget", "bulk", "search"]
+    save, get, mget, bulk, search = operations
+    assert set(save.phases) == {"build", "request"}
+    assert save.index == "test-instrumentation-index" and save.model == "InstrumentedUserODM"
+    assert get.hits == 1 and set(get.phases) == {"request", "hydrate"}
+    assert mget.hits == 1
+    assert bulk.hits == 1 and bulk.took is not None
+    assert search.total == 1 and search.shards["failed"] == 0
+    assert all(op.duration >= sum(op.phases.values()) for op in operations)
+
+
+def test_client_serialization_is_measured(memory_es):
+    es = Elasticsearch(connection_class=SearchConnection)
+    # the product check made on the first request is not part of the search
+    es.info()
+    memory_es("instrumentation-client", es)
+    histogram = LatencyHistogram(buckets=(0.5, 60))
+    operations = record()
+    add_listener(histogram)
+    try:
+        hits = list(InstrumentedUserODM.search(using="instrumentation-client").filter("term", id=1))
+    finally:
+        remove_listener(operations.append)
+        remove_listener(histogram)
+
+    assert hits[0].username == "a"
+    op, = operations
+    assert op.took == 7 and op.shards["total"] == 2 and op.hits == 1
+    assert op.request_bytes == len(json.dumps({"query": {"bool": {"filter": [{"term": {"id": 1}}]}}}, separators=(",", ":")))
+    assert op.response_bytes == len(json.dumps(SEARCH_RESPONSE))
+    assert {"serialize", "request", "decode", "hydrate"} <= set(op.phases)
+
+    series = histogram.snapshot()[("InstrumentedUserODM", "search")]
+    assert series["count"] == 1 and series["buckets"][float("inf")] == 1
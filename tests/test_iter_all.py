@@ -0,0 +1,77 @@
+from es_odm import ESModel, Field
+
+
+class ScanUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-scan-index'
+
+
+def add_users(alias, total, index=None):
+    ScanUserODM.bulk_save(
+        [ScanUserODM(meta={"id": str(i)}, id=i, username="u%d" % i) for i in range(total)], using=alias, index=index
+    )
+
+
+def rotate_pit_ids(es):
+    """answer every search with a new point in time id, like elasticsearch may"""
+    def rewrite(response):
+        pit_id = "pit-%d" % es.sent("search")
+        es._pits[pit_id] = es._pits[response["pit_id"]]
+        response["pit_id"] = pit_id
+        return response
+    es.rewrite("search", rewrite)
+
+
+def closed(es):
+    return [request["body"]["id"] for request in es.requests("close_point_in_time")]
+
+
+def test_iter_all_pages_with_search_after(memory_es):
+    es = memory_es("scan-test")
+    add_users("scan-test", 25)
+    rotate_pit_ids(es)
+
+    docs = list(ScanUserODM.iter_all(query={"match_all": {}}, batch_size=10, fields=["id"], using="scan-test"))
+
+    assert [d.id for d in docs] == list(range(25))
+    searches = [request["body"] for request in es.requests("search")]
+    assert len(searches) == 3
+    assert searches[0]["sort"] == [{"_shard_doc": "asc"}]
+    assert searches[0]["_source"] == {"includes": ["id"]}
+    assert searches[1]["pit"]["id"] == "pit-1"
+    assert closed(es) == ["pit-3"]
+
+
+def test_iter_all_closes_pit_when_closed_early(memory_es):
+    es = memory_es("scan-test")
+    add_users("scan-test", 100)
+    rotate_pit_ids(es)
+
+    it = ScanUserODM.iter_all(batch_size=10, using="scan-test")
+    assert next(it).id == 0
+    it.close()
+
+    assert es.sent("search") == 1
+    assert closed(es) == ["pit-1"]
+
+
+def test_iter_all_uses_the_connection_index_params_and_slice_of_a_search(memory_es):
+    es = memory_es("scan-search-test")
+    add_users("scan-search-test", 100, index="test-scan-v2")
+    s = ScanUserODM.search(using="scan-search-test", index="test-scan-v2")
+    s = s.params(routing="7", request_cache=True)[5:28]
+
+    docs = list(ScanUserODM.iter_all(s, batch_size=10))
+
+    assert [d.id for d in docs] == list(range(5, 28))
+    opened = es.requests("open_point_in_time")
+    assert opened[0]["index"] == ["test-scan-v2"] and opened[0]["routing"] == "7"
+    searches = es.requests("search")
+    assert [request["body"]["size"] for request in searches] == [10, 10, 8]
+    assert searches[0]["request_cache"] is True and "routing" not in searches[0]
+    assert "from" not in searches[0]["body"]
+    assert list(ScanUserODM.iter_all(s[:0])) == []
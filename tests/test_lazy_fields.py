@@ -0,0 +1,80 @@
+import datetime
+import typing
+
+import pytest
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField
+
+
+class LazyLineODM(InnerESModel):
+    """order line document"""
+    sku: str = Field(None, description="sku", keyword=True)
+    quantity: int = Field(None, description="quantity")
+    shipped_at: datetime.datetime = Field(None, description="shipping date")
+
+
+class LazyCustomerODM(InnerESModel):
+    """customer document"""
+    name: str = Field(None, description="name", keyword=True)
+
+
+class LazyOrderODM(ESModel):
+    """order document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    lines: typing.Union[NestedField[LazyLineODM], list] = Field(None, description="order lines", lazy=True)
+    customer: typing.Union[ObjectField[LazyCustomerODM], dict] = Field(None, description="customer", lazy=True)
+
+    class Index:
+        name = 'test-lazy-orders'
+
+
+SOURCE = {
+    "id": 1,
+    "lines": [{"sku": "a", "quantity": 2, "shipped_at": "2022-01-01T00:00:00"}, {"sku": "b", "quantity": 1}],
+    "customer": {"name": "alice"},
+}
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_inner_documents_are_built_on_first_access(trusted):
+    order = LazyOrderODM.from_es({"_id": "1", "_index": "test-lazy-orders", "_source": dict(SOURCE)}, trusted=trusted)
+    raw_lines = order._d_["lines"]
+    assert raw_lines is SOURCE["lines"]
+    # untouched raw values are serialized as they are
+    assert order.to_dict() == SOURCE
+    assert order.to_dict()["customer"] is SOURCE["customer"]
+
+    lines = order.lines
+    assert isinstance(lines[0], LazyLineODM)
+    assert lines[0].shipped_at == datetime.datetime(2022, 1, 1)
+    assert order.lines[0] is lines[0]
+    assert order.customer.name == "alice"
+    assert not order.dirty_fields()
+    assert order.to_dict()["lines"][0]["sku"] == "a"
+
+    order.lines[1].quantity = 5
+    assert order.dirty_fields() == {"lines"}
+
+
+def test_lazy_fields_round_trip(memory_es):
+    memory_es("lazy-test")
+    order = LazyOrderODM(meta={"id": 1}, **SOURCE)
+    order.save(using="lazy-test")
+
+    loaded = LazyOrderODM.get(1, using="lazy-test")
+    loaded.customer = {"name": "bob"}
+    assert loaded.customer.name == "bob"
+    loaded.save(using="lazy-test")
+
+    loaded = LazyOrderODM.get(1, using="lazy-test")
+    assert loaded.customer.name == "bob"
+    assert [line.quantity for line in loaded.lines] == [2, 1]
+
+
+def test_only_object_fields_can_be_lazy():
+    with pytest.raises(TypeError):
+        class LazyNameODM(ESModel):
+            name: str = Field(None, description="name", lazy=True)
+
+            class Index:
+                name = 'test-lazy-names'
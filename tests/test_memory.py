@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from elasticsearch.exceptions import ConflictError, NotFoundError, RequestError
+
+from es_odm import ESModel, Field
+from es_odm.memory import MemoryElasticsearch
+
+
+class MemoryUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+
+    class Index:
+        name = 'test-memory-index'
+
+
+def make_users(count):
+    return [MemoryUserODM(meta={"id": i}, id=i, username="user %d" % i, age=20 + i % 10) for i in range(count)]
+
+
+def test_crud_and_optimistic_concurrency_control(memory_es):
+    memory_es("memory-test")
+    MemoryUserODM.init(using="memory-test")
+
+    user = MemoryUserODM(meta={"id": 1}, id=1, username="alice", age=30)
+    assert user.save(using="memory-test") == "created"
+    assert user.meta.seq_no == 0
+
+    loaded = MemoryUserODM.get(1, using="memory-test")
+    assert loaded.to_dict() == {"id": 1, "username": "alice", "age": 30}
+    assert MemoryUserODM.exists(1, using="memory-test")
+
+    loaded.update(using="memory-test", age=31)
+    assert loaded.meta.seq_no == 1
+    # the first instance still carries seq_no 0
+    with pytest.raises(ConflictError):
+        user.save(using="memory-test")
+
+    assert MemoryUserODM.mget(["1", "2"], using="memory-test")[1] is None
+    loaded.delete(using="memory-test")
+    with pytest.raises(NotFoundError):
+        MemoryUserODM.get(1, using="memory-test")
+
+
+def test_bulk_and_search(memory_es):
+    memory_es("memory-test")
+    result = MemoryUserODM.bulk_save(make_users(30), using="memory-test")
+    assert result.success and len(result.created) == 30
+
+    s = MemoryUserODM.search(using="memory-test")
+    assert s.count() == 30
+    assert s.filter("term", age=25).count() == 3
+    assert s.query("match", username={"query": "user 7", "operator": "and"}).filter("range", age={"gte": 27}).count() == 1
+    assert sorted(h.id for h in s.query("bool", must_not=[{"range": {"age": {"lt": 29}}}])[:10]) == [9, 19, 29]
+
+    page = s.sort("-age", "id")[:4].execute()
+    assert [h.id for h in page] == [9, 19, 29, 8]
+    after = s.sort("-age", "id").extra(search_after=list(page.hits[-1].meta.sort))[:2].execute()
+    assert [h.id for h in after] == [18, 28]
+
+    assert [u.id for u in MemoryUserODM.iter_all(batch_size=7, using="memory-test")] == list(range(30))
+
+    conflict = MemoryUserODM.get(3, using="memory-test")
+    conflict.meta.seq_no = 99
+    result = MemoryUserODM.bulk_delete([conflict, MemoryUserODM.get(4, using="memory-test")], using="memory-test")
+    assert result.failed[0]["status"] == 409
+    assert result.deleted == ["4"]
+
+
+def test_aggregations_and_ids_lookups(memory_es):
+    memory_es("memory-test")
+    MemoryUserODM.bulk_save(make_users(30), using="memory-test")
+
+    s = MemoryUserODM.search(using="memory-test").filter("range", age={"gte": 27}).extra(size=0)
+    s.aggs.bucket("ages", "terms", field="age", size=2).metric("last", "max", field="id")
+    s.aggs.metric("users", "value_count", field="id")
+    response = s.execute()
+    ages = response.aggregations.ages
+    assert [(b.key, b.doc_count, b.last.value) for b in ages.buckets] == [(27, 3, 27.0), (28, 3, 28.0)]
+    assert ages.sum_other_doc_count == 3
+    assert response.aggregations.users.value == 9
+    # computed before the post filter
+    response = s.post_filter("term", age=29).execute()
+    assert response.hits.total.value == 3 and response.aggregations.users.value == 9
+
+    s = MemoryUserODM.search(using="memory-test")
+    assert sorted(h.id for h in s.filter("ids", values=[1, 29, 99]).filter("term", age=21)) == [1]
+    s.aggs.bucket("ages", "histogram", field="age", interval=5)
+    with pytest.raises(RequestError):
+        s.execute()
+
+
+def test_source_filtering_and_async_client(memory_es):
+    backend = MemoryElasticsearch()
+    backend.index("test-memory-index", {"id": 1, "username": "alice", "age": 30}, id=1)
+    assert backend.get("test-memory-index", 1, _source_includes=["username"])["_source"] == {"username": "alice"}
+
+    # registered as the async connection too
+    memory_es("memory-test", backend)
+    user = asyncio.run(MemoryUserODM.aget(1, using="memory-test"))
+    assert user.username == "alice"
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from elasticsearch.exceptions import NotFoundError
+
+from es_odm import ESModel, Field
+
+
+class MgetUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-mget-index'
+
+
+def add_users(alias, count):
+    MgetUserODM.bulk_save(
+        [MgetUserODM(meta={"id": str(i)}, id=i, username="user-%d" % i) for i in range(1, count + 1)], using=alias
+    )
+
+
+def mgets(es):
+    """ids of every _mget request"""
+    return [[d["_id"] for d in request["body"]["docs"]] for request in es.requests("mget")]
+
+
+def test_mget_chunks_and_keeps_order(memory_es):
+    es = memory_es("mget-test")
+    add_users("mget-test", 10)
+    ids = [str(i) for i in range(1, 11)]
+
+    users = MgetUserODM.mget(ids, using="mget-test", chunk_size=3, concurrency=3)
+    assert [u.id for u in users] == list(range(1, 11))
+    assert sorted(len(c) for c in mgets(es)) == [1, 3, 3, 3]
+
+    assert MgetUserODM.mget([], using="mget-test") == []
+    assert es.sent("mget") == 4
+
+
+def test_mget_missing_semantics_across_chunks(memory_es):
+    memory_es("mget-test")
+    add_users("mget-test", 3)
+    ids = ["1", "404", "2", "3", "1404"]
+
+    users = MgetUserODM.mget(ids, using="mget-test", chunk_size=2)
+    assert [u and u.id for u in users] == [1, None, 2, 3, None]
+
+    users = MgetUserODM.mget(ids, using="mget-test", chunk_size=2, missing="skip")
+    assert [u.id for u in users] == [1, 2, 3]
+
+    with pytest.raises(NotFoundError):
+        MgetUserODM.mget(ids, using="mget-test", chunk_size=2, missing="raise")
+
+
+def test_imget_streams_chunks(memory_es):
+    es = memory_es("mget-test")
+    add_users("mget-test", 7)
+    ids = (str(i) for i in range(1, 8))
+
+    users = MgetUserODM.imget(ids, using="mget-test", chunk_size=3)
+    first = next(users)
+    assert first.id == 1
+    assert mgets(es) == [["1", "2", "3"]]
+    assert [u.id for u in users] == list(range(2, 8))
+    assert mgets(es) == [["1", "2", "3"], ["4", "5", "6"], ["7"]]
+
+    users = MgetUserODM.imget(["1", "2", "404", "3"], using="mget-test", chunk_size=2, missing="raise")
+    assert next(users).id == 1
+    assert next(users).id == 2
+    with pytest.raises(NotFoundError):
+        next(users)
+
+
+def test_amget_chunks_and_keeps_order(memory_es):
+    es = memory_es("mget-test")
+    add_users("mget-test", 7)
+    ids = [str(i) for i in range(1, 8)] + ["404"]
+
+    users = asyncio.run(MgetUserODM.amget(ids, using="mget-test", chunk_size=3, concurrency=2))
+    assert [u and u.id for u in users] == [1, 2, 3, 4, 5, 6, 7, None]
+    assert es.sent("mget") == 3
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from elasticsearch.exceptions import NotFoundError, RequestError
+
+from es_odm import AsyncSearchBatcher, ESModel, Field, SearchBatch
+
+
+class BatchedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+
+    class Index:
+        name = 'test-msearch-users'
+
+
+def add_users(alias):
+    BatchedUserODM.bulk_save(
+        [BatchedUserODM(meta={"id": i}, id=i, username="user %d" % i, age=20 + i) for i in range(5)], using=alias
+    )
+
+
+def sizes(es):
+    """number of searches of every _msearch request"""
+    return [len(request["body"]) // 2 for request in es.requests("msearch")]
+
+
+def test_searches_are_coalesced_and_errors_isolated(memory_es):
+    es = memory_es("msearch-test")
+    add_users("msearch-test")
+    search = BatchedUserODM.search(using="msearch-test")
+    with SearchBatch(max_searches=2) as batch:
+        young = batch.add(search.filter("range", age={"lt": 22}).sort("id"))
+        named = batch.add(search.filter("term", username="user 3"))
+        missing = batch.add(search.index("test-msearch-missing"))
+        assert len(batch) == 1
+
+    assert sizes(es) == [2, 1]
+    assert [u.meta.id for u in young.result()] == ["0", "1"]
+    hit = named.result()[0]
+    assert isinstance(hit, BatchedUserODM) and hit.age == 23
+    with pytest.raises(NotFoundError):
+        missing.result()
+
+
+def test_result_sends_the_pending_searches(memory_es):
+    es = memory_es("msearch-lazy-test")
+    add_users("msearch-lazy-test")
+    batch = SearchBatch()
+    search = BatchedUserODM.search(using="msearch-lazy-test").filter("term", age=21)
+    result = batch.add(search)
+    assert sizes(es) == []
+    assert result.result()[0].username == "user 1"
+    assert sizes(es) == [1]
+    # the response is kept like execute() does
+    assert search.execute() is result.result()
+
+    with pytest.raises(TypeError):
+        batch.add(BatchedUserODM.search(using="msearch-lazy-test").to_dict())
+
+
+def test_async_searches_of_a_tick_are_coalesced(memory_es):
+    es = memory_es("msearch-async-test")
+    add_users("msearch-async-test")
+    batcher = AsyncSearchBatcher()
+
+    async def run():
+        search = BatchedUserODM.asearch(using="msearch-async-test")
+        first = await asyncio.gather(*(batcher.execute(search.filter("term", age=20 + i)) for i in range(3)))
+        bad = batcher.execute(search.query("regexp", username="user.*"))
+        good = batcher.execute(search.filter("term", age=24))
+        return first, await asyncio.gather(bad, good, return_exceptions=True)
+
+    first, (bad, good) = asyncio.run(run())
+    assert sizes(es) == [3, 2]
+    assert [r[0].age for r in first] == [20, 21, 22]
+    assert isinstance(bad, RequestError)
+    assert good[0].username == "user 4"
+
+
+def test_search_params_go_to_the_header_or_the_body(memory_es):
+    es = memory_es("msearch-params-test")
+    add_users("msearch-params-test")
+    search = BatchedUserODM.search(using="msearch-params-test").filter("term", age=22)
+    with SearchBatch() as batch:
+        result = batch.add(search.params(
+            routing="1", request_cache=True, track_total_hits=True, timeout="1s", _source_includes="id,age",
+        ))
+
+    header, body = es.requests("msearch")[0]["body"]
+    assert header == {"index": ["test-msearch-users"], "routing": "1", "request_cache": True}
+    assert body["track_total_hits"] is True and body["timeout"] == "1s"
+    assert body["_source"] == {"includes": ["id", "age"]}
+    assert result.result()[0].to_dict() == {"id": 2, "age": 22}
+
+    with pytest.raises(ValueError):
+        SearchBatch().add(search.params(filter_path="hits.hits"))
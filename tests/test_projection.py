@@ -0,0 +1,82 @@
+import typing
+
+import pytest
+from elasticsearch_dsl.exceptions import IllegalOperation
+
+from es_odm import ESModel, FieldNotLoaded, Field, InnerESModel, ObjectField
+
+
+class ProfileODM(InnerESModel):
+    """profile document"""
+    nickname: str = Field(None, description="nickname", keyword=True)
+    bio: str = Field(None, description="biography")
+
+
+class ProjectedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+    profile: typing.Union[ObjectField[ProfileODM], dict] = Field(None, description="profile")
+
+    class Index:
+        name = 'test-projection-index'
+
+
+def add_users(alias):
+    for i in (1, 2):
+        ProjectedUserODM(
+            meta={"id": i}, id=i, username="alice", age=30, profile={"nickname": "al", "bio": "..."}
+        ).save(using=alias)
+
+
+def test_only_requests_and_loads_the_projected_fields(memory_es):
+    es = memory_es("projection-test")
+    add_users("projection-test")
+    summary = ProjectedUserODM.only("id", "username", "profile.nickname")
+
+    user = summary.get(1, using="projection-test")
+    request, = es.requests("get")
+    assert request["_source_includes"] == ["id", "username", "profile.nickname"]
+    assert "_source_excludes" not in request
+    assert user.username == "alice"
+    assert user.profile.nickname == "al"
+    with pytest.raises(FieldNotLoaded, match="'age'"):
+        user.age
+    with pytest.raises(FieldNotLoaded, match="'profile.bio'"):
+        user.profile.bio
+    with pytest.raises(IllegalOperation):
+        user.save(using="projection-test")
+
+    users = summary.mget(["1", "2"], using="projection-test")
+    assert [u.username for u in users] == ["alice", "alice"]
+    assert not hasattr(users[1], "age")
+
+
+def test_defer_excludes_fields(memory_es):
+    memory_es("projection-test")
+    add_users("projection-test")
+    user = ProjectedUserODM.defer("profile").get(1, using="projection-test")
+
+    assert user.age == 30
+    with pytest.raises(FieldNotLoaded):
+        user.profile
+
+
+def test_projection_search_and_validation():
+    s = ProjectedUserODM.only("id", "profile.nickname").search()
+    assert s.to_dict() == {"_source": {"includes": ["id", "profile.nickname"]}}
+
+    user = s._get_result({"_index": "test-projection-index", "_id": "1", "_source": {"id": 1}})
+    assert user.id == 1
+    assert user.profile.to_dict() == {}
+    with pytest.raises(FieldNotLoaded):
+        user.username
+
+    # complete instances are unaffected
+    assert ProjectedUserODM().age is None
+
+    with pytest.raises(ValueError):
+        ProjectedUserODM.only("unknown")
+    with pytest.raises(ValueError):
+        ProjectedUserODM.only("age.value")
@@ -0,0 +1,128 @@
+import asyncio
+
+from es_odm import ESModel, Field, SearchBatch
+from es_odm.cache import LRUCache, QueryCache, SQLiteCache
+
+
+class SearchCachedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+
+    class Index:
+        name = 'test-search-cache-index'
+
+    class SearchCache:
+        ttl = 60
+        max_size = 16
+
+
+def add_users(alias):
+    SearchCachedUserODM._search_cache.clear()
+    for i in range(3):
+        SearchCachedUserODM(meta={"id": i}, id=i, username="user-%d" % i).save(using=alias, refresh=True)
+
+
+def test_lru_cache_bounds_bytes():
+    cache = LRUCache(max_size=10, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None and cache.get("b") == "y" * 6
+    assert cache.bytes == 6 and cache.evictions == 1
+
+
+def test_search_responses_are_cached_by_body_and_params(memory_es):
+    es = memory_es("search-cache-test")
+    add_users("search-cache-test")
+    s = SearchCachedUserODM.search(using="search-cache-test").filter("term", username="user-1")
+
+    assert [u.id for u in s.execute()] == [1]
+    assert [u.id for u in s.execute(ignore_cache=True)] == [1]
+    assert es.sent("search") == 1
+    # a different body or routing is another entry
+    SearchCachedUserODM.search(using="search-cache-test").execute()
+    s.params(routing="1").execute()
+    assert es.sent("search") == 3
+    s.cache(False).execute()
+    assert es.sent("search") == 4
+    assert SearchCachedUserODM.search_cache_info()["hits"] == 1
+
+    # every hit is a fresh copy of the response
+    first, second = s.execute(ignore_cache=True), s.execute(ignore_cache=True)
+    first[0].username = "changed"
+    assert second[0].username == "user-1"
+
+
+def test_writes_invalidate_cached_searches(memory_es):
+    es = memory_es("search-cache-write-test")
+    add_users("search-cache-write-test")
+    s = SearchCachedUserODM.search(using="search-cache-write-test")
+    assert len(s.execute()) == 3
+
+    SearchCachedUserODM(meta={"id": 9}, id=9, username="user-9").save(using="search-cache-write-test", refresh=True)
+    assert len(s.execute(ignore_cache=True)) == 4
+    SearchCachedUserODM.bulk_delete(["9"], using="search-cache-write-test", refresh=True)
+    assert len(s.execute(ignore_cache=True)) == 3
+    assert es.sent("search") == 3
+
+
+def test_connections_do_not_share_cached_searches(memory_es):
+    first = memory_es("search-cache-first-test")
+    memory_es("search-cache-second-test")
+    add_users("search-cache-first-test")
+    add_users("search-cache-second-test")
+    SearchCachedUserODM(meta={"id": 9}, id=9, username="user-9").save(using="search-cache-second-test", refresh=True)
+
+    assert len(SearchCachedUserODM.search(using="search-cache-first-test").execute()) == 3
+    # same index and body, other cluster
+    with SearchBatch() as batch:
+        batched = batch.add(SearchCachedUserODM.search(using="search-cache-second-test"))
+    assert len(batched.result()) == 4
+    assert len(SearchCachedUserODM.search(using="search-cache-second-test").execute()) == 4
+    assert first.sent("search") == 1
+
+
+def test_async_search_uses_the_cache(memory_es):
+    es = memory_es("search-cache-async-test")
+    add_users("search-cache-async-test")
+
+    async def run():
+        s = SearchCachedUserODM.asearch(using="search-cache-async-test").filter("term", id=2)
+        return [(await s.execute(ignore_cache=True))[0].id for _ in range(2)]
+
+    assert asyncio.run(run()) == [2, 2]
+    assert es.sent("search") == 1
+
+
+def test_query_cache_skips_partial_responses_and_shares_sqlite_storage(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = QueryCache(SQLiteCache(path, ttl=60))
+    key = cache.key("users", {"query": {"match_all": {}}}, {"routing": "1"})
+    assert key == cache.key(["users"], {"query": {"match_all": {}}}, {"routing": "1"})
+
+    cache.set(key, {"timed_out": True, "hits": {"hits": []}})
+    assert cache.get(key) is None
+    cache.set(key, {"timed_out": False, "_shards": {"failed": 0}, "hits": {"hits": []}})
+
+    other = QueryCache(SQLiteCache(path, ttl=60))
+    assert other.get(key)["hits"] == {"hits": []}
+    other.invalidate()
+    assert cache.get(cache.key("users", {"query": {"match_all": {}}}, {"routing": "1"})) is None
+
+
+def test_generation_token_is_neither_counted_nor_expired():
+    now = [0]
+    storage = LRUCache(max_size=2, ttl=10, timer=lambda: now[0])
+    cache = QueryCache(storage)
+    key = cache.key("users", {"query": {"match_all": {}}})
+    cache.set(key, {"hits": {"hits": []}})
+    assert cache.key("users", {"query": {"match_all": {}}}) == key
+    assert storage.info()["hits"] == 0 and storage.info()["misses"] == 0 and len(storage) == 1
+
+    for i in range(3):
+        cache.set(cache.key("users", {"size": i}), {"hits": {"hits": []}})
+    now[0] = 20
+    # neither evicted nor expired, the keys are the same
+    assert cache.key("users", {"query": {"match_all": {}}}) == key
+    cache.invalidate()
+    assert cache.key("users", {"query": {"match_all": {}}}) != key
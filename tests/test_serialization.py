@@ -0,0 +1,83 @@
+import datetime
+import enum
+import typing
+from decimal import Decimal
+
+from elasticsearch.serializer import JSONSerializer
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField
+
+
+class Status(enum.Enum):
+    active = 1
+    banned = 2
+
+
+class AccountODM(InnerESModel):
+    """account document"""
+    balance: Decimal = Field(None, description="balance")
+    opened_at: datetime.date = Field(None, description="opened at")
+
+
+class HistoryODM(InnerESModel):
+    """history entry document"""
+    action: str = Field(None, description="action", keyword=True)
+    at: datetime.datetime = Field(None, description="at")
+
+
+class MemberODM(ESModel):
+    """member document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    status: Status = Field(None, description="status")
+    session: datetime.timedelta = Field(None, description="session length")
+    created_at: datetime.datetime = Field(None, description="created at")
+    tags: typing.List[str] = Field(None, description="tags")
+    account: typing.Union[ObjectField[AccountODM], dict] = Field(None, description="account")
+    history: typing.Union[NestedField[HistoryODM], list] = Field(None, description="history")
+
+    class Index:
+        name = 'test-member-index'
+
+
+def make_member():
+    return MemberODM(
+        id=1,
+        status=Status.banned,
+        session=datetime.timedelta(minutes=2),
+        created_at=datetime.datetime(2022, 1, 1, 10),
+        tags=[],
+        account=AccountODM(balance=Decimal("1.5"), opened_at=datetime.date(2021, 5, 1)),
+        history=[HistoryODM(action="login", at=datetime.datetime(2022, 1, 1, 11)), {"action": "raw"}],
+    )
+
+
+def test_serializer_plan():
+    plan = MemberODM._doc_type.serializer
+    assert plan.fields == ["id", "status", "session", "created_at", "tags", "account", "history"]
+    assert plan.dict_plan["id"] is None
+
+
+def test_to_dict_keeps_python_values():
+    doc = make_member()
+    assert doc.to_dict() == {
+        "id": 1,
+        "status": Status.banned,
+        "session": datetime.timedelta(minutes=2),
+        "created_at": datetime.datetime(2022, 1, 1, 10),
+        "account": {"balance": Decimal("1.5"), "opened_at": datetime.date(2021, 5, 1)},
+        "history": [{"action": "login", "at": datetime.datetime(2022, 1, 1, 11)}, {"action": "raw"}],
+    }
+    assert doc.to_dict(skip_empty=False)["tags"] == []
+
+
+def test_body_is_json_ready():
+    body = make_member()._to_body()
+    assert body == {
+        "id": 1,
+        "status": 2,
+        "session": 120,
+        "created_at": "2022-01-01T10:00:00",
+        "account": {"balance": 1.5, "opened_at": "2021-05-01"},
+        "history": [{"action": "login", "at": "2022-01-01T11:00:00"}, {"action": "raw"}],
+    }
+    JSONSerializer().dumps(body)
@@ -0,0 +1,112 @@
+import datetime
+import decimal
+import enum
+import json
+
+import pytest
+from elasticsearch import Connection, Elasticsearch
+from elasticsearch.exceptions import SerializationError
+
+from es_odm import ESModel, Field
+from es_odm.bulk import chunk_actions
+from es_odm.serializer import ESJSONSerializer, register_serializer, serializer
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class SerializedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    created: datetime.datetime = Field(None, description="creation date")
+
+    class Index:
+        name = 'test-serializer-index'
+
+
+class RecordingConnection(Connection):
+    bodies = []
+
+    def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None):
+        self.bodies.append(body)
+        if url.endswith("_bulk"):
+            lines = [json.loads(line) for line in body.split(b"\n") if line]
+            items = [{"index": {"_id": line["index"]["_id"], "result": "created", "status": 201}}
+                     for line in lines if "index" in line]
+            response = {"took": 1, "errors": False, "items": items}
+        elif "_doc" in url:
+            response = {"_index": "test-serializer-index", "_id": "1", "result": "created", "_seq_no": 0,
+                        "_primary_term": 1}
+        else:
+            response = {"version": {"number": "7.17.0"}, "tagline": "t"}
+        return 200, {"x-elastic-product": "Elasticsearch"}, json.dumps(response)
+
+
+def test_encodes_the_types_mapped_by_get_dsl_field():
+    value = {
+        "datetime": datetime.datetime(2022, 1, 2, 3, 4, 5),
+        "date": datetime.date(2022, 1, 2),
+        "time": datetime.time(3, 4),
+        "timedelta": datetime.timedelta(minutes=2),
+        "decimal": decimal.Decimal("1.5"),
+        "enum": Color.RED,
+        "bytes": b"\x00\x01",
+        "set": {1},
+        1: "non str key",
+    }
+    assert json.loads(serializer.dumps(value)) == {
+        "datetime": "2022-01-02T03:04:05",
+        "date": "2022-01-02",
+        "time": "03:04:00",
+        "timedelta": 120,
+        "decimal": 1.5,
+        "enum": "red",
+        "bytes": "AAE=",
+        "set": [1],
+        "1": "non str key",
+    }
+    assert serializer.dumps("already serialized") == "already serialized"
+    assert serializer.loads('{"a": [1]}') == {"a": [1]}
+    with pytest.raises(SerializationError):
+        serializer.dumps({"a": object()})
+
+
+class AvatarODM(ESModel):
+    """document with a binary field"""
+    avatar: bytes = Field(None, description="avatar")
+
+    class Index:
+        name = 'test-serializer-avatars'
+
+
+def test_bytes_are_mapped_as_base64_binary():
+    assert AvatarODM._doc_type.mapping["avatar"].to_dict() == {"type": "binary"}
+    assert AvatarODM(avatar=b"\x00\x01").to_dict() == {"avatar": "AAE="}
+    loaded = AvatarODM.from_es({"_index": "test-serializer-avatars", "_id": "1", "_source": {"avatar": "AAE="}})
+    assert loaded.avatar == b"\x00\x01"
+
+
+def test_bulk_lines_are_bytes():
+    actions = [({"index": {"_id": str(i)}}, {"id": i}, None) for i in range(3)]
+    (lines, items, size), = chunk_actions(actions, serializer)
+    assert lines[0] == b'{"index":{"_id":"0"}}'
+    assert size == sum(len(line) + 1 for line in lines)
+
+
+def test_registered_on_a_connection_alias(memory_es):
+    RecordingConnection.bodies = []
+    memory_es("serializer-test", Elasticsearch(connection_class=RecordingConnection))
+    es = register_serializer("serializer-test")
+    assert isinstance(es.transport.serializer, ESJSONSerializer)
+    assert es.transport.deserializer.default is serializer
+
+    user = SerializedUserODM(meta={"id": 1}, id=1, username="alice", created=datetime.datetime(2022, 1, 2))
+    user.save(using="serializer-test")
+    result = SerializedUserODM.bulk_save([user], using="serializer-test")
+    assert result.created == ["1"]
+    assert json.loads(RecordingConnection.bodies[-2]) == {
+        "id": 1, "username": "alice", "created": "2022-01-02T00:00:00"
+    }
+    assert RecordingConnection.bodies[-1].endswith(b"\n")
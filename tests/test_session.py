@@ -0,0 +1,122 @@
+import pytest
+from elasticsearch.exceptions import ConnectionError
+from elasticsearch_dsl.exceptions import IllegalOperation
+
+from es_odm import ESModel, ESSession, Field, SessionFlushError
+
+
+class SessionUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+
+    class Index:
+        name = 'test-session-users'
+
+
+class SessionOrderODM(ESModel):
+    """order document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    status: str = Field(None, description="status", keyword=True)
+
+    class Index:
+        name = 'test-session-orders'
+
+
+def test_writes_across_models_are_coalesced_into_one_bulk(memory_es):
+    es = memory_es("session-test")
+    existing = SessionOrderODM(meta={"id": 9}, id=9, status="new")
+    existing.save(using="session-test")
+
+    alice = SessionUserODM(meta={"id": 1}, id=1, username="alice", age=30)
+    with ESSession(using="session-test") as session:
+        session.add(alice)
+        session.update(alice, age=31)
+        session.add(SessionUserODM(meta={"id": 2}, id=2, username="bob"))
+        session.delete(2, doc_class=SessionUserODM)
+        session.update(existing, status="paid")
+        session.update(existing, status="shipped")
+        assert len(session) == 3
+        assert es.sent("bulk") == 0
+
+    assert es.sent("bulk") == 1
+    assert alice.meta.seq_no == 0 and not alice.dirty_fields()
+    assert existing.meta.seq_no == 1
+    assert SessionUserODM.get(1, using="session-test").age == 31
+    assert SessionOrderODM.get(9, using="session-test").status == "shipped"
+    assert not SessionUserODM.exists(2, using="session-test")
+
+
+def test_thresholds_and_rollback(memory_es):
+    es = memory_es("session-threshold-test")
+    session = ESSession(using="session-threshold-test", max_writes=2)
+    session.add(SessionUserODM(meta={"id": 1}, id=1, username="a"))
+    session.add(SessionUserODM(meta={"id": 1}, id=1, username="b"))
+    assert es.sent("bulk") == 0
+    session.add(SessionUserODM(meta={"id": 2}, id=2, username="c"))
+    assert es.sent("bulk") == 1 and len(session) == 0
+    assert SessionUserODM.get(1, using="session-threshold-test").username == "b"
+
+    with pytest.raises(ZeroDivisionError):
+        with ESSession(using="session-threshold-test") as session:
+            session.add(SessionUserODM(meta={"id": 3}, id=3, username="d"))
+            1 / 0
+    assert es.sent("bulk") == 1
+
+    session = ESSession(using="session-threshold-test", flush_interval=0)
+    session.add(SessionUserODM(meta={"id": 4}, id=4, username="e"))
+    assert es.sent("bulk") == 2
+
+
+def test_failures_raise_an_aggregated_error(memory_es):
+    memory_es("session-error-test")
+    stale = SessionUserODM(meta={"id": 1}, id=1, username="a")
+    stale.save(using="session-error-test")
+    SessionUserODM.get(1, using="session-error-test").update(using="session-error-test", age=1)
+
+    session = ESSession(using="session-error-test")
+    session.add(stale)
+    session.add(SessionUserODM(meta={"id": 2}, id=2, username="b"))
+    with pytest.raises(SessionFlushError) as exc_info:
+        session.flush()
+    assert [e["_id"] for e in exc_info.value.errors] == ["1"]
+    assert exc_info.value.result.created == ["2"]
+
+    session.delete(stale)
+    with pytest.raises(IllegalOperation):
+        session.update(stale, age=3)
+
+
+def test_transport_errors_keep_the_unsent_writes(memory_es):
+    memory_es("session-flaky-test").fail("bulk", ConnectionError("N/A", "connection lost", None), call=2)
+    users = [SessionUserODM(meta={"id": i}, id=i, username="user %d" % i) for i in range(3)]
+    session = ESSession(using="session-flaky-test", chunk_size=1)
+    for user in users:
+        session.add(user)
+
+    with pytest.raises(SessionFlushError) as exc_info:
+        session.flush()
+    assert exc_info.value.result.created == ["0"]
+    assert exc_info.value.unsent == [("index", "test-session-users", 1), ("index", "test-session-users", 2)]
+    assert isinstance(exc_info.value.error, ConnectionError)
+    # the first chunk was applied
+    assert users[0].meta.seq_no == 0 and not users[0].dirty_fields()
+    assert users[1].dirty_fields() and len(session) == 2
+
+    assert sorted(session.flush().created) == ["1", "2"]
+    assert SessionUserODM.get(2, using="session-flaky-test").username == "user 2"
+
+
+def test_other_errors_keep_the_unsent_writes(memory_es):
+    es = memory_es("session-broken-test")
+    es.fail("bulk", ValueError("cannot encode"), call=2)
+    session = ESSession(using="session-broken-test", chunk_size=1)
+    for i in range(3):
+        session.add(SessionUserODM(meta={"id": i}, id=i, username="user %d" % i))
+
+    with pytest.raises(ValueError):
+        session.flush()
+    assert len(session) == 2
+    assert sorted(session.flush().created) == ["1", "2"]
+    assert es.sent("bulk") == 4 and len(session) == 0
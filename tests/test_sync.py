@@ -0,0 +1,98 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from es_odm import ESModel, Field
+from es_odm.sync import DBAPISource, FileCheckpoint, SyncEngine, SyncError
+
+
+class SyncedHeroODM(ESModel):
+    """hero document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    name: str = Field(None, description="name", keyword=True)
+    age: int = Field(None, description="age")
+    updated_at: datetime.datetime = Field(None, description="last update")
+
+    class Index:
+        name = 'test-sync-heroes'
+
+
+def make_db(count):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE hero (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, updated_at TEXT)")
+    # several rows share the same updated_at, the primary key breaks the ties
+    db.executemany(
+        "INSERT INTO hero VALUES (?, ?, ?, ?)",
+        [(i, "hero %d" % i, 20 + i, "2022-01-01T00:00:%02d" % (i // 2)) for i in range(count)],
+    )
+    return db
+
+
+def test_sync_pages_upserts_and_resumes(tmp_path, memory_es):
+    memory_es("sync-test")
+    db = make_db(7)
+    checkpoint = FileCheckpoint(str(tmp_path / "heroes.json"))
+    engine = SyncEngine(SyncedHeroODM, DBAPISource(db, "hero"), checkpoint, batch_size=3, using="sync-test")
+
+    # interrupted after two pages
+    result = engine.run(max_pages=2)
+    assert result.rows == 6 and len(result.created) == 6
+    assert checkpoint.load() == ("2022-01-01T00:00:02", 5)
+
+    result = engine.run()
+    assert result.rows == 1 and result.created == ["6"]
+    hero = SyncedHeroODM.get(6, using="sync-test")
+    assert hero.name == "hero 6" and hero.updated_at == datetime.datetime(2022, 1, 1, 0, 0, 3)
+
+    # nothing changed since the watermark
+    assert engine.run().rows == 0
+
+    db.execute("UPDATE hero SET age = 99, updated_at = '2022-01-02T00:00:00' WHERE id = 1")
+    result = engine.run()
+    assert result.updated == ["1"]
+    assert SyncedHeroODM.get(1, using="sync-test").age == 99
+
+    # a full sync only rewrites the changed documents
+    result = SyncEngine(SyncedHeroODM, DBAPISource(db, "hero"), using="sync-test").run()
+    assert result.rows == 7 and len(result.noop) == 7
+
+
+def test_invalid_rows_are_reported_and_skipped(memory_es):
+    memory_es("sync-invalid-test")
+    db = make_db(3)
+    db.execute("UPDATE hero SET age = 'old' WHERE id = 1")
+    engine = SyncEngine(SyncedHeroODM, DBAPISource(db, "hero", where="age IS NOT NULL"), using="sync-invalid-test")
+    result = engine.run()
+    assert sorted(result.created) == ["0", "2"]
+    assert [f["_id"] for f in result.failed] == [1]
+    assert engine.checkpoint.load() == ("2022-01-01T00:00:01", 2)
+
+
+def reject_last(response):
+    item = response["items"][-1]["update"]
+    item.update(status=429, error={"type": "es_rejected_execution_exception"})
+    response["errors"] = True
+    return response
+
+
+def test_failed_pages_keep_the_checkpoint(memory_es):
+    memory_es("sync-failed-test").rewrite("bulk", reject_last)
+    engine = SyncEngine(SyncedHeroODM, DBAPISource(make_db(2), "hero"), using="sync-failed-test")
+    with pytest.raises(SyncError) as exc_info:
+        engine.run()
+    assert exc_info.value.result.failed[0]["_id"] == "1"
+    assert engine.checkpoint.load() is None
+
+
+def test_null_columns_clear_the_document_fields(memory_es):
+    memory_es("sync-null-test")
+    db = make_db(2)
+    engine = SyncEngine(SyncedHeroODM, DBAPISource(db, "hero"), using="sync-null-test")
+    engine.run()
+
+    db.execute("UPDATE hero SET name = NULL, updated_at = '2022-01-02T00:00:00' WHERE id = 1")
+    result = engine.run()
+    assert result.updated == ["1"]
+    hero = SyncedHeroODM.get(1, using="sync-null-test")
+    assert hero.name is None and hero.age == 21
@@ -0,0 +1,144 @@
+import json
+import typing
+
+import pytest
+
+from es_odm import ESModel, Field, InnerESModel, ObjectField
+from es_odm.transfer import file_format
+
+
+class TransferUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+
+    class Index:
+        name = 'test-transfer-index'
+
+
+class TransferAddressODM(InnerESModel):
+    """address document"""
+    city: str = Field(None, description="city", keyword=True)
+    zip: int = Field(None, description="zip code")
+
+
+class SparseProfileODM(ESModel):
+    """profile document, only the last ones are filled"""
+    id: int = Field(None, primary_key=True, description="ID")
+    nickname: str = Field(None, description="nickname")
+    tags: typing.List[str] = Field(None, description="tags", keyword=True)
+    address: typing.Union[ObjectField[TransferAddressODM], dict] = Field(None, description="address")
+    extra: dict = Field(None, description="free form values")
+
+    class Index:
+        name = 'test-transfer-profiles'
+
+
+def test_export_and_import_ndjson(tmp_path, memory_es):
+    memory_es("transfer-source")
+    TransferUserODM.bulk_save(
+        [TransferUserODM(meta={"id": i}, id=i, username="user-%d" % i, age=20 + i) for i in range(7)],
+        using="transfer-source",
+        refresh=True,
+    )
+    path = str(tmp_path / "users.ndjson")
+    assert TransferUserODM.export(path, batch_size=3, using="transfer-source") == 7
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(line["_id"] for line in lines) == [str(i) for i in range(7)]
+
+    memory_es("transfer-target")
+    result = TransferUserODM.import_file(path, batch_size=2, using="transfer-target", refresh=True)
+    assert sorted(result.created) == [str(i) for i in range(7)] and not result.failed
+    assert TransferUserODM.get(3, using="transfer-target").to_dict() == {"id": 3, "username": "user-3", "age": 23}
+
+
+def test_export_selected_fields_matching_a_query(tmp_path, memory_es):
+    memory_es("transfer-query")
+    TransferUserODM.bulk_save(
+        [TransferUserODM(meta={"id": i}, id=i, username="user-%d" % i, age=20 + i) for i in range(5)],
+        using="transfer-query",
+        refresh=True,
+    )
+    path = str(tmp_path / "adults.ndjson")
+    count = TransferUserODM.export(path, query={"range": {"age": {"gte": 23}}}, fields=["age"], using="transfer-query")
+    assert count == 2
+    with open(path) as f:
+        assert sorted(json.loads(line)["_source"]["age"] for line in f) == [23, 24]
+
+
+def test_import_reports_bad_lines_without_aborting(tmp_path, memory_es):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(
+        '{"_id": "1", "id": 1, "username": "alice"}\n'
+        "not json\n"
+        "\n"
+        '{"id": "abc"}\n'
+        '{"id": 4, "username": "dave"}\n'
+    )
+    memory_es("transfer-bad-lines")
+    bad = []
+    result = TransferUserODM.import_file(
+        str(path), id_field="id", on_bad_line=bad.append, using="transfer-bad-lines", refresh=True
+    )
+    assert [b.line for b in bad] == [2, 4]
+    assert bad[0].text == "not json"
+    assert sorted(result.created) == ["1", "4"]
+    assert [f["line"] for f in result.failed] == [2, 4]
+
+
+def test_empty_file_and_unknown_format(tmp_path, memory_es):
+    path = tmp_path / "empty.ndjson"
+    path.write_text("")
+    memory_es("transfer-empty")
+    assert TransferUserODM.import_file(str(path), using="transfer-empty").success == 0
+    assert file_format("users.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        file_format("users.csv", "csv")
+
+
+def test_export_and_import_parquet(tmp_path, memory_es):
+    pytest.importorskip("pyarrow")
+    memory_es("transfer-parquet-source")
+    TransferUserODM.bulk_save(
+        [TransferUserODM(meta={"id": i}, id=i, username="user-%d" % i, age=20 + i) for i in range(5)],
+        using="transfer-parquet-source",
+        refresh=True,
+    )
+    path = str(tmp_path / "users.parquet")
+    assert TransferUserODM.export(path, batch_size=2, using="transfer-parquet-source") == 5
+
+    memory_es("transfer-parquet-target")
+    result = TransferUserODM.import_file(path, batch_size=2, using="transfer-parquet-target", refresh=True)
+    assert sorted(result.created) == [str(i) for i in range(5)] and not result.failed
+    assert TransferUserODM.get(3, using="transfer-parquet-target").to_dict() == {
+        "id": 3, "username": "user-3", "age": 23
+    }
+
+
+def test_parquet_columns_are_typed_after_the_mapping(tmp_path, memory_es):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    memory_es("transfer-sparse-source")
+    profiles = [SparseProfileODM(meta={"id": i}, id=i) for i in range(3)]
+    profiles.append(SparseProfileODM(
+        meta={"id": 3}, id=3, nickname="neo", tags=["a", "b"], address={"city": "Paris", "zip": 75001},
+        extra={"score": [1, 2]},
+    ))
+    SparseProfileODM.bulk_save(profiles, using="transfer-sparse-source", refresh=True)
+    path = str(tmp_path / "profiles.parquet")
+
+    # every field is missing from the first page
+    assert SparseProfileODM.export(path, batch_size=2, using="transfer-sparse-source") == 4
+    schema = pq.read_schema(path)
+    assert schema.field("nickname").type == pa.string()
+    assert schema.field("tags").type.value_type == pa.string()
+    assert schema.field("address").type == pa.struct([("city", pa.string()), ("zip", pa.int64())])
+
+    memory_es("transfer-sparse-target")
+    result = SparseProfileODM.import_file(path, using="transfer-sparse-target", refresh=True)
+    assert not result.failed
+    profile = SparseProfileODM.get(3, using="transfer-sparse-target")
+    assert profile.tags == ["a", "b"] and profile.address.city == "Paris"
+    assert profile.extra == {"score": [1, 2]}
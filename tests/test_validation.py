@@ -0,0 +1,65 @@
+import typing
+
+import pytest
+
+from es_odm import ESModel, Field, InnerESModel, NestedField, ObjectField, RowValidationError
+
+
+class ValidatedAddressODM(InnerESModel):
+    """address document"""
+    city: str = Field(None, description="city", keyword=True)
+    zip_code: int = Field(None, description="zip code")
+
+
+class ValidatedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(..., description="login name", keyword=True)
+    address: typing.Union[ObjectField[ValidatedAddressODM], dict] = Field(None, description="address")
+    history: typing.Union[NestedField[ValidatedAddressODM], list] = Field(None, description="previous addresses")
+
+    class Index:
+        name = 'test-validation-index'
+
+
+ROWS = [
+    {"id": "1", "username": "alice", "address": {"city": "Paris", "zip_code": "75001"}},
+    {"id": "x", "username": "bob"},
+    {"id": 3},
+    {"id": 4, "username": "dave", "history": [{"city": "Lyon"}, {"zip_code": "abc"}]},
+    {"id": 5, "username": "eve", "address": {"zip_code": 1000}, "history": [{"city": "Nice"}]},
+]
+
+
+def test_validate_many_collects_errors_with_their_location():
+    result = ValidatedUserODM.validate_many(ROWS)
+
+    assert result.indices == [0, 4]
+    alice = result.valid[0]
+    assert isinstance(alice, ValidatedUserODM)
+    # values are coerced, inner ones too
+    assert alice.id == 1 and alice.address.zip_code == 75001
+    assert result.valid[1].history[0].city == "Nice"
+
+    errors = {e["index"]: [error["loc"] for error in e["errors"]] for e in result.errors}
+    assert errors == {1: [("id",)], 2: [("username",)], 3: [("history", 1, "zip_code")]}
+
+
+def test_validate_many_skip_and_raise():
+    result = ValidatedUserODM.validate_many(ROWS, on_error="skip")
+    assert len(result) == 2 and result.errors == []
+
+    with pytest.raises(RowValidationError) as exc_info:
+        ValidatedUserODM.validate_many(ROWS, on_error="raise")
+    assert exc_info.value.index == 1
+
+    with pytest.raises(ValueError):
+        ValidatedUserODM.validate_many(ROWS, on_error="ignore")
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_validate_many_in_a_pool(mode):
+    rows = ROWS * 4
+    result = ValidatedUserODM.validate_many(rows, workers=2, mode=mode, chunk_size=3)
+    assert result.indices == [0, 4, 5, 9, 10, 14, 15, 19]
+    assert [e["index"] for e in result.errors] == [1, 2, 3, 6, 7, 8, 11, 12, 13, 16, 17, 18]
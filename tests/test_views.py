@@ -0,0 +1,69 @@
+import datetime
+import typing
+
+import pytest
+from elasticsearch_dsl.exceptions import IllegalOperation
+
+from es_odm import ESModel, Field, InnerESModel, ObjectField
+
+
+class ViewProfileODM(InnerESModel):
+    """profile document"""
+    nickname: str = Field(None, description="nickname", keyword=True)
+
+
+class ViewedUserODM(ESModel):
+    """user document"""
+    id: int = Field(None, primary_key=True, description="ID")
+    username: str = Field(None, description="login name", keyword=True)
+    age: int = Field(None, description="age")
+    created_at: datetime.datetime = Field(None, description="creation date")
+    profile: typing.Union[ObjectField[ViewProfileODM], dict] = Field(None, description="profile")
+
+    class Index:
+        name = 'test-views-users'
+
+
+def add_users(alias):
+    for i in range(3):
+        ViewedUserODM(
+            meta={"id": i}, id=i, username="user %d" % i, age=20 + i,
+            created_at=datetime.datetime(2022, 1, 1 + i), profile={"nickname": "u%d" % i},
+        ).save(using=alias)
+
+
+def test_search_views_keep_the_raw_source(memory_es):
+    memory_es("views-test")
+    add_users("views-test")
+    hits = list(ViewedUserODM.search(using="views-test").views().sort("id"))
+    view = hits[1]
+
+    assert type(view) is ViewedUserODM.view_class()
+    assert type(view).__name__ == "ViewedUserODMView"
+    assert not hasattr(view, "__dict__")
+    assert view.meta.id == "1" and view.meta.index == "test-views-users" and view.meta.sort == [1]
+    assert view.username == "user 1" and view.age == 21
+    assert view.created_at == "2022-01-02T00:00:00"
+    assert view.profile == {"nickname": "u1"}
+    assert view.to_dict()["username"] == "user 1"
+
+    with pytest.raises(IllegalOperation):
+        view.age = 3
+    with pytest.raises(IllegalOperation):
+        del view.username
+
+    user = view.to_model()
+    assert isinstance(user, ViewedUserODM)
+    assert user.meta.id == "1" and user.created_at == datetime.datetime(2022, 1, 2)
+    assert user.profile.nickname == "u1"
+
+
+def test_mget_views(memory_es):
+    memory_es("views-mget-test")
+    add_users("views-mget-test")
+    views = ViewedUserODM.mget([2, 5, 0], using="views-mget-test", view=True)
+    assert views[1] is None
+    assert [v.username for v in (views[0], views[2])] == ["user 2", "user 0"]
+    assert list(ViewedUserODM.imget([0], using="views-mget-test", view=True))[0].meta.id == "0"
+    # the class is built once per Document
+    assert type(views[0]) is type(views[2]) is ViewedUserODM.view_class()